@@ -0,0 +1,96 @@
+"""
+Simulación de un pico de matrícula contra el control de admisión (no necesita base de datos).
+
+Una aplicación falsa tarda `--servicio` ms por request y aguanta `--concurrencia`
+a la vez (como el pool de conexiones). Se lanzan `--requests` requests de
+estudiantes distintos a `--tasa` por segundo, con y sin control de admisión,
+y se compara la latencia de los que sí se atienden: sin control todos entran
+y hacen fila en el pool; con control los que no caben reciben turno enseguida.
+
+    python backend/bench/bench_admision.py --requests 5000 --tasa 1000 --servicio 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from admision import ControlAdmision, MiddlewareAdmision  # noqa: E402
+
+
+def aplicacion_falsa(concurrencia, servicio):
+    pool = asyncio.Semaphore(concurrencia)
+
+    async def app(scope, receive, send):
+        await receive()
+        async with pool:
+            await asyncio.sleep(servicio)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+    return app
+
+
+async def simular(app, requests, tasa):
+    resultados = []
+
+    async def uno(i):
+        estado = []
+
+        async def receive():
+            return {"type": "http.request", "body": b'{"estudiante_id": %d}' % i}
+
+        async def send(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado.append(mensaje["status"])
+
+        scope = {"type": "http", "method": "POST", "path": "/api/inscripciones", "headers": [],
+                 "query_string": b""}
+        inicio = time.perf_counter()
+        await app(scope, receive, send)
+        resultados.append((estado[0], (time.perf_counter() - inicio) * 1000))
+
+    tareas = []
+    for i in range(requests):
+        tareas.append(asyncio.create_task(uno(i)))
+        await asyncio.sleep(1 / tasa)
+    await asyncio.gather(*tareas)
+    return resultados
+
+
+def resumir(nombre, resultados):
+    estados = Counter(estado for estado, _ in resultados)
+    atendidos = sorted(ms for estado, ms in resultados if estado == 200)
+    p99 = atendidos[min(len(atendidos) - 1, int(len(atendidos) * 0.99))] if atendidos else 0
+    p50 = statistics.median(atendidos) if atendidos else 0
+    print(f"{nombre:<14} {dict(estados)!s:<28} atendidos p50 {p50:8.1f} ms  p99 {p99:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--tasa", type=float, default=1000, help="requests/s que llegan")
+    parser.add_argument("--servicio", type=float, default=20, help="ms que tarda cada request")
+    parser.add_argument("--concurrencia", type=int, default=10)
+    parser.add_argument("--cola", type=int, default=100)
+    parser.add_argument("--espera-max", type=float, default=2)
+    args = parser.parse_args()
+
+    servicio = args.servicio / 1000
+    capacidad = args.concurrencia / servicio
+    print(f"capacidad de la aplicación: {capacidad:.0f} requests/s; llegan {args.tasa:.0f} requests/s")
+
+    app = aplicacion_falsa(args.concurrencia, servicio)
+    resumir("sin control", await simular(app, args.requests, args.tasa))
+
+    control = ControlAdmision(tasa_global=capacidad, rafaga_global=capacidad, tasa_estudiante=0,
+                              concurrencia=args.concurrencia, max_cola=args.cola, espera_max=args.espera_max)
+    resumir("con control", await simular(MiddlewareAdmision(app, control=control), args.requests, args.tasa))
+    print(control.metricas())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
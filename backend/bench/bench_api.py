@@ -0,0 +1,393 @@
+"""
+Benchmark de carga de la API de EduBot.
+
+1. Siembra datos sintéticos en la base configurada por las variables PG*
+   (ver database.py) a la escala elegida. Los datos llevan la etiqueta
+   BENCH<escala> (códigos de curso y programa de los estudiantes) y se
+   reutilizan entre corridas; --limpiar los borra al terminar.
+
+       escala   cursos    estudiantes  inscripciones
+       100      100       1.000        5.000
+       10k      10.000    20.000       200.000
+       100k     100.000   100.000      1.000.000
+
+2. Mide cada endpoint por separado (--duracion segundos, --concurrencia
+   hilos con conexiones keep-alive): latencia p50/p95/p99, throughput y
+   consultas a la base por request.
+3. Mide todos los endpoints mezclados a la vez (throughput total).
+4. Guarda el resultado en JSON (por defecto en backend/bench/resultados/)
+   y, con --comparar, lo contrasta con una corrida anterior.
+
+La API debe estar corriendo contra la misma base:
+
+    cd backend/src && uvicorn api:app --port 8000 --workers 4
+    python backend/bench/bench_api.py --escala 10k --concurrencia 32 --duracion 20
+    python backend/bench/bench_api.py --escala 10k --comparar backend/bench/resultados/<anterior>.json
+
+Las consultas por request se leen de pg_stat_statements si la extensión está
+instalada; si no, se cuentan transacciones (pg_stat_database), que con los
+controladores actuales equivale a conexiones prestadas por request.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import conexion  # noqa: E402
+from bench_chat import PLANTILLAS  # noqa: E402
+
+ESCALAS = {
+    "100": {"cursos": 100, "estudiantes": 1_000, "inscripciones": 5_000},
+    "10k": {"cursos": 10_000, "estudiantes": 20_000, "inscripciones": 200_000},
+    "100k": {"cursos": 100_000, "estudiantes": 100_000, "inscripciones": 1_000_000},
+}
+DIRECTORIO_RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+
+# Cupos libres que se dejan en cada curso sembrado para que POST /api/inscripciones pueda inscribir
+HOLGURA_CUPO = 20
+
+
+# ==================== DATOS SINTÉTICOS ====================
+
+def etiqueta(escala):
+    return f"BENCH{escala.upper()}"
+
+
+def sembrar(escala):
+    """Crea (o reutiliza) los datos de la escala. Retorna (códigos de curso, ids de estudiante)."""
+    tam = ESCALAS[escala]
+    tag = etiqueta(escala)
+    with conexion() as conn, conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM cursos WHERE codigo LIKE %s", (f"{tag}-%",))
+        if cur.fetchone()[0] != tam["cursos"]:
+            print(f"Sembrando escala {escala}: {tam} ...")
+            inicio = time.perf_counter()
+            _borrar(cur, tag)
+            cur.execute("""
+                INSERT INTO cursos (codigo, nombre, cupo, creditos, estado, semestre)
+                SELECT %(tag)s || '-' || g, 'Curso sintético ' || g, 1, 1 + g %% 4,
+                       CASE WHEN g %% 10 = 0 THEN 'pendiente' ELSE 'aprobado' END, 1 + g %% 10
+                FROM generate_series(0, %(n)s - 1) g
+            """, {"tag": tag, "n": tam["cursos"]})
+            cur.execute("""
+                INSERT INTO estudiantes (nombre, programa)
+                SELECT 'Estudiante ' || g, %(tag)s FROM generate_series(0, %(n)s - 1) g
+            """, {"tag": tag, "n": tam["estudiantes"]})
+            cur.execute("SELECT MIN(id_estudiante), MAX(id_estudiante) FROM estudiantes WHERE programa = %s", (tag,))
+            primero, ultimo = cur.fetchone()
+            if ultimo - primero + 1 != tam["estudiantes"]:
+                raise RuntimeError("Los ids de estudiantes sembrados no son contiguos; reintenta sin carga concurrente")
+            # Pares (estudiante, curso) sin repetir: el estudiante g % E toma cursos consecutivos
+            cur.execute("""
+                INSERT INTO inscripciones (estudiante_id, curso_id)
+                SELECT %(primero)s + g %% %(e)s, c.id_curso
+                FROM generate_series(0, %(n)s - 1) g
+                JOIN cursos c ON c.codigo = %(tag)s || '-' || ((g / %(e)s + g %% %(e)s) %% %(c)s)
+            """, {"primero": primero, "e": tam["estudiantes"], "c": tam["cursos"],
+                  "n": tam["inscripciones"], "tag": tag})
+            cur.execute("""
+                UPDATE cursos c SET inscritos = x.n, cupo = x.n + %s
+                FROM (
+                    SELECT c.id_curso, COUNT(i.id) AS n
+                    FROM cursos c LEFT JOIN inscripciones i ON i.curso_id = c.id_curso
+                    WHERE c.codigo LIKE %s
+                    GROUP BY c.id_curso
+                ) x
+                WHERE c.id_curso = x.id_curso
+            """, (HOLGURA_CUPO, f"{tag}-%"))
+            print(f"Datos sembrados en {time.perf_counter() - inicio:.1f}s")
+        cur.execute("SELECT codigo FROM cursos WHERE codigo LIKE %s", (f"{tag}-%",))
+        codigos = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT id_estudiante FROM estudiantes WHERE programa = %s", (tag,))
+        estudiantes = [row[0] for row in cur.fetchall()]
+    with conexion() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE cursos, estudiantes, inscripciones")
+        conn.autocommit = False
+    return codigos, estudiantes
+
+
+def limpiar(escala):
+    with conexion() as conn, conn.cursor() as cur:
+        _borrar(cur, etiqueta(escala))
+
+
+def _borrar(cur, tag):
+    cur.execute("DELETE FROM cursos WHERE codigo LIKE %s", (f"{tag}-%",))
+    cur.execute("DELETE FROM estudiantes WHERE programa = %s", (tag,))
+
+
+# ==================== CONTADOR DE CONSULTAS ====================
+
+class ContadorConsultas:
+    """Total de sentencias (pg_stat_statements) o de transacciones (pg_stat_database) en la base."""
+
+    def __init__(self):
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+            self.fuente = "pg_stat_statements" if cur.fetchone() else "pg_stat_database"
+        # Lo que suma cada llamada a leer() (para descontarlo)
+        self.propias = 2 if self.fuente == "pg_stat_statements" else 1
+
+    def leer(self):
+        # Las estadísticas se publican con un pequeño retraso
+        time.sleep(1.0)
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_stat_clear_snapshot()")
+            if self.fuente == "pg_stat_statements":
+                cur.execute("SELECT COALESCE(SUM(calls), 0) FROM pg_stat_statements")
+            else:
+                cur.execute("""
+                    SELECT xact_commit + xact_rollback FROM pg_stat_database
+                    WHERE datname = current_database()
+                """)
+            return int(cur.fetchone()[0])
+
+
+# ==================== CARGA HTTP ====================
+
+class Escenarios:
+    """Genera requests (nombre, método, ruta, cuerpo) sobre los datos sembrados."""
+
+    def __init__(self, codigos, estudiantes, semilla):
+        self.codigos = codigos
+        self.estudiantes = estudiantes
+        self._local = threading.local()
+        self._semilla = semilla
+        self._contador = 0
+        self._lock = threading.Lock()
+
+    def _rnd(self):
+        rnd = getattr(self._local, "rnd", None)
+        if rnd is None:
+            with self._lock:
+                self._contador += 1
+                rnd = self._local.rnd = random.Random(self._semilla * 1000 + self._contador)
+        return rnd
+
+    def cursos(self):
+        rnd = self._rnd()
+        return "GET", f"/api/cursos?estado=aprobado&semestre={rnd.randint(1, 10)}&limite=50", None
+
+    def curso(self):
+        return "GET", f"/api/cursos/{self._rnd().choice(self.codigos)}", None
+
+    def inscripcion(self):
+        rnd = self._rnd()
+        cuerpo = {"estudiante_id": rnd.choice(self.estudiantes), "curso_codigo": rnd.choice(self.codigos)}
+        return "POST", "/api/inscripciones", cuerpo
+
+    def estadisticas(self):
+        return "GET", "/api/estadisticas", None
+
+    def chat(self):
+        rnd = self._rnd()
+        texto = rnd.choice(PLANTILLAS).format(codigo=rnd.choice(self.codigos).lower(), n=rnd.randint(1, 10))
+        return "POST", "/chat", {"text": texto, "estudiante_id": rnd.choice(self.estudiantes)}
+
+    def todos(self):
+        return {
+            "GET /api/cursos": self.cursos,
+            "GET /api/cursos/{codigo}": self.curso,
+            "POST /api/inscripciones": self.inscripcion,
+            "GET /api/estadisticas": self.estadisticas,
+            "POST /chat": self.chat,
+        }
+
+
+def percentil(ordenados, p):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def correr_carga(url, generadores, concurrencia, duracion):
+    """
+    Lanza `concurrencia` hilos que eligen al azar entre `generadores` durante
+    `duracion` segundos. Retorna {nombre: (latencias_ms, códigos)} y la duración real.
+    """
+    destino = urlsplit(url)
+    nombres = list(generadores)
+    fin = time.perf_counter() + duracion
+
+    def trabajador(indice):
+        rnd = random.Random(indice)
+        conn = http.client.HTTPConnection(destino.hostname, destino.port or 80, timeout=30)
+        locales = {nombre: ([], Counter()) for nombre in nombres}
+        while time.perf_counter() < fin:
+            nombre = rnd.choice(nombres)
+            metodo, ruta, cuerpo = generadores[nombre]()
+            datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+            cabeceras = {"Content-Type": "application/json"} if datos else {}
+            inicio = time.perf_counter()
+            try:
+                conn.request(metodo, ruta, body=datos, headers=cabeceras)
+                respuesta = conn.getresponse()
+                respuesta.read()
+                codigo = respuesta.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(destino.hostname, destino.port or 80, timeout=30)
+                codigo = "error_red"
+            latencias, codigos = locales[nombre]
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            codigos[codigo] += 1
+        conn.close()
+        return locales
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        parciales = list(ejecutor.map(trabajador, range(concurrencia)))
+    real = time.perf_counter() - inicio
+
+    totales = {nombre: ([], Counter()) for nombre in nombres}
+    for locales in parciales:
+        for nombre, (latencias, codigos) in locales.items():
+            totales[nombre][0].extend(latencias)
+            totales[nombre][1].update(codigos)
+    return totales, real
+
+
+def resumir(latencias, codigos, duracion, consultas=None):
+    ordenadas = sorted(latencias)
+    n = len(ordenadas)
+    resumen = {
+        "requests": n,
+        "rps": round(n / duracion, 1),
+        "p50_ms": round(percentil(ordenadas, 50), 2) if n else None,
+        "p95_ms": round(percentil(ordenadas, 95), 2) if n else None,
+        "p99_ms": round(percentil(ordenadas, 99), 2) if n else None,
+        "promedio_ms": round(sum(ordenadas) / n, 2) if n else None,
+        "codigos": {str(k): v for k, v in sorted(codigos.items(), key=lambda kv: str(kv[0]))},
+        "errores": sum(v for k, v in codigos.items() if k == "error_red" or k >= 500),
+    }
+    if consultas is not None:
+        resumen["consultas_por_request"] = round(consultas / n, 2) if n else None
+    return resumen
+
+
+# ==================== RESULTADOS ====================
+
+def commit_actual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(__file__), text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, anterior, umbral):
+    """Imprime la variación de p95 y rps por endpoint. Retorna las regresiones encontradas."""
+    regresiones = []
+    print(f"\nComparación con {anterior.get('commit')} ({anterior.get('fecha')}):")
+    for nombre, res in actual["endpoints"].items():
+        previo = anterior.get("endpoints", {}).get(nombre)
+        if not previo or not previo.get("p95_ms") or not res.get("p95_ms"):
+            continue
+        d_p95 = (res["p95_ms"] - previo["p95_ms"]) / previo["p95_ms"]
+        d_rps = (res["rps"] - previo["rps"]) / previo["rps"] if previo["rps"] else 0.0
+        marca = ""
+        if d_p95 > umbral or d_rps < -umbral:
+            marca = "  ⚠️ regresión"
+            regresiones.append(nombre)
+        print(f"  {nombre:<28} p95 {previo['p95_ms']:>8.2f} -> {res['p95_ms']:>8.2f} ms ({d_p95:+.0%})"
+              f"   rps {previo['rps']:>8.1f} -> {res['rps']:>8.1f} ({d_rps:+.0%}){marca}")
+    return regresiones
+
+
+def imprimir(nombre, res):
+    consultas = res.get("consultas_por_request")
+    print(f"  {nombre:<28} {res['requests']:>7} req {res['rps']:>8.1f} rps"
+          f"  p50 {res['p50_ms'] or 0:>7.2f}  p95 {res['p95_ms'] or 0:>7.2f}  p99 {res['p99_ms'] or 0:>7.2f} ms"
+          + (f"  {consultas:>5.2f} consultas/req" if consultas is not None else "")
+          + (f"  errores {res['errores']}" if res["errores"] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--escala", choices=list(ESCALAS), default="100")
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos por endpoint y de la fase mixta")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto en backend/bench/resultados/)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--umbral", type=float, default=0.10, help="variación que cuenta como regresión")
+    parser.add_argument("--limpiar", action="store_true", help="borrar los datos sembrados al terminar")
+    args = parser.parse_args()
+
+    codigos, estudiantes = sembrar(args.escala)
+    escenarios = Escenarios(codigos, estudiantes, args.semilla).todos()
+    contador = ContadorConsultas()
+
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "escala": args.escala,
+        "tamano": ESCALAS[args.escala],
+        "concurrencia": args.concurrencia,
+        "duracion_s": args.duracion,
+        "fuente_consultas": contador.fuente,
+        "python": platform.python_version(),
+        "endpoints": {},
+    }
+
+    try:
+        print(f"\nEndpoints por separado ({args.concurrencia} hilos, {args.duracion:.0f}s c/u, "
+              f"consultas según {contador.fuente}):")
+        for nombre, generador in escenarios.items():
+            antes = contador.leer()
+            medidas, real = correr_carga(args.url, {nombre: generador}, args.concurrencia, args.duracion)
+            consultas = contador.leer() - antes - contador.propias
+            latencias, codigos_http = medidas[nombre]
+            resultado["endpoints"][nombre] = resumir(latencias, codigos_http, real, consultas)
+            imprimir(nombre, resultado["endpoints"][nombre])
+
+        print(f"\nMezcla de todos los endpoints ({args.concurrencia} hilos, {args.duracion:.0f}s):")
+        medidas, real = correr_carga(args.url, escenarios, args.concurrencia, args.duracion)
+        todas = [lat for latencias, _ in medidas.values() for lat in latencias]
+        codigos_mixtos = Counter()
+        for _, codigos_http in medidas.values():
+            codigos_mixtos.update(codigos_http)
+        resultado["mixto"] = {
+            "total": resumir(todas, codigos_mixtos, real),
+            "endpoints": {nombre: resumir(lat, cod, real) for nombre, (lat, cod) in medidas.items()},
+        }
+        for nombre, res in resultado["mixto"]["endpoints"].items():
+            imprimir(nombre, res)
+        imprimir("total", resultado["mixto"]["total"])
+    finally:
+        if args.limpiar:
+            limpiar(args.escala)
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        nombre = f"{datetime.now():%Y%m%d-%H%M%S}-{resultado['commit'] or 'sin-commit'}-{args.escala}.json"
+        salida = os.path.join(DIRECTORIO_RESULTADOS, nombre)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(resultado, json.load(f), args.umbral)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark del índice de búsqueda de cursos (no necesita base de datos).
+
+Arma un catálogo sintético, mide cuánto tarda en construirse el índice y la
+latencia de consultas típicas: palabras exactas, prefijos, errores de tipeo,
+códigos y palabras muy comunes.
+
+    python backend/bench/bench_busqueda.py --cursos 100000 --consultas 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from busqueda import IndiceCursos  # noqa: E402
+
+TEMAS = [
+    "machine learning", "inteligencia artificial", "bases de datos", "redes neuronales",
+    "programación", "cálculo", "álgebra lineal", "estadística", "física", "química",
+    "sistemas operativos", "compiladores", "seguridad informática", "computación gráfica",
+    "ingeniería de software", "arquitectura de computadores", "robótica", "visión por computador",
+    "procesamiento de lenguaje natural", "análisis de algoritmos", "economía", "finanzas",
+]
+NIVELES = ["introducción a", "fundamentos de", "", "avanzado de", "taller de", "seminario de", "laboratorio de"]
+LINEAS = ["Inteligencia Artificial", "Ciencia de Datos", "Ingeniería de Software", "Ciencias Básicas",
+          "Seguridad", "Gestión"]
+PREFIJOS = ["IA", "BD", "MAT", "FIS", "SIS", "ING", "ECO", "SEG"]
+
+CONSULTAS = [
+    "machine learning", "machin lerning", "intro progra", "bases de datos avanzado",
+    "redes", "estadistica", "vision computador", "IA-5", "{codigo}", "introduccion",
+    "laboratorio de fisica", "seguridad", "compiladores taller", "algebra",
+]
+
+
+def generar_catalogo(n, semilla):
+    rnd = random.Random(semilla)
+    filas = []
+    for i in range(n):
+        tema = rnd.choice(TEMAS)
+        nombre = f"{rnd.choice(NIVELES)} {tema} {rnd.choice(['', 'I', 'II', 'III'])}".strip().capitalize()
+        codigo = f"{rnd.choice(PREFIJOS)}-{i:05d}"
+        estado = "aprobado" if rnd.random() < 0.8 else "pendiente"
+        filas.append((i + 1, codigo, nombre, estado, rnd.randint(1, 10), rnd.choice(LINEAS)))
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cursos", type=int, default=100_000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    filas = generar_catalogo(args.cursos, args.semilla)
+    inicio = time.perf_counter()
+    indice = IndiceCursos(filas)
+    print(f"índice de {len(indice):,} cursos construido en {(time.perf_counter() - inicio) * 1000:.0f} ms "
+          f"({indice.metricas()['palabras']} palabras)")
+
+    rnd = random.Random(args.semilla)
+    print(f"{'consulta':<28} {'p50 ms':>8} {'p99 ms':>8}  primer resultado")
+    for plantilla in CONSULTAS:
+        tiempos = []
+        resultados = []
+        for _ in range(max(1, args.consultas // len(CONSULTAS))):
+            texto = plantilla.format(codigo=rnd.choice(filas)[1])
+            inicio = time.perf_counter()
+            resultados = indice.buscar(texto, limite=10, estado="aprobado")
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        tiempos.sort()
+        p99 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))]
+        primero = f"{resultados[0]['codigo']} {resultados[0]['nombre']}" if resultados else "-"
+        print(f"{plantilla:<28} {statistics.median(tiempos):>8.2f} {p99:>8.2f}  {primero}")
+
+
+if __name__ == "__main__":
+    main()
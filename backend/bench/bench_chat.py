@@ -0,0 +1,107 @@
+"""
+Benchmark del clasificador de intenciones de /chat (no necesita base de datos).
+
+Compara la antigua cadena de if/elif con `in` contra RouterIntenciones sobre un
+corpus de mensajes de ejemplo, verifica que ambos den la misma intención y
+mide la extracción de códigos contra un índice en memoria.
+
+    python backend/bench/bench_chat.py --mensajes 100000 --cursos 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from intenciones import router_intenciones, extraer_codigo  # noqa: E402
+
+PLANTILLAS = [
+    "buscar cursos disponibles",
+    "quiero ver los cursos de este semestre",
+    "inscribirme en {codigo}",
+    "me quiero inscribir en {codigo} por favor",
+    "inscribir {codigo}",
+    "mi progreso",
+    "quiero el reporte de mi carrera",
+    "mis inscripciones",
+    "ver inscripciones actuales",
+    "tengo notificaciones?",
+    "algún aviso nuevo",
+    "filtrar por semestre {n}",
+    "cursos del semestre {n}",
+    "crear curso nuevo",
+    "aprobar solicitudes",
+    "qué hay pendiente",
+    "estadisticas generales",
+    "hola",
+    "gracias, eso es todo",
+]
+
+
+def clasificar_if_elif(text):
+    """Réplica de la cadena original de api.py, como referencia."""
+    if "buscar" in text or "curso" in text or "disponible" in text:
+        return "buscar"
+    elif "inscrib" in text:
+        return "inscribir"
+    elif "reporte" in text or "progreso" in text:
+        return "progreso"
+    elif "mis inscripc" in text or "inscripciones" in text:
+        return "inscripciones"
+    elif "notificacion" in text or "aviso" in text:
+        return "notificaciones"
+    elif "semestre" in text or "filtrar" in text:
+        return "semestre"
+    elif "crear curso" in text:
+        return "crear_curso"
+    elif "aprobar" in text or "pendiente" in text:
+        return "aprobar"
+    elif "estadistica" in text or "reporte" in text:
+        return "estadisticas"
+    return None
+
+
+def generar_corpus(n, codigos, semilla):
+    rnd = random.Random(semilla)
+    codigos = list(codigos)
+    return [
+        rnd.choice(PLANTILLAS).format(codigo=rnd.choice(codigos).lower(), n=rnd.randint(1, 10))
+        for _ in range(n)
+    ]
+
+
+def medir(nombre, funcion, corpus):
+    inicio = time.perf_counter()
+    for texto in corpus:
+        funcion(texto)
+    duracion = time.perf_counter() - inicio
+    print(f"{nombre:<32} {len(corpus) / duracion:>12,.0f} msg/s  {duracion / len(corpus) * 1e6:>8.2f} µs/msg")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mensajes", type=int, default=100_000)
+    parser.add_argument("--cursos", type=int, default=10_000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    codigos = frozenset(f"C{i:05d}" for i in range(args.cursos)) | {"IA-501", "MAL101"}
+    corpus = generar_corpus(args.mensajes, codigos, args.semilla)
+    corpus_lower = [t.lower() for t in corpus]
+
+    diferencias = [t for t in corpus_lower if clasificar_if_elif(t) != router_intenciones.clasificar(t)]
+    if diferencias:
+        print(f"❌ {len(diferencias)} mensajes clasificados distinto, p. ej.: {diferencias[0]!r}")
+        sys.exit(1)
+
+    print(f"{args.mensajes:,} mensajes, índice de {len(codigos):,} códigos, consultas a BD por mensaje: 0")
+    medir("if/elif (referencia)", clasificar_if_elif, corpus_lower)
+    medir("RouterIntenciones.clasificar", router_intenciones.clasificar, corpus_lower)
+    medir("clasificar + extraer_codigo", lambda t: (router_intenciones.clasificar(t.lower()),
+                                                    extraer_codigo(t, codigos)), corpus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark de la serialización de listados (no necesita base de datos).
+
+Compara, sobre filas sintéticas con los mismos tipos que devuelve psycopg, el
+camino anterior de los listados (objetos con __dict__ -> dict por campo ->
+jsonable_encoder -> json.dumps) contra los dos actuales: modelos con
+__slots__ proyectados a dicts, y dicts armados directamente de las filas;
+ambos codificados con orjson (RespuestaJSON). Verifica que los tres produzcan
+el mismo JSON y mide también la memoria por objeto de los modelos.
+
+    python backend/bench/bench_serializacion.py --filas 200 --repeticiones 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from controller.inscripcion_controller import CAMPOS_INSCRIPCION  # noqa: E402
+from model.Curso import Curso  # noqa: E402
+from model.Inscripcion import Inscripcion  # noqa: E402
+from serializacion import RespuestaJSON, filas_a_dicts, proyectar  # noqa: E402
+
+
+class InscripcionAnterior:
+    """Réplica del modelo original (atributos en __dict__), como referencia."""
+
+    def __init__(self, id, estudiante_id, curso_id, fecha_inscripcion, estado, nota=None):
+        self.id = id
+        self.estudiante_id = estudiante_id
+        self.curso_id = curso_id
+        self.fecha_inscripcion = fecha_inscripcion
+        self.estado = estado
+        self.nota = float(nota) if nota is not None else None
+
+
+class CursoAnterior:
+    def __init__(self, id_curso, nombre, cupo, creditos, cronograma=None, estado="pendiente",
+                 codigo=None, semestre=None):
+        self.id_curso = id_curso
+        self.nombre = nombre
+        self.cupo = cupo
+        self.creditos = creditos
+        self.cronograma = cronograma if cronograma else []
+        self.estado = estado
+        self.codigo = codigo
+        self.semestre = semestre
+
+
+def filas_inscripciones(n):
+    hoy = date(2025, 1, 15)
+    return [
+        (i, 1000 + i % 500, 1 + i % 40, hoy + timedelta(days=i % 90),
+         ("pendiente", "aprobado", "reprobado")[i % 3], Decimal("4.2") if i % 3 == 1 else None)
+        for i in range(1, n + 1)
+    ]
+
+
+def filas_cursos(n):
+    return [
+        (i, f"Curso de prueba número {i}", 30, 3, [{"dia": "lunes", "hora": "08:00"}], "aprobado",
+         f"C{i:05d}", 1 + i % 10)
+        for i in range(1, n + 1)
+    ]
+
+
+# ---------------- caminos de serialización ---------------- #
+
+def anterior(filas):
+    inscripciones = [InscripcionAnterior(*f) for f in filas]
+    data = [
+        {"id": i.id, "estudiante_id": i.estudiante_id, "curso_id": i.curso_id,
+         "fecha_inscripcion": i.fecha_inscripcion, "estado": i.estado, "nota": i.nota}
+        for i in inscripciones
+    ]
+    contenido = {"type": "inscripciones", "data": data, "count": len(data), "next_cursor": None}
+    return JSONResponse(jsonable_encoder(contenido)).body
+
+
+def modelos_slots(filas):
+    data = proyectar([Inscripcion(*f) for f in filas], CAMPOS_INSCRIPCION)
+    return RespuestaJSON({"type": "inscripciones", "data": data, "count": len(data), "next_cursor": None}).body
+
+
+def filas_directas(filas):
+    data = filas_a_dicts(CAMPOS_INSCRIPCION, filas)
+    return RespuestaJSON({"type": "inscripciones", "data": data, "count": len(data), "next_cursor": None}).body
+
+
+CAMINOS = [
+    ("anterior (__dict__ + json)", anterior),
+    ("__slots__ + orjson", modelos_slots),
+    ("filas directas + orjson", filas_directas),
+]
+
+
+def medir(nombre, funcion, filas, repeticiones, base=None):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(filas)
+    duracion = time.perf_counter() - inicio
+    por_fila = duracion / (repeticiones * len(filas)) * 1e6
+    mejora = f"  x{base / por_fila:.1f}" if base else ""
+    print(f"{nombre:<30} {repeticiones / duracion:>10,.0f} listados/s  {por_fila:>7.3f} µs/fila{mejora}")
+    return por_fila
+
+
+def memoria_por_objeto(clase, filas):
+    tracemalloc.start()
+    objetos = [clase(*f) for f in filas]
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Se descuenta la lista que los contiene
+    return (actual - sys.getsizeof(objetos)) / len(objetos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=200, help="filas por listado (tamaño de página)")
+    parser.add_argument("--repeticiones", type=int, default=2000)
+    parser.add_argument("--objetos", type=int, default=100_000, help="objetos para medir memoria")
+    args = parser.parse_args()
+
+    filas = filas_inscripciones(args.filas)
+    salidas = [json.loads(f(filas)) for _, f in CAMINOS]
+    if any(s != salidas[0] for s in salidas[1:]):
+        print("❌ Los caminos de serialización no producen el mismo JSON")
+        sys.exit(1)
+
+    print(f"Listado de {args.filas} inscripciones, {args.repeticiones:,} repeticiones")
+    base = None
+    for nombre, funcion in CAMINOS:
+        por_fila = medir(nombre, funcion, filas, args.repeticiones, base)
+        base = base or por_fila
+
+    print(f"\nMemoria por objeto ({args.objetos:,} objetos)")
+    muestras = [
+        ("Inscripcion", InscripcionAnterior, Inscripcion, filas_inscripciones(args.objetos)),
+        ("Curso", CursoAnterior, Curso, filas_cursos(args.objetos)),
+    ]
+    for nombre, clase_anterior, clase, filas_modelo in muestras:
+        antes = memoria_por_objeto(clase_anterior, filas_modelo)
+        ahora = memoria_por_objeto(clase, filas_modelo)
+        print(f"{nombre:<12} __dict__ {antes:>7.0f} B   __slots__ {ahora:>7.0f} B   ({ahora / antes:.0%})")
+
+
+if __name__ == "__main__":
+    main()
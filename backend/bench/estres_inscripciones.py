@@ -0,0 +1,117 @@
+"""
+Prueba de estrés de inscripciones concurrentes a un mismo curso.
+
+Crea un curso con `--cupo` cupos y `--estudiantes` estudiantes, lanza
+`--hilos` hilos que intentan inscribirlos a todos a la vez (cada estudiante
+además reintenta `--reintentos` veces) y verifica que:
+
+  - el curso nunca queda sobrecupado (inscritos == cupo),
+  - ningún estudiante queda inscrito dos veces,
+  - los reintentos de quien ya estaba inscrito no consumen cupos,
+  - el contador cursos.inscritos coincide con las filas de inscripciones.
+
+Usa la base configurada en las variables PG* (ver database.py). Al terminar
+borra los datos que creó.
+
+    PGPOOL_MAX=20 python backend/bench/estres_inscripciones.py --cupo 30 --estudiantes 500
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import conexion, metricas_pool  # noqa: E402
+from controller.inscripcion_controller import InscripcionController, CupoAgotadoError  # noqa: E402
+
+
+def preparar(cupo, n_estudiantes):
+    codigo = f"STRESS-{uuid.uuid4().hex[:8]}"
+    with conexion() as conn, conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO cursos (codigo, nombre, cupo, creditos, estado, semestre)
+            VALUES (%s, 'Curso de estrés', %s, 3, 'aprobado', 1)
+            RETURNING id_curso
+        """, (codigo, cupo))
+        curso_id = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO estudiantes (nombre, programa)
+            SELECT 'estres-' || g, %s FROM generate_series(1, %s) g
+            RETURNING id_estudiante
+        """, (codigo, n_estudiantes))
+        estudiantes = [row[0] for row in cur.fetchall()]
+    return codigo, curso_id, estudiantes
+
+
+def limpiar(codigo, curso_id):
+    with conexion() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM cursos WHERE id_curso = %s", (curso_id,))
+        cur.execute("DELETE FROM estudiantes WHERE programa = %s", (codigo,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cupo", type=int, default=30)
+    parser.add_argument("--estudiantes", type=int, default=300)
+    parser.add_argument("--hilos", type=int, default=32)
+    parser.add_argument("--reintentos", type=int, default=2)
+    args = parser.parse_args()
+
+    ctrl = InscripcionController()
+    codigo, curso_id, estudiantes = preparar(args.cupo, args.estudiantes)
+    resultados = Counter()
+
+    def intentar(estudiante_id):
+        locales = Counter()
+        for _ in range(1 + args.reintentos):
+            try:
+                _, creada = ctrl.inscribir(estudiante_id, curso_id)
+                locales["creadas" if creada else "repetidas"] += 1
+            except CupoAgotadoError:
+                locales["sin_cupo"] += 1
+        return locales
+
+    try:
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.hilos) as ejecutor:
+            for locales in ejecutor.map(intentar, estudiantes):
+                resultados.update(locales)
+        duracion = time.perf_counter() - inicio
+
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*), COUNT(DISTINCT estudiante_id) FROM inscripciones WHERE curso_id = %s",
+                        (curso_id,))
+            inscritos, distintos = cur.fetchone()
+            cur.execute("SELECT inscritos FROM cursos WHERE id_curso = %s", (curso_id,))
+            contador = cur.fetchone()[0]
+
+        intentos = sum(resultados.values())
+        print(f"Intentos: {intentos} en {duracion:.2f}s ({intentos / duracion:.0f} intentos/s)")
+        print(f"Resultados: {dict(resultados)}")
+        print(f"Inscritos: {inscritos} / cupo {args.cupo} (estudiantes distintos: {distintos})")
+        print(f"Pool: {metricas_pool()}")
+
+        esperados = min(args.cupo, args.estudiantes)
+        errores = []
+        if inscritos != esperados:
+            errores.append(f"se esperaban {esperados} inscritos y hay {inscritos}")
+        if distintos != inscritos:
+            errores.append("hay estudiantes inscritos más de una vez")
+        if contador != inscritos:
+            errores.append(f"el contador cursos.inscritos ({contador}) no coincide con la tabla")
+        if resultados["creadas"] != inscritos:
+            errores.append("el número de inscripciones creadas no coincide con la tabla")
+        if errores:
+            print("❌ " + "; ".join(errores))
+            sys.exit(1)
+        print("✅ Sin sobrecupo ni inscripciones duplicadas")
+    finally:
+        limpiar(codigo, curso_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Control de admisión para los picos de tráfico de la ventana de matrícula.
+
+`MiddlewareAdmision` (ASGI) se pone delante de las rutas que inscriben
+(`RUTAS_ADMISION`) y decide, antes de que el request toque la base:
+
+1. Límite por estudiante (token bucket): quien reintenta en bucle recibe 429
+   con Retry-After y no les quita lugar a los demás.
+2. Límite global (token bucket): lo que pasa de la tasa no se rechaza a ciegas,
+   recibe un turno en la sala de espera virtual (503 con el turno y Retry-After).
+3. Cola de trabajo acotada: como mucho `ADMISION_CONCURRENCIA` requests
+   admitidos a la vez (del orden del pool de conexiones) y `ADMISION_COLA`
+   esperando, cada uno a lo sumo `ADMISION_ESPERA_MAX` segundos. Lo que no
+   entra se descarta enseguida, también con turno, en vez de acumularse hasta
+   que todos den timeout: los admitidos mantienen una latencia acotada.
+
+El turno es un token firmado (HMAC) con el estudiante y el momento desde el
+que puede pasar; esos momentos se reparten a `ADMISION_TASA_SALA` por segundo
+en orden de llegada. Consultarlo (`GET /api/sala-espera`) solo verifica la
+firma y compara con el reloj: no toca la base ni guarda estado. Con el turno
+listo, el cliente reintenta con el header `X-Sala-Espera` y pasa sin competir
+por el límite global ni por el largo de la cola (el límite por estudiante se
+aplica igual).
+
+Todo es por proceso: con varios workers de uvicorn cada uno lleva sus cubos y
+su cola, así que los límites globales se multiplican por la cantidad de
+workers. Para que un turno emitido por un worker valga en otro, todos deben
+compartir `ADMISION_SECRETO`.
+
+Variables de entorno (0 desactiva el límite correspondiente):
+    ADMISION                    0 desactiva todo el control de admisión (por defecto 1)
+    ADMISION_TASA_GLOBAL        requests/s admitidos por proceso (por defecto 200)
+    ADMISION_RAFAGA_GLOBAL      ráfaga permitida sobre esa tasa (por defecto 2 × la tasa)
+    ADMISION_TASA_ESTUDIANTE    requests/s por estudiante (por defecto 1)
+    ADMISION_RAFAGA_ESTUDIANTE  ráfaga por estudiante (por defecto 5)
+    ADMISION_CONCURRENCIA       requests admitidos a la vez (por defecto PGPOOL_MAX)
+    ADMISION_COLA               requests esperando un lugar (por defecto 100)
+    ADMISION_ESPERA_MAX         segundos máximos en la cola (por defecto 2)
+    ADMISION_TASA_SALA          turnos de la sala que se habilitan por segundo (por defecto la tasa global)
+    ADMISION_VIGENCIA_TURNO     segundos que un turno listo sirve para entrar (por defecto 60)
+    ADMISION_SECRETO            clave de firma de los turnos (por defecto una al azar por proceso)
+"""
+import asyncio
+import hashlib
+import hmac
+import math
+import os
+import secrets
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+import orjson
+
+from serializacion import RespuestaJSON
+
+ADMISION = os.getenv("ADMISION", "1") != "0"
+TASA_GLOBAL = float(os.getenv("ADMISION_TASA_GLOBAL", "200"))
+RAFAGA_GLOBAL = float(os.getenv("ADMISION_RAFAGA_GLOBAL", str(2 * TASA_GLOBAL)))
+TASA_ESTUDIANTE = float(os.getenv("ADMISION_TASA_ESTUDIANTE", "1"))
+RAFAGA_ESTUDIANTE = float(os.getenv("ADMISION_RAFAGA_ESTUDIANTE", "5"))
+CONCURRENCIA = int(os.getenv("ADMISION_CONCURRENCIA", os.getenv("PGPOOL_MAX", "10")))
+MAX_COLA = int(os.getenv("ADMISION_COLA", "100"))
+ESPERA_MAX = float(os.getenv("ADMISION_ESPERA_MAX", "2"))
+TASA_SALA = float(os.getenv("ADMISION_TASA_SALA", str(TASA_GLOBAL or 50)))
+VIGENCIA_TURNO = float(os.getenv("ADMISION_VIGENCIA_TURNO", "60"))
+SECRETO = os.getenv("ADMISION_SECRETO") or secrets.token_hex(32)
+
+# Cubos por estudiante que se guardan como mucho (los menos recientes se descartan: estarían llenos)
+MAX_CUBOS_ESTUDIANTE = 100_000
+
+# (método, ruta) que pasan por el control de admisión
+RUTAS_ADMISION = frozenset({
+    ("POST", "/api/inscripciones"),
+    ("POST", "/inscripciones/"),
+    ("POST", "/chat"),
+    ("POST", "/chatbot/"),
+})
+
+HEADER_TURNO = b"x-sala-espera"
+
+
+class CuboTokens:
+    """
+    Token bucket: `capacidad` tokens que se reponen a `tasa` por segundo.
+    Lo usa solo el event loop, así que no lleva lock.
+    """
+
+    __slots__ = ("tasa", "capacidad", "_tokens", "_ultimo")
+
+    def __init__(self, tasa, capacidad):
+        self.tasa = tasa
+        self.capacidad = max(capacidad, 1.0)
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+
+    def _reponer(self, ahora):
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def tomar(self):
+        """0.0 si había un token; si no, los segundos que faltan para el próximo."""
+        self._reponer(time.monotonic())
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.tasa
+
+    def forzar(self):
+        """Toma un token aunque no haya (queda en deuda): los turnos de la sala cuentan contra la tasa."""
+        self._reponer(time.monotonic())
+        self._tokens = max(self._tokens - 1, -self.capacidad)
+
+
+class ColaTrabajo:
+    """
+    Como mucho `concurrencia` requests adentro y `max_cola` esperando, cada uno
+    a lo sumo `espera_max` segundos. `entrar` retorna False si el request se
+    descarta; si retorna True hay que llamar a `salir` al terminar.
+    """
+
+    def __init__(self, concurrencia, max_cola, espera_max):
+        self.concurrencia = concurrencia
+        self.max_cola = max_cola
+        self.espera_max = espera_max
+        self._semaforo = asyncio.Semaphore(concurrencia)
+        self.en_curso = 0
+        self.esperando = 0
+
+    async def entrar(self, prioridad=False):
+        if self._semaforo.locked():
+            # Sin lugar libre: solo se espera si la cola no está llena (los turnos de la sala no miran el largo)
+            if self.esperando >= self.max_cola and not prioridad:
+                return False
+            self.esperando += 1
+            try:
+                await asyncio.wait_for(self._semaforo.acquire(), self.espera_max or None)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.esperando -= 1
+        else:
+            await self._semaforo.acquire()
+        self.en_curso += 1
+        return True
+
+    def salir(self):
+        self.en_curso -= 1
+        self._semaforo.release()
+
+
+class SalaEspera:
+    """
+    Turnos firmados "listo_ms:clave.firma". El proceso solo recuerda el último
+    momento asignado; validar o consultar un turno no necesita estado.
+    """
+
+    def __init__(self, secreto, tasa, vigencia):
+        self._secreto = secreto.encode()
+        self.tasa = tasa
+        self.vigencia = vigencia
+        self._ultimo = 0.0
+        self.emitidos = 0
+
+    def _firma(self, contenido):
+        return hmac.new(self._secreto, contenido.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def emitir(self, clave):
+        """Un turno para `clave` al final de la fila. Retorna (token, estado) con el estado de `consultar`."""
+        ahora = time.time()
+        self._ultimo = max(ahora, self._ultimo) + 1 / self.tasa
+        contenido = f"{int(self._ultimo * 1000)}:{clave}"
+        self.emitidos += 1
+        return f"{contenido}.{self._firma(contenido)}", self._estado(self._ultimo, ahora)
+
+    def _leer(self, token):
+        """(listo_en, clave) de un turno bien firmado; None si no lo es."""
+        contenido, _, firma = (token or "").rpartition(".")
+        if not contenido or not hmac.compare_digest(firma, self._firma(contenido)):
+            return None
+        listo_ms, _, clave = contenido.partition(":")
+        try:
+            return int(listo_ms) / 1000, clave
+        except ValueError:
+            return None
+
+    def _estado(self, listo_en, ahora):
+        faltan = max(listo_en - ahora, 0.0)
+        return {
+            "listo": faltan == 0.0,
+            "posicion": math.ceil(faltan * self.tasa),
+            "espera_estimada": round(faltan, 1),
+        }
+
+    def consultar(self, token):
+        """{"listo", "posicion", "espera_estimada"} del turno; None si no es válido o ya venció."""
+        leido = self._leer(token)
+        if leido is None:
+            return None
+        ahora = time.time()
+        if ahora > leido[0] + self.vigencia:
+            return None
+        return self._estado(leido[0], ahora)
+
+    def puede_pasar(self, token, clave):
+        """El turno es de `clave`, ya le tocó y no venció."""
+        leido = self._leer(token)
+        return leido is not None and leido[1] == clave and leido[0] <= time.time() <= leido[0] + self.vigencia
+
+
+class ControlAdmision:
+    def __init__(self, tasa_global=TASA_GLOBAL, rafaga_global=RAFAGA_GLOBAL,
+                 tasa_estudiante=TASA_ESTUDIANTE, rafaga_estudiante=RAFAGA_ESTUDIANTE,
+                 concurrencia=CONCURRENCIA, max_cola=MAX_COLA, espera_max=ESPERA_MAX,
+                 tasa_sala=TASA_SALA, vigencia_turno=VIGENCIA_TURNO, secreto=SECRETO):
+        self._global = CuboTokens(tasa_global, rafaga_global) if tasa_global > 0 else None
+        self.tasa_estudiante = tasa_estudiante
+        self.rafaga_estudiante = rafaga_estudiante
+        self._por_estudiante = OrderedDict()
+        self.cola = ColaTrabajo(concurrencia, max_cola, espera_max) if concurrencia > 0 else None
+        self.sala = SalaEspera(secreto, tasa_sala, vigencia_turno)
+        self._contadores = {"admitidos": 0, "limitados_estudiante": 0, "limitados_global": 0,
+                            "descartados_cola": 0, "turnos_usados": 0}
+
+    def _cubo_estudiante(self, clave):
+        cubo = self._por_estudiante.get(clave)
+        if cubo is None:
+            cubo = self._por_estudiante[clave] = CuboTokens(self.tasa_estudiante, self.rafaga_estudiante)
+            if len(self._por_estudiante) > MAX_CUBOS_ESTUDIANTE:
+                self._por_estudiante.popitem(last=False)
+        else:
+            self._por_estudiante.move_to_end(clave)
+        return cubo
+
+    def _sala_espera(self, clave):
+        token, estado = self.sala.emitir(clave)
+        return RespuestaJSON(
+            {
+                "type": "sala_espera",
+                "token": token,
+                **estado,
+                "mensaje": "Hay mucha demanda en este momento: estás en la sala de espera.",
+            },
+            status_code=503,
+            headers={"Retry-After": str(max(1, math.ceil(estado["espera_estimada"])))},
+        )
+
+    async def admitir(self, clave, turno=None):
+        """
+        None si el request puede pasar (y entonces hay que llamar a `liberar`);
+        si no, la respuesta de rechazo (429 por estudiante, 503 con turno de la sala).
+        """
+        if self.tasa_estudiante > 0:
+            espera = self._cubo_estudiante(clave).tomar()
+            if espera:
+                self._contadores["limitados_estudiante"] += 1
+                return RespuestaJSON(
+                    {"detail": "Demasiadas solicitudes seguidas, intenta de nuevo en unos segundos"},
+                    status_code=429, headers={"Retry-After": str(math.ceil(espera))},
+                )
+
+        prioridad = turno is not None and self.sala.puede_pasar(turno, clave)
+        if prioridad:
+            self._contadores["turnos_usados"] += 1
+            if self._global is not None:
+                self._global.forzar()
+        elif self._global is not None and self._global.tomar():
+            self._contadores["limitados_global"] += 1
+            return self._sala_espera(clave)
+
+        if self.cola is not None and not await self.cola.entrar(prioridad):
+            self._contadores["descartados_cola"] += 1
+            return self._sala_espera(clave)
+        self._contadores["admitidos"] += 1
+        return None
+
+    def liberar(self):
+        if self.cola is not None:
+            self.cola.salir()
+
+    def metricas(self):
+        return {
+            **self._contadores,
+            "turnos_emitidos": self.sala.emitidos,
+            "en_curso": self.cola.en_curso if self.cola is not None else None,
+            "esperando": self.cola.esperando if self.cola is not None else None,
+            "estudiantes": len(self._por_estudiante),
+        }
+
+
+control_admision = ControlAdmision()
+
+
+def clave_solicitante(scope, cuerpo):
+    """El estudiante del request (cuerpo JSON o query string); sin estudiante, la IP del cliente."""
+    estudiante_id = None
+    if cuerpo:
+        try:
+            datos = orjson.loads(cuerpo)
+        except orjson.JSONDecodeError:
+            datos = None
+        if isinstance(datos, dict):
+            estudiante_id = datos.get("estudiante_id")
+    if estudiante_id is None:
+        estudiante_id = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("estudiante_id", [None])[0]
+    if estudiante_id is not None:
+        return f"e{estudiante_id}"
+    cliente = scope.get("client")
+    return f"ip{cliente[0] if cliente else ''}"
+
+
+class MiddlewareAdmision:
+    """
+    Aplica `control` a las rutas de `rutas`. Lee el cuerpo (JSON chico) para
+    saber qué estudiante es y después se lo reentrega intacto a la aplicación.
+    """
+
+    def __init__(self, app, control=None, rutas=RUTAS_ADMISION):
+        self.app = app
+        self.control = control or control_admision
+        self.rutas = rutas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.rutas:
+            await self.app(scope, receive, send)
+            return
+
+        mensajes = []
+        while True:
+            mensaje = await receive()
+            mensajes.append(mensaje)
+            if mensaje["type"] != "http.request" or not mensaje.get("more_body"):
+                break
+        cuerpo = b"".join(m.get("body", b"") for m in mensajes)
+        turno = dict(scope["headers"]).get(HEADER_TURNO)
+
+        rechazo = await self.control.admitir(clave_solicitante(scope, cuerpo),
+                                             turno.decode("latin-1") if turno else None)
+        if rechazo is not None:
+            await rechazo(scope, receive, send)
+            return
+
+        async def reentregar():
+            return mensajes.pop(0) if mensajes else await receive()
+
+        try:
+            await self.app(scope, reentregar, send)
+        finally:
+            self.control.liberar()
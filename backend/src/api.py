@@ -1,48 +1,95 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
-import re
+"""
+API de EduBot (única aplicación FastAPI del backend).
 
-# Importar tus controladores existentes
-from controller.inscripcion_controller import InscripcionController
+`crear_app()` arma la aplicación; los pools, la escucha de notificaciones y
+las cachés se inician en el lifespan (no al importar) y se precalientan
+antes de aceptar tráfico, así el primer request no paga conexiones en frío.
 
-inscripcion_ctrl = InscripcionController()
+    uvicorn api:app --port 8000 --workers 4
 
-from model.ChatBot import ChatBot
+Variables de entorno:
+    PRECALENTAR   0 para no abrir conexiones ni cargar cachés al arrancar (por defecto 1)
+"""
+import time
+
+_INICIO_IMPORT = time.perf_counter()
 
-from controller import inscripcion_controller
+import asyncio
+import csv
+import io
+import logging
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional, List
+
+from fastapi import APIRouter, FastAPI, HTTPException, UploadFile, File, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from admision import ADMISION, MiddlewareAdmision, control_admision
+from cache import catalogo_cache, ocupacion_cache, progreso_cache
+from cache_http import GZIP_MINIMO, MiddlewareCompresion, ValidadorHTTP
+from busqueda import mejor_resultado, palabras
+from comprobantes import NODO_CONFIGURADO, NodoNoDisponibleError, escritor_comprobantes, generador_comprobantes
+from database import POOL_TIMEOUT, cerrar_pool, get_pool, metricas_pool
+from database_async import cerrar_pool_async, get_pool_async, metricas_pool_async
+from intenciones import router_intenciones, extraer_codigo, extraer_numero
+from metricas import MiddlewareMetricas, registro_metricas
+from notificaciones_push import canal_notificaciones
+from paginacion import normalizar_limite
+from prerrequisitos import grafo_prerrequisitos
+from serializacion import RespuestaJSON, a_json, proyectar
+from controller import inscripcion_controller, reporte_controller
+from controller.busqueda_controller import BusquedaController
+from controller.comprobante_controller import ComprobanteController
+from controller.coordinador_controller import CoordinadorController
 from controller.curso_controller import CursoController
+from controller.curso_controller_async import CursoControllerAsync
 from controller.estudiante_controller import EstudianteController
-from controller.coordinador_controller import CoordinadorController
-from model.Estudiante import Estudiante
-from model.Coordinador import Coordinador
+from controller.horario_controller import HorarioController, describir_choques
+from controller.inscripcion_controller import (InscripcionController, ConflictoHorarioError, CupoAgotadoError,
+                                               CursoNoEncontradoError, PrerrequisitosPendientesError)
+from controller.inscripcion_controller_async import InscripcionControllerAsync
+from controller.notificacion_controller import NotificacionController
+from controller.prerrequisito_controller import PrerrequisitoController, asegurar_grafo_async
+from controller.progreso_controller import ProgresoController
+from model.ChatBot import ChatBot
 
-# Routers normales
-app.include_router(inscripcion_controller.router)
+logger = logging.getLogger(__name__)
 
+PRECALENTAR = os.getenv("PRECALENTAR", "1") != "0"
 
-# ChatBot
-chatbot = ChatBot()
+# Campos de cada curso en los listados
+CAMPOS_CURSO_LISTADO = ("codigo", "nombre", "cupo", "semestre", "estado")
+
+# Server-Sent Events: latido para detectar desconexiones y espera sugerida al reconectar
+SSE_LATIDO = 15.0
+SSE_REINTENTO_MS = 3000
 
-# Inicializar FastAPI
-app = FastAPI(title="EduBot API", version="1.0.0")
-# Rutas
-app.include_router(inscripcion_controller.router)
-# Configurar CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # En producción: ["http://localhost:3000", "https://tu-dominio.com"]
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Instanciar controladores
+# Los controladores no guardan estado ni conexiones: crearlos aquí no toca la base.
+# Lecturas e inscripciones van por el driver asíncrono; las cargas masivas por psycopg2.
+inscripcion_ctrl = InscripcionController()
+inscripcion_async_ctrl = InscripcionControllerAsync()
+curso_async_ctrl = CursoControllerAsync()
 curso_ctrl = CursoController()
 estudiante_ctrl = EstudianteController()
 coordinador_ctrl = CoordinadorController()
+progreso_ctrl = ProgresoController()
+notificacion_ctrl = NotificacionController()
+comprobante_ctrl = ComprobanteController()
+horario_ctrl = HorarioController()
+busqueda_ctrl = BusquedaController()
+prerrequisito_ctrl = PrerrequisitoController()
+chatbot = ChatBot()
+
+router = APIRouter()
+
+# Tiempos de arranque del proceso (se reportan en /health)
+arranque = {"import_ms": None, "startup_ms": None, "precalentado": False, "listo": False}
 
 
 # ==================== MODELOS PYDANTIC ====================
@@ -57,12 +104,33 @@ class InscripcionRequest(BaseModel):
     curso_codigo: str
 
 
+class InscripcionLoteRequest(BaseModel):
+    inscripciones: List[InscripcionRequest]
+
+
 class CursoCreate(BaseModel):
     codigo: str
     nombre: str
     cupo: int
     semestre: int
+    creditos: int = 3
     id_docente: Optional[int] = None
+    # Sesiones semanales: [{"dia": "lunes", "inicio": "08:00", "fin": "10:00"}, ...]
+    cronograma: Optional[List[dict]] = None
+    # Códigos de los cursos que hay que aprobar antes
+    prerrequisitos: Optional[List[str]] = None
+
+
+class PrerrequisitosRequest(BaseModel):
+    prerrequisitos: List[str]
+
+
+class NotaRequest(BaseModel):
+    nota: float
+
+
+class MarcarLeidasRequest(BaseModel):
+    ids: Optional[List[int]] = None
 
 
 class CursoAprobar(BaseModel):
@@ -72,12 +140,12 @@ class CursoAprobar(BaseModel):
 
 # ==================== ENDPOINTS ====================
 
-@app.post("/chatbot/")
+@router.post("/chatbot/")
 def chatbot_endpoint(mensaje: str, estudiante_id: int = 1):
     return {"respuesta": chatbot.procesar_mensaje(mensaje, estudiante_id)}
 
 
-@app.get("/")
+@router.get("/")
 def read_root():
     return {
         "message": "EduBot API - Sistema de Líneas de Énfasis",
@@ -95,63 +163,94 @@ def read_root():
 
 
 # HU1 & HU2: Consultar y filtrar cursos
-@app.get("/api/cursos")
-def listar_cursos(semestre: Optional[int] = None, estado: Optional[str] = None):
+@router.get("/api/cursos")
+async def listar_cursos(request: Request = None, semestre: Optional[int] = None, estado: Optional[str] = None,
+                       orden: str = "codigo", cursor: Optional[str] = None, limite: int = 50):
     """
-    Lista cursos con filtros opcionales
+    Lista cursos con filtros opcionales, paginados por cursor
     - semestre: filtra por número de semestre
     - estado: filtra por estado (aprobado, pendiente, rechazado)
+    - orden: codigo, nombre o semestre
+    - cursor: valor de `next_cursor` de la página anterior
+    - limite: tamaño de página (máximo 200)
+    Responde 304 sin consultar la base si el catálogo no cambió desde el ETag del cliente.
     """
+    # Las versiones se leen antes de cargar: un cambio durante la carga deja un ETag viejo, no uno adelantado
+    validador = ValidadorHTTP(request, "cursos", catalogo_cache)
+    if validador.no_modificado():
+        return validador.respuesta_304()
     try:
-        cursos = curso_ctrl.listar_cursos()
-
-        # Filtrar por semestre si se proporciona
-        if semestre:
-            cursos = [c for c in cursos if c.semestre == semestre]
-
-        # Filtrar por estado si se proporciona (por defecto solo aprobados)
-        if estado:
-            cursos = [c for c in cursos if c.estado == estado]
-        else:
-            cursos = [c for c in cursos if c.estado == "aprobado"]
-
-        # Convertir objetos Curso a diccionarios
-        cursos_dict = [
-            {
-                "codigo": c.codigo,
-                "nombre": c.nombre,
-                "cupo": c.cupo,
-                "semestre": c.semestre,
-                "estado": c.estado
-            }
-            for c in cursos
-        ]
+        # Por defecto solo aprobados
+        cursos, next_cursor = await curso_async_ctrl.buscar_cursos(
+            semestre=semestre,
+            estado=estado or "aprobado",
+            orden=orden,
+            cursor=cursor,
+            limite=limite
+        )
 
-        return {
+        cursos_dict = proyectar(cursos, CAMPOS_CURSO_LISTADO)
+        grafo = await asegurar_grafo_async()
+        for curso, curso_dict in zip(cursos, cursos_dict):
+            curso_dict["prerrequisitos"] = grafo.requisitos_directos(curso.id_curso)
+
+        return validador.aplicar(RespuestaJSON({
             "type": "cursos",
             "data": cursos_dict,
-            "count": len(cursos_dict)
-        }
+            "count": len(cursos_dict),
+            "next_cursor": next_cursor
+        }))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Búsqueda por texto (va antes de /api/cursos/{codigo} para que "buscar" no se tome como código)
+@router.get("/api/cursos/buscar")
+async def buscar_cursos(request: Request, q: str, estado: Optional[str] = "aprobado",
+                        semestre: Optional[int] = None, limite: int = 10):
+    """
+    Busca cursos por código, nombre o línea de énfasis, con tolerancia a errores de tipeo
+    - q: texto a buscar ("machine learning", "IA-501", "intro progra")
+    - estado: por defecto solo aprobados
+    - limite: cantidad de resultados (máximo 200)
+    """
+    validador = ValidadorHTTP(request, "cursos", catalogo_cache)
+    if validador.no_modificado():
+        return validador.respuesta_304()
+    try:
+        resultados = await run_in_threadpool(
+            busqueda_ctrl.buscar, q, normalizar_limite(limite), estado or None, semestre
+        )
+        return validador.aplicar(RespuestaJSON({
+            "type": "busqueda",
+            "data": resultados,
+            "count": len(resultados)
+        }))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # HU1: Obtener detalle de un curso específico
-@app.get("/api/cursos/{codigo}")
-def obtener_curso(codigo: str):
+@router.get("/api/cursos/{codigo}")
+async def obtener_curso(codigo: str, request: Request):
     """Obtiene los detalles completos de un curso específico"""
+    validador = ValidadorHTTP(request, "curso", catalogo_cache, ocupacion_cache)
+    if validador.no_modificado():
+        return validador.respuesta_304()
     try:
-        cursos = curso_ctrl.listar_cursos()
-        curso = next((c for c in cursos if c.codigo == codigo), None)
+        curso = await curso_async_ctrl.obtener_por_codigo(codigo)
 
         if not curso:
             raise HTTPException(status_code=404, detail="Curso no encontrado")
 
         # Obtener número de inscritos
-        inscritos = curso_ctrl.contar_inscritos(codigo)
+        inscritos = await curso_async_ctrl.contar_inscritos(curso.id_curso)
 
-        return {
+        return validador.aplicar(RespuestaJSON({
             "codigo": curso.codigo,
             "nombre": curso.nombre,
             "cupo": curso.cupo,
@@ -159,30 +258,39 @@ def obtener_curso(codigo: str):
             "estado": curso.estado,
             "inscritos": inscritos,
             "cupos_disponibles": curso.cupo - inscritos
-        }
+        }))
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # HU3: Validar cupos y prerequisitos antes de inscripción
-@app.get("/api/cursos/{codigo}/validar")
-def validar_curso(codigo: str, estudiante_id: int):
+@router.get("/api/cursos/{codigo}/validar")
+async def validar_curso(codigo: str, estudiante_id: int):
     """Valida si un estudiante puede inscribirse en un curso"""
     try:
-        cursos = curso_ctrl.listar_cursos()
-        curso = next((c for c in cursos if c.codigo == codigo), None)
+        curso = await curso_async_ctrl.obtener_por_codigo(codigo)
 
         if not curso:
             raise HTTPException(status_code=404, detail="Curso no encontrado")
 
-        inscritos = curso_ctrl.contar_inscritos(codigo)
+        inscritos = await curso_async_ctrl.contar_inscritos(curso.id_curso)
         cupos_disponibles = curso.validar_cupo(inscritos)
+        # Solo consulta el horario del estudiante si el curso tiene sesiones
+        choques = await run_in_threadpool(horario_ctrl.choques_curso, estudiante_id, curso)
+        # Solo consulta las notas del estudiante si el curso tiene prerrequisitos
+        faltantes = await run_in_threadpool(prerrequisito_ctrl.faltantes, estudiante_id, curso.id_curso)
 
         validaciones = {
             "cupos_disponibles": cupos_disponibles,
             "estado_aprobado": curso.estado == "aprobado",
-            "puede_inscribirse": cupos_disponibles and curso.estado == "aprobado",
+            "sin_choques_horario": not choques,
+            "prerrequisitos_cumplidos": not faltantes,
+            "puede_inscribirse": cupos_disponibles and curso.estado == "aprobado" and not choques and not faltantes,
+            "choques": choques,
+            "prerrequisitos_faltantes": faltantes,
             "mensaje": []
         }
 
@@ -192,34 +300,56 @@ def validar_curso(codigo: str, estudiante_id: int):
         if curso.estado != "aprobado":
             validaciones['mensaje'].append("El curso no está aprobado para inscripciones")
 
+        if choques:
+            validaciones['mensaje'].append(describir_choques(choques))
+
+        if faltantes:
+            validaciones['mensaje'].append("Faltan prerrequisitos: " + ", ".join(faltantes))
+
         return validaciones
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # HU5: Inscribirse en un curso
-@app.post("/api/inscripciones")
-def inscribir_estudiante(inscripcion: InscripcionRequest):
-    """Inscribe a un estudiante en un curso"""
+@router.post("/api/inscripciones")
+async def inscribir_estudiante(inscripcion: InscripcionRequest):
+    """Inscribe a un estudiante en un curso; si está lleno, lo deja en la lista de espera (202)"""
     try:
         # Buscar curso
-        cursos = curso_ctrl.listar_cursos()
-        curso = next((c for c in cursos if c.codigo == inscripcion.curso_codigo), None)
+        curso = await curso_async_ctrl.obtener_por_codigo(inscripcion.curso_codigo)
 
         if not curso:
             raise HTTPException(status_code=404, detail="Curso no encontrado")
 
-        # Verificar cupo
-        inscritos = curso_ctrl.contar_inscritos(curso.codigo)
-        if not curso.validar_cupo(inscritos):
-            raise HTTPException(status_code=400, detail="No hay cupos disponibles")
-
-        # Crear inscripción en BD
-        nueva = inscripcion_ctrl.crear_inscripcion(
-            estudiante_id=inscripcion.estudiante_id,
-            curso_id=curso.codigo   # 👈 si decides usar `codigo` en BD
-        )
+        # Reservar cupo e inscribir en una sola transacción. Sin cupo, a la lista de espera;
+        # si justo se liberó uno (y nadie esperaba) se reintenta la inscripción una vez.
+        try:
+            for _ in range(2):
+                try:
+                    nueva, creada = await inscripcion_async_ctrl.inscribir(
+                        estudiante_id=inscripcion.estudiante_id,
+                        curso_id=curso.id_curso
+                    )
+                    break
+                except CupoAgotadoError:
+                    espera = await run_in_threadpool(
+                        inscripcion_ctrl.unirse_lista_espera, inscripcion.estudiante_id, curso.id_curso
+                    )
+                    if espera is not None:
+                        return _respuesta_lista_espera(curso, *espera)
+            else:
+                raise HTTPException(status_code=400, detail="No hay cupos disponibles")
+        except CursoNoEncontradoError as e:
+            # Se borró entre la búsqueda y la reserva
+            raise HTTPException(status_code=404, detail=str(e))
+        except (ConflictoHorarioError, PrerrequisitosPendientesError) as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         return {
             "type": "inscripcion",
@@ -231,65 +361,220 @@ def inscribir_estudiante(inscripcion: InscripcionRequest):
                 "estado": nueva.estado
             },
             "success": True,
-            "mensaje": "Inscripción realizada con éxito"
+            "mensaje": "Inscripción realizada con éxito" if creada else "Ya estabas inscrito en este curso"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _respuesta_lista_espera(curso, posicion, en_espera):
+    return RespuestaJSON({
+        "type": "lista_espera",
+        "data": {
+            "curso_codigo": curso.codigo,
+            "posicion": posicion,
+            "en_espera": en_espera
+        },
+        "success": True,
+        "mensaje": f"No hay cupos en {curso.nombre}: quedaste en la lista de espera (posición {posicion}). "
+                   "Te inscribiremos y te avisaremos apenas se libere un cupo."
+    }, status_code=202)
 
-# HU2: Mis inscripciones
-@app.get("/api/estudiante/{estudiante_id}/inscripciones")
-def obtener_inscripciones(estudiante_id: int):
-    """Obtiene todas las inscripciones de un estudiante"""
+
+# Listas de espera de un estudiante, con su posición en cada una
+@router.get("/api/estudiante/{estudiante_id}/lista-espera")
+def obtener_lista_espera(estudiante_id: int):
     try:
-        inscripciones = inscripcion_ctrl.listar_inscripciones()
-        inscripciones = [i for i in inscripciones if i.estudiante_id == estudiante_id]
-
-        data = [
-            {
-                "id": i.id,
-                "curso_id": i.curso_id,
-                "fecha_inscripcion": i.fecha_inscripcion,
-                "estado": i.estado
-            }
-            for i in inscripciones
-        ]
+        data = inscripcion_ctrl.lista_espera(estudiante_id)
+        return RespuestaJSON({"type": "lista_espera", "data": data, "count": len(data)})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Salir de una lista de espera
+@router.delete("/api/estudiante/{estudiante_id}/lista-espera/{curso_codigo}")
+def salir_lista_espera(estudiante_id: int, curso_codigo: str):
+    try:
+        curso = curso_ctrl.obtener_por_codigo(curso_codigo)
+
+        if not curso:
+            raise HTTPException(status_code=404, detail="Curso no encontrado")
+
+        if not inscripcion_ctrl.salir_lista_espera(estudiante_id, curso.id_curso):
+            raise HTTPException(status_code=404, detail="El estudiante no está en la lista de espera de este curso")
 
         return {
+            "type": "lista_espera_cancelada",
+            "success": True,
+            "mensaje": f"Saliste de la lista de espera de {curso.codigo}",
+            "codigo": curso.codigo
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Cancelar inscripción
+@router.delete("/api/estudiante/{estudiante_id}/inscripciones/{curso_codigo}")
+def cancelar_inscripcion(estudiante_id: int, curso_codigo: str):
+    """Cancela la inscripción de un estudiante; el cupo pasa al primero de la lista de espera"""
+    try:
+        curso = curso_ctrl.obtener_por_codigo(curso_codigo)
+
+        if not curso:
+            raise HTTPException(status_code=404, detail="Curso no encontrado")
+
+        if not inscripcion_ctrl.cancelar(estudiante_id, curso.id_curso):
+            raise HTTPException(status_code=404, detail="El estudiante no está inscrito en este curso")
+
+        return {
+            "type": "inscripcion_cancelada",
+            "success": True,
+            "mensaje": f"Inscripción en {curso.codigo} cancelada",
+            "codigo": curso.codigo
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Inscripción masiva (coordinadores / importaciones)
+@router.post("/api/inscripciones/lote")
+def inscribir_lote(lote: InscripcionLoteRequest):
+    """Inscribe muchos estudiantes en una sola transacción y retorna el resultado de cada fila"""
+    filas = [(i.estudiante_id, i.curso_codigo) for i in lote.inscripciones]
+    return _procesar_lote(filas)
+
+
+@router.post("/api/inscripciones/lote/csv")
+def inscribir_lote_csv(archivo: UploadFile = File(...)):
+    """
+    Igual que /api/inscripciones/lote pero desde un CSV con encabezado
+    `estudiante_id,curso_codigo`. Las filas mal formadas se reportan como `fila_invalida`.
+    """
+    try:
+        texto = io.TextIOWrapper(archivo.file, encoding="utf-8-sig")
+        lector = csv.DictReader(texto)
+        if not lector.fieldnames or not {"estudiante_id", "curso_codigo"} <= set(lector.fieldnames):
+            raise HTTPException(status_code=400, detail="El CSV debe tener las columnas estudiante_id,curso_codigo")
+
+        filas = []
+        invalidas = []
+        for numero, fila in enumerate(lector):
+            try:
+                filas.append((int(fila["estudiante_id"]), fila["curso_codigo"].strip()))
+            except (TypeError, ValueError, AttributeError):
+                invalidas.append({"linea": numero + 2, "estado": "fila_invalida"})
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El CSV debe estar en UTF-8")
+
+    respuesta = _procesar_lote(filas)
+    respuesta["invalidas"] = invalidas
+    return respuesta
+
+
+def _procesar_lote(filas):
+    try:
+        resultados = inscripcion_ctrl.inscribir_lote(filas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "type": "inscripcion_lote",
+        "data": resultados,
+        "resumen": dict(Counter(r["estado"] for r in resultados)),
+        "count": len(resultados)
+    }
+
+
+# HU2: Mis inscripciones
+@router.get("/api/estudiante/{estudiante_id}/inscripciones")
+async def obtener_inscripciones(estudiante_id: int, cursor: Optional[str] = None, limite: int = 50):
+    """Obtiene las inscripciones de un estudiante, paginadas por cursor"""
+    try:
+        data, next_cursor = await inscripcion_async_ctrl.listar_por_estudiante(
+            estudiante_id, cursor, limite, como_dict=True
+        )
+
+        return RespuestaJSON({
             "type": "inscripciones",
             "data": data,
-            "count": len(data)
-        }
+            "count": len(data),
+            "next_cursor": next_cursor
+        })
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
 # HU7: Reporte de progreso
-@app.get("/api/estudiante/{estudiante_id}/progreso")
+@router.get("/api/estudiante/{estudiante_id}/progreso")
 def obtener_progreso(estudiante_id: int):
     """Genera reporte de progreso académico de un estudiante"""
     try:
-        # Implementar lógica real con tus controladores
+        progreso = progreso_ctrl.obtener(estudiante_id)
+        if progreso is None:
+            raise HTTPException(status_code=404, detail=f"Estudiante {estudiante_id} no encontrado")
         return {
             "type": "reporte",
-            "data": {
-                "creditos_completados": 24,
-                "creditos_totales": 36,
-                "promedio": 4.2,
-                "pendientes": 4
-            }
+            "data": progreso
         }
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Progreso de una cohorte (por lista de estudiantes o por programa) en una sola consulta
+@router.get("/api/progreso")
+def obtener_progreso_cohorte(estudiantes: Optional[List[int]] = Query(None), programa: Optional[str] = None):
+    if not estudiantes and not programa:
+        raise HTTPException(status_code=400, detail="Indica 'estudiantes' o 'programa'")
+    try:
+        progresos = progreso_ctrl.obtener_cohorte(estudiantes=estudiantes, programa=programa)
+        return {"data": progresos, "count": len(progresos)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Registrar nota final de una inscripción (docente)
+@router.put("/api/inscripciones/{inscripcion_id}/nota")
+def registrar_nota(inscripcion_id: int, nota: NotaRequest):
+    try:
+        inscripcion = inscripcion_ctrl.registrar_nota(inscripcion_id, nota.nota)
+        if inscripcion is None:
+            raise HTTPException(status_code=404, detail=f"Inscripción {inscripcion_id} no encontrada")
+        return {
+            "success": True,
+            "message": f"Nota registrada: {inscripcion.estado}",
+            "inscripcion": inscripcion.a_dict()
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # HU9: Crear curso (coordinador)
-@app.post("/api/cursos")
+@router.post("/api/cursos")
 def crear_curso(curso: CursoCreate):
     """Crea un nuevo curso en el sistema (requiere rol coordinador)"""
     try:
@@ -297,7 +582,10 @@ def crear_curso(curso: CursoCreate):
             curso.codigo,
             curso.nombre,
             curso.cupo,
-            curso.semestre
+            curso.semestre,
+            curso.creditos,
+            curso.cronograma,
+            curso.prerrequisitos
         )
 
         return {
@@ -309,22 +597,51 @@ def crear_curso(curso: CursoCreate):
                 "nombre": nuevo_curso.nombre,
                 "cupo": nuevo_curso.cupo,
                 "semestre": nuevo_curso.semestre,
-                "estado": nuevo_curso.estado
+                "estado": nuevo_curso.estado,
+                "prerrequisitos": sorted(set(curso.prerrequisitos or ()))
             }
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Definir los prerrequisitos de un curso (coordinador)
+@router.put("/api/cursos/{codigo}/prerrequisitos")
+def definir_prerrequisitos(codigo: str, datos: PrerrequisitosRequest):
+    """Reemplaza los prerrequisitos directos de un curso; rechaza códigos inexistentes y ciclos"""
+    try:
+        curso = curso_ctrl.obtener_por_codigo(codigo)
+
+        if not curso:
+            raise HTTPException(status_code=404, detail="Curso no encontrado")
+
+        prerrequisitos = prerrequisito_ctrl.definir(curso, datos.prerrequisitos)
+
+        return {
+            "type": "prerrequisitos",
+            "success": True,
+            "codigo": curso.codigo,
+            "prerrequisitos": prerrequisitos
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # HU4: Aprobar curso (coordinador)
-@app.put("/api/cursos/{codigo}/aprobar")
+@router.put("/api/cursos/{codigo}/aprobar")
 def aprobar_curso(codigo: str, coordinador_id: int = 1):
     """Aprueba un curso pendiente (requiere rol coordinador)"""
     try:
         # Obtener curso
-        cursos = curso_ctrl.listar_cursos()
-        curso = next((c for c in cursos if c.codigo == codigo), None)
+        curso = curso_ctrl.obtener_por_codigo(codigo)
 
         if not curso:
             raise HTTPException(status_code=404, detail="Curso no encontrado")
@@ -337,9 +654,6 @@ def aprobar_curso(codigo: str, coordinador_id: int = 1):
                 "codigo": codigo
             }
 
-        # Crear objeto coordinador
-        coordinador = Coordinador(coordinador_id, "Dr. Coordinador")
-
         # Aprobar usando tu lógica existente
         resultado = coordinador_ctrl.aprobar_curso(curso)
 
@@ -349,17 +663,18 @@ def aprobar_curso(codigo: str, coordinador_id: int = 1):
             "codigo": codigo
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # HU4: Rechazar curso (coordinador)
-@app.put("/api/cursos/{codigo}/rechazar")
+@router.put("/api/cursos/{codigo}/rechazar")
 def rechazar_curso(codigo: str, coordinador_id: int = 1):
     """Rechaza un curso pendiente (requiere rol coordinador)"""
     try:
-        cursos = curso_ctrl.listar_cursos()
-        curso = next((c for c in cursos if c.codigo == codigo), None)
+        curso = curso_ctrl.obtener_por_codigo(codigo)
 
         if not curso:
             raise HTTPException(status_code=404, detail="Curso no encontrado")
@@ -372,7 +687,6 @@ def rechazar_curso(codigo: str, coordinador_id: int = 1):
                 "codigo": codigo
             }
 
-        coordinador = Coordinador(coordinador_id, "Dr. Coordinador")
         resultado = coordinador_ctrl.rechazar_curso(curso)
 
         return {
@@ -381,82 +695,159 @@ def rechazar_curso(codigo: str, coordinador_id: int = 1):
             "codigo": codigo
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# HU6: Obtener notificaciones (NUEVO)
-@app.get("/api/notificaciones/{usuario_id}")
-def obtener_notificaciones(usuario_id: int):
-    """Obtiene las notificaciones de un usuario"""
+# HU6: Obtener notificaciones
+@router.get("/api/notificaciones/{usuario_id}")
+def obtener_notificaciones(usuario_id: int, solo_no_leidas: bool = False,
+                           cursor: Optional[str] = None, limite: int = 20):
+    """Bandeja de notificaciones de un usuario, las más recientes primero"""
     try:
-        # Simulación de notificaciones - implementar lógica real
-        notificaciones = [
-            {
-                "tipo": "cambio_horario",
-                "curso": "Machine Learning Avanzado",
-                "mensaje": "El horario cambió a Miércoles 6:00-9:00 PM",
-                "fecha": "Hace 2 horas",
-                "leido": False
-            },
-            {
-                "tipo": "cupos",
-                "curso": "Deep Learning Aplicado",
-                "mensaje": "¡Nuevos cupos disponibles!",
-                "fecha": "Hace 1 día",
-                "leido": False
-            }
-        ]
-
-        return {
+        data, next_cursor = notificacion_ctrl.listar(usuario_id, solo_no_leidas, cursor, limite, como_dict=True)
+        return RespuestaJSON({
             "type": "notificaciones",
-            "data": notificaciones,
-            "count": len(notificaciones)
-        }
+            "data": data,
+            "count": len(data),
+            "no_leidas": notificacion_ctrl.contar_no_leidas(usuario_id),
+            "next_cursor": next_cursor
+        })
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# HU8: Generar comprobante (NUEVO)
-@app.post("/api/comprobante/generar")
+# Marcar notificaciones como leídas (todas si no se indican ids)
+@router.put("/api/notificaciones/{usuario_id}/leidas")
+def marcar_notificaciones_leidas(usuario_id: int, marcar: Optional[MarcarLeidasRequest] = None):
+    try:
+        ids = marcar.ids if marcar else None
+        return {"success": True, "marcadas": notificacion_ctrl.marcar_leidas(usuario_id, ids)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Notificaciones en vivo (Server-Sent Events): el cliente no necesita hacer polling
+@router.get("/api/notificaciones/{usuario_id}/stream")
+async def stream_notificaciones(usuario_id: int, request: Request):
+    ultimo_id = request.headers.get("last-event-id")
+    desde = int(ultimo_id) if ultimo_id and ultimo_id.isdigit() else None
+
+    async def eventos():
+        async with canal_notificaciones.suscribir(usuario_id, desde) as cola:
+            yield f"retry: {SSE_REINTENTO_MS}\n\n"
+            while True:
+                try:
+                    notificacion = await asyncio.wait_for(cola.get(), timeout=SSE_LATIDO)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"  # mantiene viva la conexión a través de proxies
+                    continue
+                datos = a_json(notificacion).decode()
+                yield f"id: {notificacion.id}\nevent: notificacion\ndata: {datos}\n\n"
+
+    return StreamingResponse(eventos(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# HU8: Generar comprobante
+@router.post("/api/comprobante/generar")
 def generar_comprobante(inscripcion: InscripcionRequest):
     """Genera un comprobante de inscripción"""
     try:
-        import random
-
         return {
             "type": "comprobante",
             "mensaje": "Comprobante generado exitosamente",
-            "data": {
-                "numero_transaccion": f"#{random.randint(100000, 999999)}",
-                "estudiante_id": inscripcion.estudiante_id,
-                "curso_codigo": inscripcion.curso_codigo,
-                "fecha": datetime.now().isoformat(),
-                "estado": "Pagado"
-            }
+            "data": comprobante_ctrl.generar(inscripcion.estudiante_id, inscripcion.curso_codigo)
         }
 
+    except NodoNoDisponibleError as e:
+        # Se perdió el nodo y todavía no hay otro libre: reintentable
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Consultar un comprobante por número (acepta "#123..." o "123...")
+@router.get("/api/comprobantes/{numero}")
+def obtener_comprobante(numero: str):
+    numero = numero.lstrip("#")
+    if not numero.isdigit():
+        raise HTTPException(status_code=400, detail="Número de comprobante inválido")
+    try:
+        comprobante = comprobante_ctrl.obtener(int(numero))
+        if comprobante is None:
+            raise HTTPException(status_code=404, detail=f"Comprobante #{numero} no encontrado")
+        return {"type": "comprobante", "data": comprobante}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Comprobantes de un estudiante
+@router.get("/api/estudiante/{estudiante_id}/comprobantes")
+def obtener_comprobantes_estudiante(estudiante_id: int, cursor: Optional[str] = None, limite: int = 20):
+    try:
+        comprobantes, next_cursor = comprobante_ctrl.listar_por_estudiante(estudiante_id, cursor, limite)
+        return RespuestaJSON({"data": comprobantes, "count": len(comprobantes), "next_cursor": next_cursor})
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Choques de horario de todo un semestre (coordinadores)
+@router.get("/api/horarios/conflictos")
+def obtener_conflictos_horario(semestre: int):
+    """Todos los pares de cursos con sesiones solapadas entre las inscripciones vigentes del semestre"""
+    try:
+        conflictos = horario_ctrl.conflictos_semestre(semestre)
+        return RespuestaJSON({
+            "type": "conflictos_horario",
+            "data": conflictos,
+            "count": len(conflictos),
+            "estudiantes": len({c["estudiante_id"] for c in conflictos})
+        })
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Endpoint de estadísticas para coordinadores (NUEVO)
-@app.get("/api/estadisticas")
-def obtener_estadisticas():
+@router.get("/api/estadisticas")
+async def obtener_estadisticas(request: Request = None):
     """Obtiene estadísticas generales del sistema (coordinadores)"""
+    validador = ValidadorHTTP(request, "estadisticas", catalogo_cache, ocupacion_cache)
+    if validador.no_modificado():
+        return validador.respuesta_304()
     try:
-        cursos = curso_ctrl.listar_cursos()
+        # Una sola consulta: estado, cupo e inscritos de cada curso
+        conteos = (await curso_async_ctrl.contar_inscritos_por_curso()).values()
 
-        total_cursos = len(cursos)
-        cursos_aprobados = len([c for c in cursos if c.estado == "aprobado"])
-        cursos_pendientes = len([c for c in cursos if c.estado == "pendiente"])
-        cursos_rechazados = len([c for c in cursos if c.estado == "rechazado"])
+        total_cursos = len(conteos)
+        cursos_aprobados = len([c for c in conteos if c["estado"] == "aprobado"])
+        cursos_pendientes = len([c for c in conteos if c["estado"] == "pendiente"])
+        cursos_rechazados = len([c for c in conteos if c["estado"] == "rechazado"])
 
-        # Calcular inscripciones totales
-        total_inscripciones = sum([curso_ctrl.contar_inscritos(c.codigo) for c in cursos])
+        total_inscripciones = sum(c["inscritos"] for c in conteos)
 
-        return {
+        # Ocupación promedio de los cursos aprobados (inscritos / cupo)
+        ocupaciones = [c["inscritos"] / c["cupo"] for c in conteos if c["estado"] == "aprobado"]
+        ocupacion_promedio = sum(ocupaciones) / len(ocupaciones) if ocupaciones else 0
+
+        return validador.aplicar(RespuestaJSON({
             "type": "estadisticas",
             "data": {
                 "total_cursos": total_cursos,
@@ -464,48 +855,57 @@ def obtener_estadisticas():
                 "cursos_pendientes": cursos_pendientes,
                 "cursos_rechazados": cursos_rechazados,
                 "total_inscripciones": total_inscripciones,
-                "ocupacion_promedio": "75%"  # Calcular real
+                "ocupacion_promedio": f"{ocupacion_promedio:.0%}"
             }
-        }
+        }))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Endpoint principal del chat (MEJORADO)
-@app.post("/chat")
-def chat(message: Message):
+@router.post("/chat")
+async def chat(message: Message):
     """
     Endpoint principal del chatbot
     Procesa mensajes en lenguaje natural y retorna respuestas apropiadas
     """
     try:
         text = message.text.lower()
+        intencion = router_intenciones.clasificar(text)
 
-        # Buscar cursos
-        if "buscar" in text or "curso" in text or "disponible" in text:
-            return listar_cursos(estado="aprobado")
+        # Buscar cursos: por texto si el mensaje dice qué busca, si no el catálogo completo
+        if intencion == "buscar":
+            resultados = await run_in_threadpool(busqueda_ctrl.buscar, message.text, 10, "aprobado")
+            if resultados:
+                return {"type": "busqueda", "data": resultados, "count": len(resultados)}
+            return await listar_cursos(estado="aprobado")
 
         # Inscribirse
-        elif "inscrib" in text:
-            # Extraer código del curso
-            palabras = message.text.split()
-            codigo = None
-            for palabra in palabras:
-                if len(palabra) >= 3:
-                    # Buscar código que coincida con patrón de curso
-                    codigo_upper = palabra.upper()
-                    cursos = curso_ctrl.listar_cursos()
-                    if any(c.codigo == codigo_upper for c in cursos):
-                        codigo = codigo_upper
-                        break
+        elif intencion == "inscribir":
+            # Extraer código del curso contra el índice de códigos en memoria
+            codigo = extraer_codigo(message.text, await curso_async_ctrl.listar_codigos())
+            sugerencias = []
+            if not codigo:
+                # Sin código: por nombre ("inscribirme en machine learning")
+                consulta = " ".join(p for p in palabras(message.text) if not p.startswith("inscrib"))
+                sugerencias = await run_in_threadpool(busqueda_ctrl.buscar, consulta, 3, "aprobado")
+                elegido = mejor_resultado(sugerencias)
+                codigo = elegido["codigo"] if elegido else None
 
             if codigo:
                 inscripcion = InscripcionRequest(
                     estudiante_id=message.estudiante_id,
                     curso_codigo=codigo
                 )
-                return inscribir_estudiante(inscripcion)
+                return await inscribir_estudiante(inscripcion)
+
+            if sugerencias:
+                return {
+                    "type": "sugerencias",
+                    "message": "¿En cuál de estos cursos te quieres inscribir? Indica el código.",
+                    "data": sugerencias
+                }
 
             return {
                 "type": "error",
@@ -513,40 +913,39 @@ def chat(message: Message):
             }
 
         # Progreso
-        elif "reporte" in text or "progreso" in text:
-            return obtener_progreso(message.estudiante_id)
+        elif intencion == "progreso":
+            return await run_in_threadpool(obtener_progreso, message.estudiante_id)
 
         # Mis inscripciones
-        elif "mis inscripc" in text or "inscripciones" in text:
-            return obtener_inscripciones(message.estudiante_id)
+        elif intencion == "inscripciones":
+            return await obtener_inscripciones(message.estudiante_id)
 
         # Notificaciones
-        elif "notificacion" in text or "aviso" in text:
-            return obtener_notificaciones(message.estudiante_id)
+        elif intencion == "notificaciones":
+            return await run_in_threadpool(obtener_notificaciones, message.estudiante_id)
 
         # Filtrar por semestre
-        elif "semestre" in text or "filtrar" in text:
+        elif intencion == "semestre":
             # Intentar extraer número de semestre
-            numeros = re.findall(r'\d+', text)
-            if numeros:
-                semestre = int(numeros[0])
-                return listar_cursos(semestre=semestre, estado="aprobado")
-            return listar_cursos(estado="aprobado")
+            semestre = extraer_numero(text)
+            if semestre is not None:
+                return await listar_cursos(semestre=semestre, estado="aprobado")
+            return await listar_cursos(estado="aprobado")
 
         # Crear curso (coordinador)
-        elif "crear curso" in text:
+        elif intencion == "crear_curso":
             return {
                 "type": "info",
                 "message": "Para crear un curso, usa el formulario en la interfaz o envía una petición POST a /api/cursos"
             }
 
         # Aprobar cursos (coordinador)
-        elif "aprobar" in text or "pendiente" in text:
-            return listar_cursos(estado="pendiente")
+        elif intencion == "aprobar":
+            return await listar_cursos(estado="pendiente")
 
         # Estadísticas (coordinador)
-        elif "estadistica" in text or "reporte" in text:
-            return obtener_estadisticas()
+        elif intencion == "estadisticas":
+            return await obtener_estadisticas()
 
         # Respuesta por defecto
         return {
@@ -567,19 +966,135 @@ def chat(message: Message):
         }
 
 
+# Sala de espera virtual: estado de un turno (no consulta la base, se puede sondear seguido)
+@router.get("/api/sala-espera")
+async def estado_sala_espera(token: str):
+    estado = control_admision.sala.consultar(token)
+    if estado is None:
+        raise HTTPException(status_code=404, detail="Turno inválido o vencido")
+    return estado
+
+
 # Health check endpoint
-@app.get("/health")
+@router.get("/health")
 def health_check():
     """Verifica el estado de la API"""
+    comprobantes = escritor_comprobantes.metricas()
     return {
-        "status": "healthy",
+        # Un número de comprobante repetido es un error de datos, no solo una métrica
+        "status": "degraded" if comprobantes["conflictos"] else "healthy",
         "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "pool": metricas_pool(),
+        "pool_async": metricas_pool_async(),
+        "cache_catalogo": catalogo_cache.metricas(),
+        "cache_progreso": progreso_cache.metricas(),
+        "notificaciones_push": canal_notificaciones.metricas(),
+        "comprobantes": {**comprobantes, **generador_comprobantes.metricas()},
+        "prerrequisitos": grafo_prerrequisitos.metricas(),
+        "busqueda": busqueda_ctrl.metricas(),
+        "admision": control_admision.metricas() if ADMISION else None,
+        "arranque": arranque
     }
 
 
+def _gauges(prefijo, ayuda, valores):
+    """Un gauge de Prometheus por cada valor numérico de un dict de métricas."""
+    return [
+        (f"{prefijo}_{campo}", f"{ayuda} ({campo})", {"": valor})
+        for campo, valor in valores.items()
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool)
+    ]
+
+
+# Métricas en formato Prometheus
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    extras = (
+        _gauges("edubot_pool", "Pool síncrono", metricas_pool())
+        + _gauges("edubot_pool_async", "Pool asíncrono", metricas_pool_async())
+        + _gauges("edubot_cache_catalogo", "Caché del catálogo", catalogo_cache.metricas())
+        + _gauges("edubot_cache_progreso", "Caché de progreso", progreso_cache.metricas())
+        + _gauges("edubot_notificaciones_push", "Notificaciones en vivo", canal_notificaciones.metricas())
+        + _gauges("edubot_comprobantes", "Comprobantes en diferido", escritor_comprobantes.metricas())
+        + (_gauges("edubot_admision", "Control de admisión", control_admision.metricas()) if ADMISION else [])
+    )
+    return registro_metricas.exportar(extras)
+
+
+# ==================== APLICACIÓN ====================
+
+async def precalentar():
+    """Abre las conexiones mínimas de ambos pools y carga lo que el primer request va a pedir."""
+    pool_async = await get_pool_async()
+    await pool_async.wait(timeout=POOL_TIMEOUT)
+    await run_in_threadpool(get_pool().abrir)
+    # Índice de códigos (lo usa /chat) y la primera página del catálogo aprobado
+    await curso_async_ctrl.listar_codigos()
+    await curso_async_ctrl.buscar_cursos(estado="aprobado")
+    # Grafo de prerrequisitos (lo usan los listados y cada inscripción)
+    await asegurar_grafo_async()
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    inicio = time.perf_counter()
+    # Sin un nodo propio no se pueden emitir comprobantes únicos: aquí el worker no arranca
+    arranque["nodo_comprobantes"] = await run_in_threadpool(generador_comprobantes.reservar, NODO_CONFIGURADO)
+    if PRECALENTAR:
+        try:
+            await precalentar()
+            arranque["precalentado"] = True
+        except Exception as e:
+            # Sin base al arrancar: el worker igual sirve y se conecta en el primer request
+            logger.warning("No se pudo precalentar la API: %s", e)
+    arranque["startup_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+    arranque["listo"] = True
+    logger.info("API lista: import %.1f ms, arranque %.1f ms", arranque["import_ms"], arranque["startup_ms"])
+    try:
+        yield
+    finally:
+        arranque["listo"] = False
+        await canal_notificaciones.cerrar()
+        await cerrar_pool_async()
+        # Escribir los comprobantes pendientes antes de cerrar el pool síncrono
+        escritor_comprobantes.cerrar()
+        generador_comprobantes.liberar()
+        cerrar_pool()
+
+
+def crear_app():
+    # orjson para todas las respuestas; los listados además retornan RespuestaJSON ya armada
+    app = FastAPI(title="EduBot API", version="1.0.0", lifespan=ciclo_de_vida,
+                  default_response_class=RespuestaJSON)
+    # Límites por estudiante y globales, cola acotada y sala de espera en las rutas que inscriben.
+    # Va por dentro de CORS para que los 429/503 lleven sus headers.
+    if ADMISION:
+        app.add_middleware(MiddlewareAdmision)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # En producción: ["http://localhost:3000", "https://tu-dominio.com"]
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Server-Timing", "ETag", "Last-Modified", "Retry-After"],
+    )
+    if GZIP_MINIMO > 0:
+        app.add_middleware(MiddlewareCompresion, minimo=GZIP_MINIMO)
+    # Tiempo, consultas y conexiones por request (GET /metrics, header Server-Timing opcional)
+    app.add_middleware(MiddlewareMetricas)
+    app.include_router(router)
+    app.include_router(inscripcion_controller.router)
+    app.include_router(reporte_controller.router)
+    return app
+
+
+app = crear_app()
+arranque["import_ms"] = round((time.perf_counter() - _INICIO_IMPORT) * 1000, 1)
+
+
 # Ejecutar con: uvicorn api:app --reload
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
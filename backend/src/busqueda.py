@@ -0,0 +1,277 @@
+"""
+Búsqueda de cursos por texto: índice invertido en memoria sobre el código,
+el nombre y la línea de énfasis.
+
+Los textos se normalizan (minúsculas, sin tildes) y se parten en palabras.
+Cada palabra apunta a los cursos que la contienen con el peso del campo
+donde aparece (nombre pesa más que la línea de énfasis). Una consulta:
+
+- busca cada palabra tal cual, como prefijo ("intro" -> "introduccion") y,
+  si no aparece ninguna de las dos, por parecido de trigramas ("machin
+  lerning" -> "machine learning") contra el vocabulario, que es chico
+  comparado con el catálogo;
+- los códigos se reconocen aparte (exactos o por prefijo, "IA-5");
+- arranca por la palabra con menos cursos y las demás solo se consultan
+  para esos candidatos, así que el costo depende de la palabra más rara y
+  no del tamaño del catálogo. Si ningún curso tiene todas las palabras se
+  rankean los que tengan alguna.
+
+El índice es inmutable: al cambiar el catálogo se arma uno nuevo (ver
+controller/busqueda_controller.py) y las búsquedas en curso siguen con el
+anterior.
+"""
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+# Peso de cada campo del curso
+PESO_CODIGO = 8.0
+PESO_PREFIJO_CODIGO = 4.0
+PESO_NOMBRE = 2.0
+PESO_LINEA = 1.0
+
+# Cuánto vale una palabra encontrada por prefijo o por parecido frente a una exacta
+FACTOR_PREFIJO = 0.8
+FACTOR_PARECIDO = 0.7
+# Parecido mínimo (Jaccard de trigramas) y máximo de palabras por cada expansión
+PARECIDO_MINIMO = 0.4
+MAX_EXPANSIONES = 20
+
+# Palabras que no ayudan a encontrar un curso (incluye las de los mensajes del chat)
+PALABRAS_VACIAS = frozenset("""
+    a al con de del el en la las lo los para por que un una y o me mi mis mio quiero
+    quisiera puedo favor porfa curso cursos materia materias clase clases ver buscar
+    hay todos disponible disponibles
+""".split())
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+_TOKEN_CODIGO = re.compile(r"[\w-]+")
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: 'Introducción' -> 'introduccion'."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def palabras(texto):
+    return _PALABRA.findall(normalizar(texto or ""))
+
+
+def _trigramas(palabra):
+    relleno = f"  {palabra} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceCursos:
+    """
+    Índice de búsqueda sobre [(id_curso, codigo, nombre, estado, semestre, linea)].
+    Solo se lee después de construido: se puede compartir entre hilos.
+
+    Para cada palabra guarda los conjuntos de cursos por campo; como el
+    puntaje de una palabra solo depende del campo y de cómo se encontró,
+    los puntajes se arman por conjuntos (intersecciones y dict.fromkeys, que
+    corren en C) en vez de curso por curso.
+    """
+
+    __slots__ = ("_cursos", "_postings", "_df", "_vocabulario", "_trigramas", "_codigos", "_codigos_ordenados",
+                 "_por_estado", "_por_semestre")
+
+    def __init__(self, filas):
+        # Ordenados por código: en los empates gana la posición (el código) menor
+        self._cursos = sorted((tuple(fila) for fila in filas), key=lambda fila: fila[1].upper())
+        self._codigos = {}                # código en mayúsculas -> posición
+        por_campo = defaultdict(lambda: (set(), set()))  # palabra -> (cursos por línea, cursos por nombre)
+        por_estado = defaultdict(set)
+        por_semestre = defaultdict(set)
+        for posicion, (_, codigo, nombre, estado, semestre, linea) in enumerate(self._cursos):
+            self._codigos[codigo.upper()] = posicion
+            por_estado[estado].add(posicion)
+            por_semestre[semestre].add(posicion)
+            for palabra in palabras(linea):
+                por_campo[palabra][0].add(posicion)
+            for palabra in palabras(nombre):
+                por_campo[palabra][1].add(posicion)
+        # palabra -> ((peso, cursos), ...) de menor a mayor peso
+        self._postings = {
+            palabra: tuple((peso, frozenset(cursos))
+                           for peso, cursos in zip((PESO_LINEA, PESO_NOMBRE), campos) if cursos)
+            for palabra, campos in por_campo.items()
+        }
+        self._df = {palabra: len(linea | nombre) for palabra, (linea, nombre) in por_campo.items()}
+        self._por_estado = {estado: frozenset(cursos) for estado, cursos in por_estado.items()}
+        self._por_semestre = {semestre: frozenset(cursos) for semestre, cursos in por_semestre.items()}
+        self._vocabulario = sorted(self._postings)
+        self._codigos_ordenados = sorted(self._codigos)
+        self._trigramas = defaultdict(list)  # trigrama -> palabras del vocabulario que lo tienen
+        for palabra in self._vocabulario:
+            for trigrama in _trigramas(palabra):
+                self._trigramas[trigrama].append(palabra)
+
+    def __len__(self):
+        return len(self._cursos)
+
+    # ---------------- expansión de la consulta ---------------- #
+
+    def _por_prefijo(self, ordenados, prefijo):
+        i = bisect_left(ordenados, prefijo)
+        encontrados = []
+        while i < len(ordenados) and ordenados[i].startswith(prefijo) and len(encontrados) < MAX_EXPANSIONES:
+            encontrados.append(ordenados[i])
+            i += 1
+        return encontrados
+
+    def _parecidas(self, palabra):
+        propios = _trigramas(palabra)
+        comunes = Counter()
+        for trigrama in propios:
+            comunes.update(self._trigramas.get(trigrama, ()))
+        parecidas = []
+        for candidata, n in comunes.items():
+            parecido = n / (len(propios) + len(_trigramas(candidata)) - n)
+            if parecido >= PARECIDO_MINIMO:
+                parecidas.append((parecido, candidata))
+        return heapq.nlargest(MAX_EXPANSIONES // 4, parecidas)
+
+    def _expandir(self, palabra):
+        """{palabra del vocabulario: factor} para una palabra de la consulta."""
+        expansiones = {}
+        if palabra in self._postings:
+            expansiones[palabra] = 1.0
+        if len(palabra) >= 3:
+            for otra in self._por_prefijo(self._vocabulario, palabra):
+                expansiones.setdefault(otra, FACTOR_PREFIJO)
+        if not expansiones and len(palabra) >= 3:
+            for parecido, otra in self._parecidas(palabra):
+                expansiones[otra] = FACTOR_PARECIDO * parecido
+        return expansiones
+
+    def _clases(self, expansiones, filtros):
+        """[(puntaje, cursos)] de una palabra de la consulta, de menor a mayor puntaje."""
+        total = len(self._cursos)
+        clases = []
+        for otra, factor in expansiones.items():
+            idf = math.log(1 + total / self._df[otra])
+            for peso, cursos in self._postings[otra]:
+                for filtro in filtros:
+                    cursos = cursos & filtro
+                clases.append((peso * factor * idf, cursos))
+        clases.sort(key=itemgetter(0))
+        return clases
+
+    @staticmethod
+    def _puntajes(clases, candidatos=None):
+        """{posición: puntaje}: cada curso se queda con la mejor clase (se aplican de menor a mayor)."""
+        puntajes = {}
+        for puntaje, cursos in clases:
+            puntajes.update(dict.fromkeys(cursos if candidatos is None else candidatos.keys() & cursos, puntaje))
+        return puntajes
+
+    def _codigos_en(self, texto):
+        """{posición: puntaje} de los códigos escritos en `texto` (exactos o como prefijo) y el texto restante."""
+        puntajes = {}
+        resto = []
+        for token in _TOKEN_CODIGO.findall(texto):
+            codigo = token.upper()
+            if codigo in self._codigos:
+                puntajes[self._codigos[codigo]] = PESO_CODIGO
+                continue
+            if len(codigo) >= 2 and token.lower() not in PALABRAS_VACIAS:
+                for otro in self._por_prefijo(self._codigos_ordenados, codigo):
+                    puntajes.setdefault(self._codigos[otro], PESO_PREFIJO_CODIGO)
+            resto.append(token)
+        return puntajes, " ".join(resto)
+
+    # ---------------- búsqueda ---------------- #
+
+    def buscar(self, texto, limite=10, estado=None, semestre=None):
+        """
+        Los `limite` cursos más parecidos a `texto`, de mayor a menor puntaje:
+        [{"codigo", "nombre", "semestre", "estado", "linea", "puntaje", "completo"}].
+        `completo` es False si el curso no coincide con todas las palabras de la
+        consulta (sale del respaldo "cualquiera de las palabras", solo por
+        código, o alguna palabra no se parece a nada del catálogo).
+        """
+        filtros = []
+        if estado is not None:
+            filtros.append(self._por_estado.get(estado, frozenset()))
+        if semestre is not None:
+            filtros.append(self._por_semestre.get(semestre, frozenset()))
+
+        # Los códigos escritos completos no se buscan además como palabras
+        por_codigo, texto = self._codigos_en(texto)
+        por_palabra = []
+        sin_coincidencias = False
+        for palabra in dict.fromkeys(palabras(texto)):
+            if palabra in PALABRAS_VACIAS:
+                continue
+            expansiones = self._expandir(palabra)
+            if expansiones:
+                clases = self._clases(expansiones, filtros)
+                por_palabra.append((sum(len(cursos) for _, cursos in clases), clases))
+            else:
+                sin_coincidencias = True
+        por_palabra.sort(key=itemgetter(0))
+
+        # Todas las palabras: desde la más rara, las demás solo sobre sus candidatos
+        puntajes = {}
+        if por_palabra:
+            puntajes = self._puntajes(por_palabra[0][1])
+            for _, clases in por_palabra[1:]:
+                if not puntajes:
+                    break
+                otros = self._puntajes(clases, puntajes)
+                puntajes = {posicion: puntajes[posicion] + p for posicion, p in otros.items()}
+        completos = set() if sin_coincidencias else set(puntajes) if por_palabra else set(por_codigo)
+        # Ningún curso con todas: cualquiera de las palabras
+        if not puntajes and len(por_palabra) > 1:
+            puntajes = Counter()
+            for _, clases in por_palabra:
+                puntajes.update(self._puntajes(clases))
+        for posicion, p in por_codigo.items():
+            if all(posicion in filtro for filtro in filtros):
+                puntajes[posicion] = puntajes.get(posicion, 0.0) + p
+
+        cursos = self._cursos
+        return [
+            {
+                "codigo": cursos[posicion][1],
+                "nombre": cursos[posicion][2],
+                "semestre": cursos[posicion][4],
+                "estado": cursos[posicion][3],
+                "linea": cursos[posicion][5],
+                "puntaje": round(puntaje, 3),
+                "completo": posicion in completos,
+            }
+            for posicion, puntaje in _mejores(puntajes, limite)
+        ]
+
+    def metricas(self):
+        return {"cursos": len(self._cursos), "palabras": len(self._vocabulario)}
+
+
+def _mejores(puntajes, limite):
+    """Los `limite` (posición, puntaje) de mayor puntaje; en los empates, la posición menor."""
+    if len(puntajes) > limite:
+        umbral = heapq.nlargest(limite, puntajes.values())[-1]
+        mayores = [(p, s) for p, s in puntajes.items() if s > umbral]
+        empatados = heapq.nsmallest(limite - len(mayores), (p for p, s in puntajes.items() if s == umbral))
+        puntajes = dict(mayores)
+        puntajes.update(dict.fromkeys(empatados, umbral))
+    return sorted(puntajes.items(), key=lambda par: (-par[1], par[0]))
+
+
+def mejor_resultado(resultados, margen=1.5):
+    """
+    El primer resultado si coincide con toda la consulta y se destaca (único o
+    `margen` veces el puntaje del segundo); si no, None.
+    """
+    if not resultados or not resultados[0]["completo"]:
+        return None
+    if len(resultados) == 1 or resultados[0]["puntaje"] >= margen * resultados[1]["puntaje"]:
+        return resultados[0]
+    return None
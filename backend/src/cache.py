@@ -0,0 +1,262 @@
+"""
+Caché en memoria del catálogo de cursos (read-through, con TTL y tamaño máximo).
+
+El catálogo solo cambia al crear, aprobar o rechazar cursos; esas operaciones
+llaman a `catalogo_cache.invalidar()`. Con varios workers de uvicorn se puede
+configurar `REDIS_URL`: la versión del catálogo se guarda en Redis y cada
+worker descarta sus entradas cuando ve que otro la incrementó. La lee un hilo
+cada CATALOGO_CACHE_SYNC segundos, así que `version()` nunca hace I/O (se
+llama desde el event loop); `invalidar()` sí escribe en Redis: desde código
+asíncrono se usa `invalidar_async()`.
+
+`ocupacion_cache` no guarda entradas: solo lleva una versión que se
+incrementa al inscribir o cancelar (cambian los cupos ocupados). Con la del
+catálogo forman los ETag de cache_http.py.
+
+`prerrequisitos_cache` tampoco guarda entradas: su versión avisa a los
+workers que el grafo de prerrequisitos cambió (ver prerrequisitos.py).
+
+`progreso_cache` usa la misma clase para los reportes de progreso: se
+descarta por estudiante (`descartar`) al inscribir, cancelar o registrar una
+nota. Es solo local a cada proceso, por eso su TTL es corto.
+
+Variables de entorno:
+    CATALOGO_CACHE_TTL   segundos de vida de una entrada (por defecto 60)
+    CATALOGO_CACHE_MAX   entradas máximas por proceso (por defecto 2048)
+    CATALOGO_CACHE_SYNC  cada cuántos segundos se consulta la versión compartida (por defecto 1)
+    PROGRESO_CACHE_TTL   segundos de vida del progreso de un estudiante (por defecto 30)
+    REDIS_URL            backend compartido opcional (requiere el paquete `redis`)
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Marca para cachear "no existe" sin confundirlo con una entrada ausente
+NO_EXISTE = object()
+_AUSENTE = object()
+
+
+class BackendRedis:
+    """Guarda la versión del catálogo en Redis para que todos los workers la compartan."""
+
+    def __init__(self, url, clave="edubot:catalogo:version"):
+        import redis  # dependencia opcional
+
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.clave = clave
+
+    def version(self):
+        return int(self._redis.get(self.clave) or 0)
+
+    def incrementar(self):
+        return int(self._redis.incr(self.clave))
+
+
+class CacheCatalogo:
+    def __init__(self, ttl=60.0, max_entradas=2048, backend=None, intervalo_sync=1.0):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.backend = backend
+        self.intervalo_sync = intervalo_sync
+
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()   # clave -> (version, expira, valor), en orden LRU
+        self._version = 0
+        self._modificado = time.time()   # cuándo vio este proceso el último cambio de versión
+        self._generacion = 0             # invalidaciones locales (ver _sincronizar)
+        self._hilo_sync = None
+
+        self._hits = 0
+        self._misses = 0
+        self._invalidaciones = 0
+        self._desalojos = 0
+        self._errores_backend = 0
+
+    # ---------------- versión ---------------- #
+
+    def version(self):
+        """Versión actual del catálogo. Con backend compartido la mantiene al día un hilo: aquí no hay I/O."""
+        if self.backend is not None and self._hilo_sync is None:
+            self._iniciar_sync()
+        return self._version
+
+    def _iniciar_sync(self):
+        with self._lock:
+            if self._hilo_sync is not None:
+                return
+            self._hilo_sync = threading.Thread(target=self._ciclo_sync, name="sync-cache", daemon=True)
+        # La primera lectura es síncrona para no arrancar con la versión 0
+        self._sincronizar()
+        self._hilo_sync.start()
+
+    def _ciclo_sync(self):
+        while True:
+            time.sleep(self.intervalo_sync)
+            self._sincronizar()
+
+    def _sincronizar(self):
+        generacion = self._generacion
+        try:
+            remota = self.backend.version()
+        except Exception as e:
+            self._errores_backend += 1
+            logger.warning("No se pudo leer la versión del catálogo: %s", e)
+            return
+        with self._lock:
+            # Si hubo una invalidación local mientras se leía, lo leído puede ser anterior a ella
+            if generacion == self._generacion and remota != self._version:
+                self._version = remota
+                self._modificado = time.time()
+                self._entradas.clear()
+
+    def invalidar(self):
+        """Descarta todo el catálogo cacheado (en este y, con backend, en todos los workers)."""
+        nueva = None
+        if self.backend is not None:
+            try:
+                nueva = self.backend.incrementar()
+            except Exception as e:
+                self._errores_backend += 1
+                logger.warning("No se pudo propagar la invalidación del catálogo: %s", e)
+        with self._lock:
+            self._version = nueva if nueva is not None else self._version + 1
+            self._modificado = time.time()
+            self._entradas.clear()
+            self._invalidaciones += 1
+            self._generacion += 1
+
+    async def invalidar_async(self):
+        """`invalidar()` para código asíncrono: con backend, la escritura en Redis va en un hilo."""
+        if self.backend is None:
+            self.invalidar()
+        else:
+            await asyncio.to_thread(self.invalidar)
+
+    def modificado(self):
+        """Timestamp (epoch) del último cambio de versión visto por este proceso."""
+        self.version()
+        return self._modificado
+
+    def descartar(self, clave):
+        """Descarta una sola entrada (p. ej. el progreso de un estudiante)."""
+        with self._lock:
+            if self._entradas.pop(clave, None) is not None:
+                self._invalidaciones += 1
+
+    # ---------------- lectura / escritura ---------------- #
+
+    def buscar(self, clave):
+        """Retorna el valor cacheado o `_AUSENTE` (y cuenta el hit/miss)."""
+        version = self.version()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                ver, expira, valor = entrada
+                if ver == version and expira > time.monotonic():
+                    self._entradas.move_to_end(clave)
+                    self._hits += 1
+                    return valor
+                del self._entradas[clave]
+            self._misses += 1
+            return _AUSENTE
+
+    def guardar(self, clave, valor, version):
+        """Guarda un valor cargado con la versión vigente al empezar la carga."""
+        with self._lock:
+            if version != self._version:
+                return  # hubo una invalidación mientras se cargaba
+            self._entradas[clave] = (version, time.monotonic() + self.ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._desalojos += 1
+
+    def obtener(self, clave, cargar):
+        """Read-through: retorna el valor cacheado o llama a `cargar()` y lo guarda."""
+        version = self.version()
+        valor = self.buscar(clave)
+        if valor is _AUSENTE:
+            valor = cargar()
+            self.guardar(clave, valor, version)
+        return valor
+
+    async def obtener_async(self, clave, cargar):
+        """Igual que `obtener`, con `cargar` asíncrono."""
+        version = self.version()
+        valor = self.buscar(clave)
+        if valor is _AUSENTE:
+            valor = await cargar()
+            self.guardar(clave, valor, version)
+        return valor
+
+    def obtener_varios(self, claves):
+        """Retorna ({clave: valor} de los hits, [claves faltantes])."""
+        encontrados = {}
+        faltantes = []
+        for clave in claves:
+            valor = self.buscar(clave)
+            if valor is _AUSENTE:
+                faltantes.append(clave)
+            else:
+                encontrados[clave] = valor
+        return encontrados, faltantes
+
+    # ---------------- métricas ---------------- #
+
+    def metricas(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl": self.ttl,
+                "version": self._version,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "invalidaciones": self._invalidaciones,
+                "desalojos": self._desalojos,
+                "backend": type(self.backend).__name__ if self.backend else None,
+                "errores_backend": self._errores_backend,
+            }
+
+
+def _crear_backend(clave="edubot:catalogo:version"):
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    try:
+        return BackendRedis(url, clave)
+    except ImportError:
+        logger.warning("REDIS_URL está configurado pero el paquete redis no está instalado; caché solo local")
+        return None
+
+
+catalogo_cache = CacheCatalogo(
+    ttl=float(os.getenv("CATALOGO_CACHE_TTL", "60")),
+    max_entradas=int(os.getenv("CATALOGO_CACHE_MAX", "2048")),
+    backend=_crear_backend(),
+    intervalo_sync=float(os.getenv("CATALOGO_CACHE_SYNC", "1")),
+)
+
+ocupacion_cache = CacheCatalogo(
+    ttl=float(os.getenv("CATALOGO_CACHE_TTL", "60")),
+    backend=_crear_backend("edubot:ocupacion:version"),
+    intervalo_sync=float(os.getenv("CATALOGO_CACHE_SYNC", "1")),
+)
+
+prerrequisitos_cache = CacheCatalogo(
+    ttl=float(os.getenv("CATALOGO_CACHE_TTL", "60")),
+    backend=_crear_backend("edubot:prerrequisitos:version"),
+    intervalo_sync=float(os.getenv("CATALOGO_CACHE_SYNC", "1")),
+)
+
+progreso_cache = CacheCatalogo(
+    ttl=float(os.getenv("PROGRESO_CACHE_TTL", "30")),
+    max_entradas=int(os.getenv("CATALOGO_CACHE_MAX", "2048")),
+)
@@ -0,0 +1,104 @@
+"""
+Caché HTTP de los endpoints del catálogo: ETag / Last-Modified, GET
+condicionales, Cache-Control por endpoint y compresión gzip.
+
+El ETag se arma con las versiones de `catalogo_cache` (crear, aprobar o
+rechazar cursos) y de `ocupacion_cache` (inscribir o cancelar), que ya están
+en memoria: un 304 se responde sin tocar la base de datos. Con REDIS_URL las
+versiones se comparten entre workers. Sin Redis son por proceso, y el ETag
+incluye un id del proceso y la ventana de CATALOGO_CACHE_TTL en curso, así
+que un 304 nunca es más viejo que lo que ya tolera la caché del catálogo.
+Last-Modified solo se envía (y If-Modified-Since solo se respeta) con Redis:
+sin él, la fecha sería la del último cambio que vio cada proceso y un worker
+que no atendió la escritura respondería 304 con datos que otro ya cambió.
+
+Variables de entorno:
+    CACHE_CONTROL_CURSOS        Cache-Control de GET /api/cursos (por defecto "no-cache")
+    CACHE_CONTROL_CURSO         Cache-Control de GET /api/cursos/{codigo} (por defecto "no-cache")
+    CACHE_CONTROL_ESTADISTICAS  Cache-Control de GET /api/estadisticas (por defecto "no-cache")
+    GZIP_MINIMO                 bytes a partir de los cuales se comprime (por defecto 1024; 0 = nunca)
+"""
+import os
+import secrets
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi.responses import Response
+from starlette.middleware.gzip import GZipMiddleware
+
+# "no-cache": el navegador guarda la respuesta pero la revalida siempre (If-None-Match)
+POLITICAS_CACHE = {
+    nombre: os.getenv(f"CACHE_CONTROL_{nombre.upper()}", "no-cache")
+    for nombre in ("cursos", "curso", "estadisticas")
+}
+GZIP_MINIMO = int(os.getenv("GZIP_MINIMO", "1024"))
+
+# Distingue las versiones locales de este proceso de las de otros workers o reinicios
+_PROCESO = secrets.token_hex(4)
+
+
+class ValidadorHTTP:
+    """
+    Calcula ETag y Last-Modified a partir de las versiones de las cachés y
+    responde los GET condicionales. Sin `request` (llamadas internas, p. ej.
+    desde /chat) no valida ni agrega cabeceras.
+    """
+
+    def __init__(self, request, politica, *caches):
+        self.request = request
+        self.cache_control = POLITICAS_CACHE[politica]
+        partes = []
+        for cache in caches:
+            partes.append(str(cache.version()))
+            if cache.backend is None:
+                partes.append(f"{_PROCESO}.{int(time.time() // cache.ttl)}")
+        self.etag = f'W/"{"-".join(partes)}"'
+        # Fechas comparables entre workers solo si todas las versiones son compartidas
+        compartidas = all(cache.backend is not None for cache in caches)
+        self.modificado = int(max(cache.modificado() for cache in caches)) if compartidas else None
+
+    def no_modificado(self):
+        if self.request is None:
+            return False
+        # If-None-Match manda sobre If-Modified-Since (RFC 9110)
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etiquetas = {e.strip().removeprefix("W/") for e in if_none_match.split(",")}
+            return "*" in etiquetas or self.etag.removeprefix("W/") in etiquetas
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since and self.modificado is not None:
+            try:
+                return self.modificado <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def cabeceras(self):
+        cabeceras = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.modificado is not None:
+            cabeceras["Last-Modified"] = formatdate(self.modificado, usegmt=True)
+        return cabeceras
+
+    def respuesta_304(self):
+        return Response(status_code=304, headers=self.cabeceras())
+
+    def aplicar(self, respuesta):
+        if self.request is not None:
+            respuesta.headers.update(self.cabeceras())
+        return respuesta
+
+
+class MiddlewareCompresion:
+    """GZip para respuestas grandes, excepto streams de Server-Sent Events (gzip retendría los eventos)."""
+
+    def __init__(self, app, minimo=GZIP_MINIMO):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimo)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            aceptados = dict(scope["headers"]).get(b"accept", b"")
+            if b"text/event-stream" not in aceptados:
+                await self.gzip(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
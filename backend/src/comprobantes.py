@@ -0,0 +1,387 @@
+"""
+Números de comprobante y escritura diferida (write-behind) de comprobantes.
+
+Los números son ids tipo Snowflake de 63 bits, asignados en memoria sin ir a
+la base de datos:
+
+    41 bits  milisegundos desde EPOCA_COMPROBANTES (~69 años)
+    10 bits  nodo del proceso
+    12 bits  secuencia dentro del mismo milisegundo (4096 por ms y nodo)
+
+Son únicos mientras cada proceso tenga un nodo distinto y crecen con el
+tiempo, así que ordenar por número es ordenar por fecha de emisión. El nodo
+se reserva en la base al arrancar con un advisory lock de sesión
+(pg_try_advisory_lock) que el proceso mantiene en una conexión propia: dos
+procesos vivos nunca comparten nodo, y si uno muere su nodo queda libre. Con
+COMPROBANTE_NODO se pide un nodo fijo; si otro proceso lo tiene, el
+arranque falla. Si no se puede reservar ninguno, tampoco se emiten números.
+El advisory lock es de sesión: si PGHOST es un pooler en modo transacción,
+se usa PGLISTEN_HOST (el host directo), igual que para LISTEN.
+
+Si esa sesión se cae el lock se suelta y otro proceso puede tomar el nodo.
+Un hilo comprueba cada COMPROBANTE_LATIDO segundos que el lock sigue en
+pg_locks (la conexión usa keepalives de TCP para que una red muerta falle en
+vez de colgarse), y `siguiente()` no emite con una comprobación más vieja que
+eso: la hace en el acto. Al perder el lock el generador deja de emitir y
+reserva un nodo de nuevo. Un nodo recién reservado espera un latido antes de
+emitir, el tiempo que tarda quien lo perdió en darse cuenta, así que los dos
+nunca emiten a la vez.
+
+Los comprobantes se acumulan en memoria y un hilo los inserta por lotes
+(INSERT multi-fila) cada COMPROBANTE_FLUSH segundos o al juntar
+COMPROBANTE_LOTE filas. Mientras no se escriben se pueden consultar en el
+mismo proceso; en otro proceso aparecen tras el siguiente flush. Un número
+que ya existe en la base con otro contenido no se descarta en silencio: la
+fila queda en `conflictos()`, se cuenta en `metricas()["conflictos"]` (y
+/health pasa a "degraded") y el generador suelta su nodo, porque otro
+proceso lo está usando.
+
+Variables de entorno:
+    COMPROBANTE_NODO   id de nodo 0-1023 (por defecto el primero libre en la base)
+    COMPROBANTE_LATIDO segundos entre comprobaciones del nodo reservado (por defecto 2)
+    COMPROBANTE_FLUSH  segundos entre escrituras (por defecto 0.5)
+    COMPROBANTE_LOTE   filas por INSERT (por defecto 500)
+"""
+import logging
+import os
+import threading
+import time
+
+from psycopg2.extras import execute_values
+
+from database import conexion, get_connection
+
+logger = logging.getLogger(__name__)
+
+EPOCA_COMPROBANTES = 1704067200000  # 2024-01-01 UTC en milisegundos
+BITS_NODO = 10
+BITS_SECUENCIA = 12
+MAX_NODO = (1 << BITS_NODO) - 1
+MAX_SECUENCIA = (1 << BITS_SECUENCIA) - 1
+
+# Primer argumento de pg_try_advisory_lock(int, int): el espacio de los nodos de comprobantes
+CLAVE_NODOS = 0x434F4D50  # "COMP"
+
+# Un reintento de un lote ya guardado no inserta nada: RETURNING dice qué filas entraron
+SQL_INSERTAR_COMPROBANTES = """
+    INSERT INTO comprobantes (numero, estudiante_id, curso_codigo, fecha, estado)
+    VALUES %s
+    ON CONFLICT (numero) DO NOTHING
+    RETURNING numero
+"""
+SQL_COMPROBANTES_EXISTENTES = "SELECT numero, estudiante_id, curso_codigo FROM comprobantes WHERE numero = ANY(%s)"
+SQL_RESERVAR_NODO = "SELECT pg_try_advisory_lock(%s, %s)"
+# pg_try_advisory_lock(int, int) aparece en pg_locks con classid/objid y objsubid = 2
+SQL_NODO_VIGENTE = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_locks
+        WHERE locktype = 'advisory' AND classid = %s AND objid = %s AND objsubid = 2
+          AND pid = pg_backend_pid() AND granted
+    )
+"""
+
+
+class NodoNoDisponibleError(RuntimeError):
+    """No se pudo reservar un nodo para el generador de comprobantes."""
+
+
+def _conexion_nodos(latido):
+    # Con la red caída, las consultas fallan en ~latido en vez de esperar al TCP del sistema
+    espera = max(1, int(latido))
+    conn = get_connection(os.getenv("PGLISTEN_HOST"), keepalives=1, keepalives_idle=espera,
+                          keepalives_interval=1, keepalives_count=3, tcp_user_timeout=espera * 1000)
+    conn.autocommit = True
+    return conn
+
+
+class GeneradorSnowflake:
+    """
+    Con `nodo` fijo no toca la base (pruebas, benchmarks). Sin él, el nodo se
+    reserva con `reservar()`; `siguiente()` lo reserva si hace falta y deja
+    de usarlo si el lock se pierde.
+    """
+
+    def __init__(self, nodo=None, epoca=EPOCA_COMPROBANTES, reloj=time.time, latido=2.0):
+        if nodo is not None and not 0 <= nodo <= MAX_NODO:
+            raise ValueError(f"El nodo debe estar entre 0 y {MAX_NODO}")
+        self.nodo = nodo
+        self.epoca = epoca
+        self.latido = latido
+        self._reloj = reloj
+        self._lock = threading.RLock()
+        self._ultimo_ms = -1
+        self._secuencia = 0
+        self._conexion_nodo = None
+        self._verificado = 0.0   # última vez (monotonic) que se vio el lock en pg_locks
+        self._emitir_desde = 0.0
+        self._hilo = None
+        self._perdidas = 0
+
+    def reservar(self, pedido=None, fabrica=_conexion_nodos):
+        """
+        Reserva `pedido` (o el primer nodo libre) con un advisory lock que dura
+        lo que la conexión. NodoNoDisponibleError si no hay ninguno.
+        """
+        with self._lock:
+            if self.nodo is not None:
+                return self.nodo
+            candidatos = range(MAX_NODO + 1) if pedido is None else (pedido,)
+            conn = fabrica(self.latido)
+            try:
+                with conn.cursor() as cur:
+                    for nodo in candidatos:
+                        cur.execute(SQL_RESERVAR_NODO, (CLAVE_NODOS, nodo))
+                        if cur.fetchone()[0]:
+                            self.nodo, self._conexion_nodo = nodo, conn
+                            ahora = time.monotonic()
+                            # Quien tenía el nodo puede tardar un latido en notar que lo perdió
+                            self._verificado, self._emitir_desde = ahora, ahora + self.latido
+                            self._vigilar()
+                            logger.info("Comprobantes: nodo %d reservado", nodo)
+                            return nodo
+            except Exception:
+                conn.close()
+                raise
+            conn.close()
+        if pedido is not None:
+            raise NodoNoDisponibleError(f"El nodo de comprobantes {pedido} ya lo usa otro proceso")
+        raise NodoNoDisponibleError(f"Los {MAX_NODO + 1} nodos de comprobantes están en uso")
+
+    def liberar(self):
+        """Suelta el nodo reservado (al apagar la API)."""
+        with self._lock:
+            if self._conexion_nodo is not None:
+                self._conexion_nodo.close()
+                self._conexion_nodo = None
+                self.nodo = None
+
+    def verificar(self):
+        """¿Sigue siendo nuestro el nodo? Si el lock o la sesión se perdieron, deja de usarlo."""
+        with self._lock:
+            conn = self._conexion_nodo
+            if conn is None:
+                return self.nodo is not None
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(SQL_NODO_VIGENTE, (CLAVE_NODOS, self.nodo))
+                    vigente = cur.fetchone()[0]
+            except Exception as e:
+                self.perder(f"la sesión del advisory lock se cayó ({e})")
+                return False
+            if not vigente:
+                self.perder("el advisory lock ya no está en pg_locks")
+                return False
+            self._verificado = time.monotonic()
+            return True
+
+    def perder(self, motivo):
+        """Deja de emitir con el nodo actual; el próximo `siguiente()` reserva otro."""
+        with self._lock:
+            if self._conexion_nodo is None:
+                return
+            logger.error("Comprobantes: se perdió el nodo %d: %s; no se emite hasta reservar otro",
+                         self.nodo, motivo)
+            try:
+                self._conexion_nodo.close()
+            except Exception:
+                pass
+            self._conexion_nodo = None
+            self.nodo = None
+            self._perdidas += 1
+
+    def conflicto(self, numero):
+        """Un número nuestro ya estaba en la base con otro contenido: otro proceso usa el nodo."""
+        with self._lock:
+            if self.nodo is not None and (numero >> BITS_SECUENCIA) & MAX_NODO == self.nodo:
+                self.perder(f"el comprobante {numero} ya lo emitió otro proceso con el mismo nodo")
+
+    def metricas(self):
+        with self._lock:
+            return {"nodo": self.nodo, "perdidas": self._perdidas}
+
+    def _vigilar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ciclo_vigilancia, name="nodo-comprobantes", daemon=True)
+            self._hilo.start()
+
+    def _ciclo_vigilancia(self):
+        while True:
+            time.sleep(self.latido / 2)
+            if self._conexion_nodo is not None:
+                self.verificar()
+
+    def _ahora_ms(self):
+        return int(self._reloj() * 1000) - self.epoca
+
+    def siguiente(self):
+        with self._lock:
+            # Sin una comprobación reciente del lock no se emite: se comprueba ahora
+            if self._conexion_nodo is not None and time.monotonic() - self._verificado > self.latido:
+                self.verificar()
+            if self.nodo is None:
+                self.reservar(NODO_CONFIGURADO)
+            espera = self._emitir_desde - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            ms = self._ahora_ms()
+            # Si el reloj retrocede (NTP), se sigue con el último milisegundo usado
+            if ms <= self._ultimo_ms:
+                ms = self._ultimo_ms
+                self._secuencia = (self._secuencia + 1) & MAX_SECUENCIA
+                if self._secuencia == 0:
+                    # Secuencia agotada en este milisegundo: se pasa al siguiente
+                    ms += 1
+                    while self._ahora_ms() < ms and ms - self._ahora_ms() < 5:
+                        time.sleep(0.0001)
+            else:
+                self._secuencia = 0
+            self._ultimo_ms = ms
+            return (ms << (BITS_NODO + BITS_SECUENCIA)) | (self.nodo << BITS_SECUENCIA) | self._secuencia
+
+    def fecha_ms(self, numero):
+        """Milisegundos Unix en que se emitió `numero`."""
+        return (numero >> (BITS_NODO + BITS_SECUENCIA)) + self.epoca
+
+
+class EscritorComprobantes:
+    """
+    Buffer de comprobantes pendientes con un hilo que los inserta por lotes.
+    Si la base de datos falla, las filas se conservan y se reintentan.
+    """
+
+    def __init__(self, intervalo=0.5, lote=500, max_pendientes=50000, al_conflicto=None):
+        self.intervalo = intervalo
+        self.lote = lote
+        self.max_pendientes = max_pendientes
+        self.al_conflicto = al_conflicto
+
+        self._lock = threading.Condition()
+        self._pendientes = {}    # numero -> fila, en orden de emisión
+        self._hilo = None
+        self._cerrado = False
+
+        self._escritos = 0
+        self._lotes = 0
+        self._fallos = 0
+        self._conflictos = []    # filas que no se guardaron porque su número ya era de otra
+
+    def agregar(self, fila):
+        """Encola una fila (numero, estudiante_id, curso_codigo, fecha, estado)."""
+        with self._lock:
+            self._iniciar()
+            # Contrapresión: si la base no da abasto, quien emite espera al flush
+            while len(self._pendientes) >= self.max_pendientes and not self._cerrado:
+                self._lock.notify_all()
+                self._lock.wait(self.intervalo)
+            self._pendientes[fila[0]] = fila
+            if len(self._pendientes) >= self.lote:
+                self._lock.notify_all()
+
+    def pendiente(self, numero):
+        with self._lock:
+            return self._pendientes.get(numero)
+
+    def conflictos(self):
+        with self._lock:
+            return list(self._conflictos)
+
+    def pendientes_de(self, estudiante_id):
+        with self._lock:
+            return [f for f in self._pendientes.values() if f[1] == estudiante_id]
+
+    def vaciar(self):
+        """Escribe todo lo pendiente ahora (p. ej. al apagar la API)."""
+        while True:
+            with self._lock:
+                filas = list(self._pendientes.values())[:self.lote]
+            if not filas or not self._escribir(filas):
+                return
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrado = True
+            self._lock.notify_all()
+        if self._hilo is not None:
+            self._hilo.join(timeout=10)
+            self._hilo = None
+        self.vaciar()
+
+    # ---------------- utilidades internas ---------------- #
+
+    def _iniciar(self):
+        if self._hilo is None and not self._cerrado:
+            self._hilo = threading.Thread(target=self._ciclo, name="escritor-comprobantes", daemon=True)
+            self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            with self._lock:
+                if not self._cerrado and len(self._pendientes) < self.lote:
+                    self._lock.wait(self.intervalo)
+                if self._cerrado:
+                    return
+                filas = list(self._pendientes.values())[:self.lote]
+            if filas and not self._escribir(filas):
+                time.sleep(self.intervalo)
+
+    def _escribir(self, filas):
+        try:
+            with conexion() as conn, conn.cursor() as cur:
+                insertados = execute_values(cur, SQL_INSERTAR_COMPROBANTES, filas, page_size=self.lote, fetch=True)
+                if len(insertados) < len(filas):
+                    self._revisar_conflictos(cur, filas, {row[0] for row in insertados})
+        except Exception as e:
+            with self._lock:
+                self._fallos += 1
+            logger.warning("No se pudieron guardar %d comprobantes (se reintenta): %s", len(filas), e)
+            return False
+        with self._lock:
+            for fila in filas:
+                self._pendientes.pop(fila[0], None)
+            self._escritos += len(filas)
+            self._lotes += 1
+            self._lock.notify_all()
+        return True
+
+    def _revisar_conflictos(self, cur, filas, insertados):
+        """Las filas que no entraron: si la guardada es otra (mismo número), es un conflicto real."""
+        omitidas = {fila[0]: fila for fila in filas if fila[0] not in insertados}
+        cur.execute(SQL_COMPROBANTES_EXISTENTES, (list(omitidas),))
+        for numero, estudiante_id, curso_codigo in cur.fetchall():
+            fila = omitidas[numero]
+            if (fila[1], fila[2]) != (estudiante_id, curso_codigo):
+                with self._lock:
+                    self._conflictos.append(fila)
+                logger.error(
+                    "Comprobante %d duplicado: ya existe para estudiante %s / %s, no se guardó el de "
+                    "estudiante %s / %s (¿dos procesos con el mismo nodo?)",
+                    numero, estudiante_id, curso_codigo, fila[1], fila[2],
+                )
+                if self.al_conflicto is not None:
+                    self.al_conflicto(numero)
+
+    # ---------------- métricas ---------------- #
+
+    def metricas(self):
+        with self._lock:
+            return {
+                "pendientes": len(self._pendientes),
+                "escritos": self._escritos,
+                "lotes": self._lotes,
+                "filas_por_lote": round(self._escritos / self._lotes, 1) if self._lotes else 0.0,
+                "fallos": self._fallos,
+                "conflictos": len(self._conflictos),
+            }
+
+
+NODO_CONFIGURADO = int(os.environ["COMPROBANTE_NODO"]) if os.getenv("COMPROBANTE_NODO") else None
+if NODO_CONFIGURADO is not None and not 0 <= NODO_CONFIGURADO <= MAX_NODO:
+    raise ValueError(f"COMPROBANTE_NODO debe estar entre 0 y {MAX_NODO}")
+
+# El nodo se reserva en el arranque de la API (o en el primer comprobante, fuera de la API)
+generador_comprobantes = GeneradorSnowflake(latido=float(os.getenv("COMPROBANTE_LATIDO", "2")))
+escritor_comprobantes = EscritorComprobantes(
+    intervalo=float(os.getenv("COMPROBANTE_FLUSH", "0.5")),
+    lote=int(os.getenv("COMPROBANTE_LOTE", "500")),
+    al_conflicto=generador_comprobantes.conflicto,
+)
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from busqueda import IndiceCursos
+from cache import catalogo_cache
+from database import conexion
+
+SQL_INDICE_CURSOS = """
+    SELECT c.id_curso, c.codigo, c.nombre, c.estado, c.semestre, l.nombre
+    FROM cursos c
+    LEFT JOIN lineas_enfasis l ON l.id_linea = c.id_linea
+"""
+
+_indice = None
+_version = None
+_construido = 0.0
+_construyendo = threading.Lock()
+
+
+def _vigente():
+    if _indice is None or _version != catalogo_cache.version():
+        return False
+    # Sin backend compartido no hay aviso de otros workers: se reconstruye cada CATALOGO_CACHE_TTL
+    return catalogo_cache.backend is not None or time.monotonic() - _construido < catalogo_cache.ttl
+
+
+def asegurar_indice():
+    """
+    El índice de búsqueda, reconstruido si el catálogo cambió. Mientras un hilo
+    lo reconstruye los demás siguen buscando en el anterior; solo esperan si
+    todavía no hay ninguno.
+    """
+    global _indice, _version, _construido
+    if _vigente():
+        return _indice
+    if not _construyendo.acquire(blocking=_indice is None):
+        return _indice
+    try:
+        if not _vigente():
+            version = catalogo_cache.version()
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute(SQL_INDICE_CURSOS)
+                filas = cur.fetchall()
+            _indice, _version, _construido = IndiceCursos(filas), version, time.monotonic()
+    finally:
+        _construyendo.release()
+    return _indice
+
+
+class BusquedaController:
+
+    def buscar(self, texto: str, limite: int = 10, estado: str = None, semestre: int = None):
+        return asegurar_indice().buscar(texto, limite, estado, semestre)
+
+    def metricas(self):
+        return _indice.metricas() if _indice is not None else None
@@ -0,0 +1,67 @@
+from datetime import datetime
+from comprobantes import escritor_comprobantes, generador_comprobantes
+from database import conexion
+from paginacion import codificar_cursor, decodificar_cursor, normalizar_limite
+
+COLUMNAS_COMPROBANTE = "numero, estudiante_id, curso_codigo, fecha, estado"
+
+
+def comprobante_a_dict(fila):
+    numero, estudiante_id, curso_codigo, fecha, estado = fila
+    return {
+        # Como texto: un id de 63 bits no cabe en un Number de JavaScript
+        "numero_transaccion": f"#{numero}",
+        "numero": str(numero),
+        "estudiante_id": estudiante_id,
+        "curso_codigo": curso_codigo,
+        "fecha": fecha.isoformat(),
+        "estado": estado,
+    }
+
+
+class ComprobanteController:
+
+    def generar(self, estudiante_id: int, curso_codigo: str, estado: str = "Pagado"):
+        """Emite un comprobante: el número se asigna en memoria y la fila se guarda en diferido."""
+        fila = (generador_comprobantes.siguiente(), estudiante_id, curso_codigo, datetime.now(), estado)
+        escritor_comprobantes.agregar(fila)
+        return comprobante_a_dict(fila)
+
+    def obtener(self, numero: int):
+        fila = escritor_comprobantes.pendiente(numero)
+        if fila is None:
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute(f"SELECT {COLUMNAS_COMPROBANTE} FROM comprobantes WHERE numero = %s", (numero,))
+                fila = cur.fetchone()
+        return comprobante_a_dict(fila) if fila else None
+
+    def listar_por_estudiante(self, estudiante_id: int, cursor: str = None, limite: int = None):
+        """Comprobantes de un estudiante, los más recientes primero. Retorna (comprobantes, next_cursor)."""
+        limite = normalizar_limite(limite)
+        condiciones = ["estudiante_id = %s"]
+        params = [estudiante_id]
+        if cursor:
+            valores = decodificar_cursor(cursor)
+            if len(valores) != 1:
+                raise ValueError("Cursor de paginación inválido")
+            condiciones.append("numero < %s")
+            params.append(int(valores[0]))
+
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT {COLUMNAS_COMPROBANTE} FROM comprobantes
+                WHERE {' AND '.join(condiciones)}
+                ORDER BY numero DESC
+                LIMIT %s
+            """, (*params, limite + 1))
+            filas = cur.fetchall()
+
+        if not cursor:
+            # Los aún no escritos son los más recientes: van al inicio de la primera página
+            guardados = {f[0] for f in filas}
+            pendientes = [f for f in escritor_comprobantes.pendientes_de(estudiante_id) if f[0] not in guardados]
+            filas = sorted(pendientes, key=lambda f: f[0], reverse=True) + filas
+
+        pagina = filas[:limite]
+        next_cursor = codificar_cursor(str(pagina[-1][0])) if len(filas) > limite else None
+        return [comprobante_a_dict(f) for f in pagina], next_cursor
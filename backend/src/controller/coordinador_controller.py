@@ -1,30 +1,51 @@
-import sys
-sys.path.append("src")
-
-from database import get_connection
+from cache import catalogo_cache
+from database import conexion
+from controller.notificacion_controller import notificar_inscritos, notificar_linea
 from model.Coordinador import Coordinador
 
 class CoordinadorController:
     def crear_coordinador(self, nombre):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO coordinadores (nombre)
-            VALUES (%s)
-            RETURNING id_coordinador
-        """, (nombre,))
-        id_coordinador = cur.fetchone()[0]
-        conn.commit()
-        cur.close()
-        conn.close()
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO coordinadores (nombre)
+                VALUES (%s)
+                RETURNING id_coordinador
+            """, (nombre,))
+            id_coordinador = cur.fetchone()[0]
         return Coordinador(id_coordinador, nombre)
 
     def listar_coordinadores(self):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT id_coordinador, nombre FROM coordinadores")
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("SELECT id_coordinador, nombre FROM coordinadores")
+            rows = cur.fetchall()
         return [Coordinador(*row) for row in rows]
 
+    def aprobar_curso(self, curso):
+        return self._cambiar_estado(curso, "aprobado")
+
+    def rechazar_curso(self, curso):
+        return self._cambiar_estado(curso, "rechazado")
+
+    def _cambiar_estado(self, curso, estado):
+        # Solo los cursos pendientes cambian de estado
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("""
+                UPDATE cursos SET estado = %s
+                WHERE id_curso = %s AND estado = 'pendiente'
+                RETURNING estado, nombre
+            """, (estado, curso.id_curso))
+            row = cur.fetchone()
+            if not row:
+                return f"El curso {curso.codigo} no está pendiente"
+            # Avisos a los inscritos en la misma transacción: si el cambio no se confirma, tampoco ellos
+            nombre = row[1]
+            if estado == "aprobado":
+                notificar_inscritos(cur, curso.id_curso, "curso_aprobado", f"El curso {nombre} fue aprobado")
+            else:
+                notificar_inscritos(cur, curso.id_curso, "curso_rechazado", f"El curso {nombre} fue rechazado")
+        # El fan-out a la línea de énfasis va después del commit, en su propia transacción
+        if estado == "aprobado":
+            notificar_linea(curso.id_curso, "curso_nuevo", f"Nuevo curso disponible: {nombre}")
+        catalogo_cache.invalidar()
+        curso.estado = row[0]
+        return f"Curso {curso.codigo} {estado}"
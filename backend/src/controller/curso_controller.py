@@ -1,39 +1,216 @@
-import sys
-sys.path.append("src")
+from psycopg2.extras import Json
 
-from database import get_connection
+from cache import catalogo_cache, NO_EXISTE
+from controller import prerrequisito_controller
+from database import conexion
+from horarios import franjas_de
 from model.Curso import Curso
+from paginacion import codificar_cursor, decodificar_cursor, normalizar_limite
+
+# Mismo orden que los parámetros de Curso(...)
+COLUMNAS_CURSO = "id_curso, nombre, cupo, creditos, cronograma, estado, codigo, semestre"
+
+# Órdenes permitidos en buscar_cursos (columna SQL, atributo de Curso)
+ORDENES_CURSO = {
+    "codigo": ("codigo", "codigo"),
+    "nombre": ("nombre", "nombre"),
+    "semestre": ("semestre", "semestre"),
+}
+
+
+# SQL compartido con CursoControllerAsync
+SQL_CONTAR_INSCRITOS = "SELECT inscritos FROM cursos WHERE id_curso = %s"
+SQL_CONTAR_INSCRITOS_POR_CURSO = "SELECT codigo, estado, cupo, inscritos FROM cursos"
+
+
+def armar_busqueda_cursos(semestre, estado, orden, cursor, limite):
+    """Arma la consulta de buscar_cursos. Retorna (sql, params, limite normalizado)."""
+    if orden not in ORDENES_CURSO:
+        raise ValueError(f"Orden inválido: {orden}")
+    columna, _ = ORDENES_CURSO[orden]
+    limite = normalizar_limite(limite)
+
+    condiciones = []
+    params = []
+    if estado is not None:
+        condiciones.append("estado = %s")
+        params.append(estado)
+    if semestre is not None:
+        condiciones.append("semestre = %s")
+        params.append(semestre)
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        if len(valores) != 3 or valores[0] != orden:
+            raise ValueError("El cursor no corresponde a este orden")
+        condiciones.append(f"({columna}, id_curso) > (%s, %s)")
+        params.extend(valores[1:])
+
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    # Se pide una fila extra para saber si hay otra página
+    sql = f"""
+        SELECT {COLUMNAS_CURSO} FROM cursos
+        {where}
+        ORDER BY {columna}, id_curso
+        LIMIT %s
+    """
+    return sql, (*params, limite + 1), limite
+
+
+def cortar_pagina_cursos(rows, orden, limite):
+    """Convierte las filas en Curso y calcula el cursor de la página siguiente."""
+    _, atributo = ORDENES_CURSO[orden]
+    cursos = [Curso(*row) for row in rows[:limite]]
+    next_cursor = None
+    if len(rows) > limite:
+        ultimo = cursos[-1]
+        next_cursor = codificar_cursor(orden, getattr(ultimo, atributo), ultimo.id_curso)
+    return cursos, next_cursor
+
+
+def conteos_por_codigo(rows):
+    return {
+        codigo: {"estado": estado, "cupo": cupo, "inscritos": inscritos}
+        for codigo, estado, cupo, inscritos in rows
+    }
+
+
+def guardar_codigos(rows, codigos, version):
+    """Cachea el resultado de una búsqueda por varios códigos, incluidos los que no existen."""
+    cargados = {("codigo", c): NO_EXISTE for c in codigos}
+    for row in rows:
+        curso = Curso(*row)
+        cargados[("codigo", curso.codigo)] = curso
+    for clave, valor in cargados.items():
+        catalogo_cache.guardar(clave, valor, version)
+    return cargados
+
 
 class CursoController:
-    def crear_curso(self, nombre, cupo, creditos, cronograma):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO cursos (nombre, cupo, creditos, cronograma, estado)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING idCurso, estado
-        """, (nombre, cupo, creditos, cronograma, "pendiente"))
-        row = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
-        return Curso(row[0], nombre, cupo, creditos, cronograma, row[1])
+    # Las lecturas del catálogo pasan por catalogo_cache; los conteos de inscritos no se cachean
+
+    def crear_curso(self, codigo, nombre, cupo, semestre, creditos=3, cronograma=None, prerrequisitos=None):
+        # Valida las sesiones antes de guardar (ValueError si alguna está mal formada)
+        franjas_de(cronograma)
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO cursos (codigo, nombre, cupo, creditos, cronograma, estado, semestre)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                RETURNING id_curso, estado
+            """, (codigo, nombre, cupo, creditos, Json(cronograma or []), "pendiente", semestre))
+            row = cur.fetchone()
+            # Un curso nuevo no tiene dependientes, así que sus requisitos no pueden cerrar un ciclo
+            cambio = (prerrequisito_controller.guardar_prerrequisitos(cur, row[0], codigo, prerrequisitos)
+                      if prerrequisitos else None)
+        if cambio:
+            prerrequisito_controller.registrar_cambio(row[0], codigo, *cambio)
+        catalogo_cache.invalidar()
+        return Curso(row[0], nombre, cupo, creditos, cronograma, row[1], codigo, semestre)
 
     def listar_cursos(self):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT idCurso, nombre, cupo, creditos, cronograma, estado FROM cursos")
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
+        return catalogo_cache.obtener(("listar",), self._listar_cursos)
+
+    def _listar_cursos(self):
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT {COLUMNAS_CURSO} FROM cursos")
+            rows = cur.fetchall()
         return [Curso(*row) for row in rows]
 
+    def buscar_cursos(self, semestre=None, estado=None, orden="codigo", cursor=None, limite=None):
+        """
+        Lista cursos filtrados en SQL con paginación por keyset.
+        Retorna (cursos, next_cursor); next_cursor es None en la última página.
+        """
+        sql, params, limite = armar_busqueda_cursos(semestre, estado, orden, cursor, limite)
+
+        def cargar():
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+            return cortar_pagina_cursos(rows, orden, limite)
+
+        return catalogo_cache.obtener(("buscar", semestre, estado, orden, cursor, limite), cargar)
+
+    def obtener_por_codigo(self, codigo):
+        """Busca un curso por su código (índice único). Retorna None si no existe."""
+        def cargar():
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute(f"SELECT {COLUMNAS_CURSO} FROM cursos WHERE codigo = %s", (codigo,))
+                row = cur.fetchone()
+            return Curso(*row) if row else NO_EXISTE
+
+        curso = catalogo_cache.obtener(("codigo", codigo), cargar)
+        return None if curso is NO_EXISTE else curso
+
+    def obtener_por_codigos(self, codigos):
+        """Busca varios cursos en una sola consulta. Retorna {codigo: Curso} solo con los que existen."""
+        version = catalogo_cache.version()
+        encontrados, faltantes = catalogo_cache.obtener_varios([("codigo", c) for c in set(codigos)])
+        if faltantes:
+            faltantes = [clave[1] for clave in faltantes]
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute(f"SELECT {COLUMNAS_CURSO} FROM cursos WHERE codigo = ANY(%s)", (faltantes,))
+                rows = cur.fetchall()
+            encontrados.update(guardar_codigos(rows, faltantes, version))
+        return {clave[1]: c for clave, c in encontrados.items() if c is not NO_EXISTE}
+
+    def listar_codigos(self):
+        """Conjunto de todos los códigos de curso (índice en memoria para el chat)."""
+        def cargar():
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute("SELECT codigo FROM cursos")
+                rows = cur.fetchall()
+            return frozenset(row[0] for row in rows)
+
+        return catalogo_cache.obtener(("codigos",), cargar)
+
     def contar_inscritos(self, curso_id):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM inscripciones WHERE curso_id = %s", (curso_id,))
-        inscritos = cur.fetchone()[0]
-        cur.close()
-        conn.close()
-        return inscritos
+        """Lee el contador cursos.inscritos (0 si el curso no existe)."""
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_CONTAR_INSCRITOS, (curso_id,))
+            row = cur.fetchone()
+        return row[0] if row else 0
+
+    def contar_inscritos_por_curso(self):
+        """
+        Inscritos de todos los cursos en una sola consulta (lee los contadores).
+        Retorna {codigo: {"estado", "cupo", "inscritos"}}, incluyendo cursos sin inscritos.
+        """
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_CONTAR_INSCRITOS_POR_CURSO)
+            rows = cur.fetchall()
+        return conteos_por_codigo(rows)
+
+    def reconciliar_inscritos(self, reparar=True):
+        """
+        Compara cursos.inscritos con el conteo real de inscripciones.
+
+        Primero detecta los cursos con diferencia sin bloquear nada; luego, si
+        `reparar`, corrige cada uno en su propia transacción con la fila del
+        curso bloqueada, recontando para no pisar inscripciones concurrentes.
+        Retorna [{"codigo", "contador", "real"}] de los cursos con diferencia.
+        """
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT c.id_curso, c.codigo, c.inscritos, COUNT(i.id)
+                FROM cursos c
+                LEFT JOIN inscripciones i ON i.curso_id = c.id_curso
+                GROUP BY c.id_curso
+                HAVING c.inscritos <> COUNT(i.id)
+            """)
+            candidatos = cur.fetchall()
 
+        diferencias = []
+        for id_curso, codigo, _, _ in candidatos:
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute("SELECT inscritos FROM cursos WHERE id_curso = %s FOR UPDATE", (id_curso,))
+                row = cur.fetchone()
+                if not row:
+                    continue
+                cur.execute("SELECT COUNT(*) FROM inscripciones WHERE curso_id = %s", (id_curso,))
+                real = cur.fetchone()[0]
+                if row[0] == real:
+                    continue
+                diferencias.append({"codigo": codigo, "contador": row[0], "real": real})
+                if reparar:
+                    cur.execute("UPDATE cursos SET inscritos = %s WHERE id_curso = %s", (real, id_curso))
+        return diferencias
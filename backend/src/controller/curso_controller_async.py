@@ -0,0 +1,63 @@
+from cache import catalogo_cache, NO_EXISTE
+from database_async import conexion_async
+from model.Curso import Curso
+from controller.curso_controller import (COLUMNAS_CURSO, SQL_CONTAR_INSCRITOS, SQL_CONTAR_INSCRITOS_POR_CURSO,
+                                         armar_busqueda_cursos, conteos_por_codigo, cortar_pagina_cursos,
+                                         guardar_codigos)
+
+
+class CursoControllerAsync:
+    """Versión asíncrona de las lecturas de CursoController (mismo SQL)."""
+
+    async def buscar_cursos(self, semestre=None, estado=None, orden="codigo", cursor=None, limite=None):
+        sql, params, limite = armar_busqueda_cursos(semestre, estado, orden, cursor, limite)
+
+        async def cargar():
+            async with conexion_async() as conn, conn.cursor() as cur:
+                await cur.execute(sql, params)
+                rows = await cur.fetchall()
+            return cortar_pagina_cursos(rows, orden, limite)
+
+        return await catalogo_cache.obtener_async(("buscar", semestre, estado, orden, cursor, limite), cargar)
+
+    async def obtener_por_codigo(self, codigo):
+        async def cargar():
+            async with conexion_async() as conn, conn.cursor() as cur:
+                await cur.execute(f"SELECT {COLUMNAS_CURSO} FROM cursos WHERE codigo = %s", (codigo,))
+                row = await cur.fetchone()
+            return Curso(*row) if row else NO_EXISTE
+
+        curso = await catalogo_cache.obtener_async(("codigo", codigo), cargar)
+        return None if curso is NO_EXISTE else curso
+
+    async def obtener_por_codigos(self, codigos):
+        version = catalogo_cache.version()
+        encontrados, faltantes = catalogo_cache.obtener_varios([("codigo", c) for c in set(codigos)])
+        if faltantes:
+            faltantes = [clave[1] for clave in faltantes]
+            async with conexion_async() as conn, conn.cursor() as cur:
+                await cur.execute(f"SELECT {COLUMNAS_CURSO} FROM cursos WHERE codigo = ANY(%s)", (faltantes,))
+                rows = await cur.fetchall()
+            encontrados.update(guardar_codigos(rows, faltantes, version))
+        return {clave[1]: c for clave, c in encontrados.items() if c is not NO_EXISTE}
+
+    async def listar_codigos(self):
+        async def cargar():
+            async with conexion_async() as conn, conn.cursor() as cur:
+                await cur.execute("SELECT codigo FROM cursos")
+                rows = await cur.fetchall()
+            return frozenset(row[0] for row in rows)
+
+        return await catalogo_cache.obtener_async(("codigos",), cargar)
+
+    async def contar_inscritos(self, curso_id):
+        async with conexion_async() as conn, conn.cursor() as cur:
+            await cur.execute(SQL_CONTAR_INSCRITOS, (curso_id,))
+            row = await cur.fetchone()
+        return row[0] if row else 0
+
+    async def contar_inscritos_por_curso(self):
+        async with conexion_async() as conn, conn.cursor() as cur:
+            await cur.execute(SQL_CONTAR_INSCRITOS_POR_CURSO)
+            rows = await cur.fetchall()
+        return conteos_por_codigo(rows)
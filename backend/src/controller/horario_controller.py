@@ -0,0 +1,54 @@
+from database import conexion
+from horarios import choques_entre, detectar_conflictos, franjas_de
+
+# Cursos en curso (inscripción pendiente de nota) de un estudiante, sin contar `curso_id`
+SQL_HORARIO_ESTUDIANTE = """
+    SELECT c.codigo, c.cronograma
+    FROM inscripciones i
+    JOIN cursos c ON c.id_curso = i.curso_id
+    WHERE i.estudiante_id = %s AND i.estado = 'pendiente' AND i.curso_id <> %s
+"""
+# Serializa las inscripciones de un mismo estudiante: dos en paralelo no pueden chocar sin verse
+SQL_BLOQUEAR_ESTUDIANTE = "SELECT 1 FROM estudiantes WHERE id_estudiante = %s FOR UPDATE"
+SQL_INSCRIPCIONES_SEMESTRE = """
+    SELECT i.estudiante_id, c.codigo, c.cronograma
+    FROM inscripciones i
+    JOIN cursos c ON c.id_curso = i.curso_id
+    WHERE c.semestre = %s AND i.estado = 'pendiente' AND c.cronograma <> '[]'::jsonb
+    ORDER BY i.estudiante_id
+"""
+
+
+def buscar_choques(filas_horario, codigo, cronograma):
+    """
+    Choques del curso (`codigo`, `cronograma`) contra las filas de SQL_HORARIO_ESTUDIANTE.
+    El horario se lee en la transacción que inscribe y se usa una vez: se compara
+    directo, sin armar un IndiceHorario (ver horarios.py).
+    """
+    franjas = franjas_de(cronograma)
+    if not franjas:
+        return []
+    return choques_entre(filas_horario, codigo, franjas)
+
+
+def describir_choques(choques):
+    return "Choque de horario: " + "; ".join(f"{c['con']} ({c['franja']})" for c in choques)
+
+
+class HorarioController:
+
+    def choques_curso(self, estudiante_id: int, curso):
+        """Choques de `curso` con lo que el estudiante ya cursa (sin inscribirlo)."""
+        if not franjas_de(curso.cronograma):
+            return []
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_HORARIO_ESTUDIANTE, (estudiante_id, curso.id_curso))
+            filas = cur.fetchall()
+        return buscar_choques(filas, curso.codigo, curso.cronograma)
+
+    def conflictos_semestre(self, semestre: int):
+        """Todos los choques entre inscripciones vigentes de cursos de un semestre."""
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_INSCRIPCIONES_SEMESTRE, (semestre,))
+            filas = cur.fetchall()
+        return detectar_conflictos(filas)
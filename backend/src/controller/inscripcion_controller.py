@@ -1,47 +1,515 @@
-import sys
-from fastapi import APIRouter
-from database import get_connection
+from itertools import groupby
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from psycopg2.extras import execute_values
+from cache import ocupacion_cache
+from database import conexion
+from controller.horario_controller import (SQL_BLOQUEAR_ESTUDIANTE, SQL_HORARIO_ESTUDIANTE, buscar_choques,
+                                           describir_choques)
+from horarios import IndiceHorario, choques_con, franjas_de
+from controller.notificacion_controller import notificar_estudiante, notificar_linea
+from controller.prerrequisito_controller import SQL_APROBADOS, asegurar_grafo
+from controller.progreso_controller import descartar_progreso
 from model.Inscripcion import Inscripcion
-
-sys.path.append("src")
+from paginacion import codificar_cursor, decodificar_cursor, normalizar_limite
+from serializacion import RespuestaJSON, filas_a_dicts
 
 router = APIRouter(prefix="/inscripciones", tags=["Inscripciones"])
 
+COLUMNAS_INSCRIPCION = "id, estudiante_id, curso_id, fecha_inscripcion, estado, nota"
+CAMPOS_INSCRIPCION = tuple(COLUMNAS_INSCRIPCION.split(", "))
+
+
+# SQL compartido con InscripcionControllerAsync
+SQL_BUSCAR_INSCRIPCION = f"""
+    SELECT {COLUMNAS_INSCRIPCION} FROM inscripciones
+    WHERE estudiante_id = %s AND curso_id = %s
+"""
+# cursos.inscritos se actualiza en la misma transacción que inserta o borra la inscripción
+SQL_RESERVAR_CUPO = """
+    UPDATE cursos SET inscritos = inscritos + 1
+    WHERE id_curso = %s AND inscritos < cupo
+    RETURNING inscritos, codigo, cronograma
+"""
+SQL_LIBERAR_CUPO = "UPDATE cursos SET inscritos = inscritos - 1 WHERE id_curso = %s"
+SQL_EXISTE_CURSO = "SELECT 1 FROM cursos WHERE id_curso = %s"
+SQL_INSERTAR_INSCRIPCION = """
+    INSERT INTO inscripciones (estudiante_id, curso_id)
+    VALUES (%s, %s)
+    ON CONFLICT (estudiante_id, curso_id) DO NOTHING
+    RETURNING id, fecha_inscripcion, estado
+"""
+SQL_REGISTRAR_NOTA = f"""
+    UPDATE inscripciones
+    SET nota = %(nota)s,
+        estado = CASE WHEN %(nota)s >= %(aprobatoria)s THEN 'aprobado' ELSE 'reprobado' END
+    WHERE id = %(id)s
+    RETURNING {COLUMNAS_INSCRIPCION}
+"""
+
+# Lista de espera: los turnos de un curso van de cursos.espera_cabeza (el próximo en
+# pasar) a espera_cola (el próximo en llegar) sin huecos, así que la posición de un
+# estudiante es turno - espera_cabeza + 1: una lectura por clave, sin contar filas.
+# Todo cambio a la lista se hace con la fila del curso bloqueada.
+SQL_BLOQUEAR_CURSO = """
+    SELECT codigo, nombre, cronograma, cupo, inscritos, espera_cabeza, espera_cola
+    FROM cursos WHERE id_curso = %s FOR UPDATE
+"""
+SQL_TURNO_EN_ESPERA = "SELECT turno FROM lista_espera WHERE curso_id = %s AND estudiante_id = %s"
+SQL_SIGUIENTE_EN_ESPERA = """
+    DELETE FROM lista_espera
+    WHERE (curso_id, turno) = (SELECT curso_id, turno FROM lista_espera WHERE curso_id = %s ORDER BY turno LIMIT 1)
+    RETURNING estudiante_id, turno
+"""
+SQL_LISTA_ESPERA_ESTUDIANTE = """
+    SELECT c.codigo, c.nombre, l.turno - c.espera_cabeza + 1, c.espera_cola - c.espera_cabeza, l.fecha
+    FROM lista_espera l
+    JOIN cursos c ON c.id_curso = l.curso_id
+    WHERE l.estudiante_id = %s
+    ORDER BY l.fecha
+"""
+CAMPOS_LISTA_ESPERA = ("curso_codigo", "nombre", "posicion", "en_espera", "fecha")
+
+# Nota mínima (escala 0.0 - 5.0) para aprobar un curso
+NOTA_APROBATORIA = 3.0
+
+
+def armar_pagina_inscripciones(columna, valor, cursor, limite):
+    """Arma la consulta paginada por id. Retorna (sql, params, limite normalizado)."""
+    limite = normalizar_limite(limite)
+    condiciones = []
+    params = []
+    if columna is not None:
+        condiciones.append(f"{columna} = %s")
+        params.append(valor)
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        if len(valores) != 1:
+            raise ValueError("Cursor de paginación inválido")
+        condiciones.append("id > %s")
+        params.append(valores[0])
+
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    sql = f"""
+        SELECT {COLUMNAS_INSCRIPCION} FROM inscripciones
+        {where}
+        ORDER BY id
+        LIMIT %s
+    """
+    return sql, (*params, limite + 1), limite
+
+
+def cortar_pagina_inscripciones(rows, limite, como_dict=False):
+    """Con `como_dict` arma dicts directamente de las filas, sin crear Inscripcion (listados JSON)."""
+    pagina = rows[:limite]
+    next_cursor = codificar_cursor(pagina[-1][0]) if len(rows) > limite else None
+    if como_dict:
+        return filas_a_dicts(CAMPOS_INSCRIPCION, pagina), next_cursor
+    return [Inscripcion(*row) for row in pagina], next_cursor
+
+
+# Máximo de filas aceptadas en una inscripción por lote
+LOTE_MAXIMO = 20000
+
+
+class CursoNoEncontradoError(Exception):
+    pass
+
+
+class CupoAgotadoError(Exception):
+    pass
+
+
+class ConflictoHorarioError(Exception):
+    def __init__(self, choques):
+        super().__init__(describir_choques(choques))
+        self.choques = choques
+
+
+class PrerrequisitosPendientesError(Exception):
+    def __init__(self, faltantes):
+        super().__init__("Faltan prerrequisitos: " + ", ".join(faltantes))
+        self.faltantes = faltantes
+
 
 class InscripcionController:
 
     def crear_inscripcion(self, estudiante_id: int, curso_id: int):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO inscripciones (estudiante_id, curso_id)
-            VALUES (%s, %s)
-            RETURNING id, fecha_inscripcion, estado
-        """, (estudiante_id, curso_id))
+        inscripcion, _ = self.inscribir(estudiante_id, curso_id)
+        return inscripcion
+
+    def inscribir(self, estudiante_id: int, curso_id: int):
+        """
+        Reserva un cupo e inscribe al estudiante en una sola transacción.
+
+        El cupo se reserva con un UPDATE condicional sobre cursos.inscritos,
+        que bloquea solo la fila del curso: las inscripciones concurrentes a
+        un mismo curso se serializan entre sí pero no frenan las de otros
+        cursos. Es idempotente: si el estudiante ya estaba inscrito retorna
+        la inscripción existente sin consumir otro cupo. Si el curso tiene
+        sesiones que chocan con las de otro curso del estudiante lanza
+        ConflictoHorarioError y la reserva se deshace. Si le faltan
+        prerrequisitos lanza PrerrequisitosPendientesError antes de reservar.
+
+        Retorna (inscripcion, creada).
+        """
+        grafo = asegurar_grafo()
+        with conexion() as conn, conn.cursor() as cur:
+            existente = self._buscar(cur, estudiante_id, curso_id)
+            if existente:
+                return existente, False
+            self._verificar_prerrequisitos(cur, grafo, estudiante_id, curso_id)
+
+            cur.execute(SQL_RESERVAR_CUPO, (curso_id,))
+            reservado = cur.fetchone()
+            if not reservado:
+                cur.execute(SQL_EXISTE_CURSO, (curso_id,))
+                if not cur.fetchone():
+                    raise CursoNoEncontradoError(f"Curso {curso_id} no encontrado")
+                raise CupoAgotadoError("No hay cupos disponibles")
+            self._verificar_horario(cur, estudiante_id, curso_id, reservado[1], reservado[2])
+
+            cur.execute(SQL_INSERTAR_INSCRIPCION, (estudiante_id, curso_id))
+            row = cur.fetchone()
+            if not row:
+                # Un reintento concurrente lo inscribió primero: devolver el cupo
+                cur.execute(SQL_LIBERAR_CUPO, (curso_id,))
+                return self._buscar(cur, estudiante_id, curso_id), False
+        descartar_progreso(estudiante_id)
+        ocupacion_cache.invalidar()
+        return Inscripcion(row[0], estudiante_id, curso_id, row[1], row[2]), True
+
+    def cancelar(self, estudiante_id: int, curso_id: int):
+        """
+        Borra la inscripción y, en la misma transacción, pasa el cupo al
+        primero de la lista de espera. Si no hay nadie esperando libera el
+        cupo y, si el curso estaba lleno, avisa a los interesados de su línea
+        de énfasis después del commit (sin el curso bloqueado).
+        Retorna True si existía.
+        """
+        avisar = None
+        with conexion() as conn, conn.cursor() as cur:
+            # Mismo orden de bloqueo que inscribir (primero el curso) para no generar deadlocks.
+            # El bloqueo también serializa las cancelaciones concurrentes: cada cupo se promueve una sola vez.
+            cur.execute(SQL_BLOQUEAR_CURSO, (curso_id,))
+            curso = cur.fetchone()
+            cur.execute("""
+                DELETE FROM inscripciones
+                WHERE estudiante_id = %s AND curso_id = %s
+                RETURNING id
+            """, (estudiante_id, curso_id))
+            if not cur.fetchone():
+                return False
+            codigo, nombre, cronograma, cupo, inscritos, cabeza, cola = curso
+            promovido = self._promover(cur, curso_id, codigo, nombre, cronograma) if cola > cabeza else None
+            if promovido is None:
+                cur.execute(SQL_LIBERAR_CUPO, (curso_id,))
+                if inscritos >= cupo:
+                    avisar = f"¡Se liberó un cupo en {nombre}!"
+        if avisar:
+            notificar_linea(curso_id, "cupos", avisar, excluir=estudiante_id)
+        descartar_progreso(estudiante_id, *([promovido] if promovido is not None else []))
+        ocupacion_cache.invalidar()
+        return True
+
+    def _promover(self, cur, curso_id, codigo, nombre, cronograma):
+        """
+        Inscribe al primero de la lista de espera en el cupo que se acaba de
+        liberar (cursos.inscritos no cambia). Quien ya no puede tomarlo (por un
+        choque con un curso inscrito mientras esperaba) sale de la lista con un
+        aviso y pasa el siguiente. Retorna el estudiante inscrito o None.
+        """
+        while True:
+            cur.execute(SQL_SIGUIENTE_EN_ESPERA, (curso_id,))
+            siguiente = cur.fetchone()
+            if not siguiente:
+                return None
+            estudiante_id, turno = siguiente
+            cur.execute("UPDATE cursos SET espera_cabeza = %s WHERE id_curso = %s", (turno + 1, curso_id))
+            try:
+                self._verificar_horario(cur, estudiante_id, curso_id, codigo, cronograma)
+            except ConflictoHorarioError as e:
+                notificar_estudiante(cur, estudiante_id, curso_id, "lista_espera",
+                                     f"Se liberó un cupo en {nombre}, pero no pudimos inscribirte. {e}")
+                continue
+            cur.execute(SQL_INSERTAR_INSCRIPCION, (estudiante_id, curso_id))
+            if cur.fetchone():
+                notificar_estudiante(cur, estudiante_id, curso_id, "lista_espera",
+                                     f"¡Se liberó un cupo y quedaste inscrito en {nombre}!")
+                return estudiante_id
+
+    def unirse_lista_espera(self, estudiante_id: int, curso_id: int):
+        """
+        Pone al estudiante al final de la lista de espera de un curso lleno,
+        con las mismas validaciones de prerrequisitos y horario que inscribir.
+        Es idempotente: si ya estaba en la lista no cambia su turno.
+
+        Retorna (posicion, en_espera), o None si el curso tiene cupo (entonces
+        hay que inscribirlo directamente).
+        """
+        grafo = asegurar_grafo()
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_BLOQUEAR_CURSO, (curso_id,))
+            curso = cur.fetchone()
+            if not curso:
+                raise CursoNoEncontradoError(f"Curso {curso_id} no encontrado")
+            codigo, _, cronograma, cupo, inscritos, cabeza, cola = curso
+            cur.execute(SQL_TURNO_EN_ESPERA, (curso_id, estudiante_id))
+            turno = cur.fetchone()
+            if turno:
+                return turno[0] - cabeza + 1, cola - cabeza
+            if inscritos < cupo:
+                return None
+            if self._buscar(cur, estudiante_id, curso_id):
+                raise ValueError("El estudiante ya está inscrito en este curso")
+            self._verificar_prerrequisitos(cur, grafo, estudiante_id, curso_id)
+            self._verificar_horario(cur, estudiante_id, curso_id, codigo, cronograma)
+
+            cur.execute("UPDATE cursos SET espera_cola = espera_cola + 1 WHERE id_curso = %s", (curso_id,))
+            cur.execute("INSERT INTO lista_espera (curso_id, estudiante_id, turno) VALUES (%s, %s, %s)",
+                        (curso_id, estudiante_id, cola))
+        return cola - cabeza + 1, cola - cabeza + 1
+
+    def salir_lista_espera(self, estudiante_id: int, curso_id: int):
+        """Saca al estudiante de la lista de espera y adelanta a los que estaban detrás. Retorna True si estaba."""
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_BLOQUEAR_CURSO, (curso_id,))
+            cur.execute("""
+                DELETE FROM lista_espera
+                WHERE curso_id = %s AND estudiante_id = %s
+                RETURNING turno
+            """, (curso_id, estudiante_id))
+            row = cur.fetchone()
+            if not row:
+                return False
+            # Mantiene los turnos sin huecos; salir de la lista es mucho menos frecuente que consultarla
+            cur.execute("UPDATE lista_espera SET turno = turno - 1 WHERE curso_id = %s AND turno > %s",
+                        (curso_id, row[0]))
+            cur.execute("UPDATE cursos SET espera_cola = espera_cola - 1 WHERE id_curso = %s", (curso_id,))
+        return True
+
+    def lista_espera(self, estudiante_id: int):
+        """Cursos en los que espera el estudiante, con su posición y el largo de cada lista."""
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_LISTA_ESPERA_ESTUDIANTE, (estudiante_id,))
+            rows = cur.fetchall()
+        return filas_a_dicts(CAMPOS_LISTA_ESPERA, rows)
+
+    def registrar_nota(self, inscripcion_id: int, nota: float):
+        """
+        Registra la nota final de una inscripción y la marca aprobada o
+        reprobada según NOTA_APROBATORIA. Retorna la inscripción o None si no existe.
+        """
+        if not 0 <= nota <= 5:
+            raise ValueError("La nota debe estar entre 0.0 y 5.0")
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_REGISTRAR_NOTA, {"nota": nota, "aprobatoria": NOTA_APROBATORIA, "id": inscripcion_id})
+            row = cur.fetchone()
+        if not row:
+            return None
+        inscripcion = Inscripcion(*row)
+        descartar_progreso(inscripcion.estudiante_id)
+        return inscripcion
+
+    def inscribir_lote(self, filas):
+        """
+        Inscribe muchos (estudiante_id, curso_codigo) en una sola transacción.
+
+        Bloquea los cursos involucrados (en orden de id, para no generar
+        deadlocks con otros lotes), valida los cupos de cada curso en conjunto
+        y hace un INSERT multi-fila. Las filas se procesan en orden: si un
+        curso se llena, las filas siguientes de ese curso quedan "sin_cupo".
+
+        Retorna una lista con el resultado de cada fila, en el mismo orden:
+        {"fila", "estudiante_id", "curso_codigo", "estado", "id"}, donde estado es
+        inscrito, ya_inscrito, duplicado_en_lote, sin_cupo, sin_prerrequisitos,
+        choque_horario, curso_no_encontrado o estudiante_no_encontrado.
+        """
+        if len(filas) > LOTE_MAXIMO:
+            raise ValueError(f"El lote supera el máximo de {LOTE_MAXIMO} filas")
+        resultados = [
+            {"fila": i, "estudiante_id": est, "curso_codigo": codigo, "estado": None, "id": None}
+            for i, (est, codigo) in enumerate(filas)
+        ]
+        if not filas:
+            return resultados
+
+        codigos = sorted({codigo for _, codigo in filas})
+        estudiantes = sorted({est for est, _ in filas})
+        grafo = asegurar_grafo()
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT id_curso, codigo, cupo, inscritos, cronograma FROM cursos
+                WHERE codigo = ANY(%s)
+                ORDER BY id_curso
+                FOR UPDATE
+            """, (codigos,))
+            filas_cursos = cur.fetchall()
+            cursos = {codigo: (id_curso, cupo) for id_curso, codigo, cupo, _, _ in filas_cursos}
+            inscritos = {id_curso: n for id_curso, _, _, n, _ in filas_cursos}
+            franjas = {codigo: franjas_de(cronograma) for _, codigo, _, _, cronograma in filas_cursos}
+            ids_cursos = list(inscritos)
+            nuevos = {}
+
+            # Con cursos con sesiones se bloquean los estudiantes, como en inscribir()
+            con_horario = any(franjas.values())
+            cur.execute(f"""
+                SELECT id_estudiante FROM estudiantes WHERE id_estudiante = ANY(%s)
+                {"ORDER BY id_estudiante FOR UPDATE" if con_horario else ""}
+            """, (estudiantes,))
+            existentes_est = {row[0] for row in cur.fetchall()}
+
+            # Horario actual de cada estudiante del lote; el índice crece con lo que se inscribe en el lote
+            horarios = {}
+            if con_horario:
+                cur.execute("""
+                    SELECT i.estudiante_id, c.codigo, c.cronograma
+                    FROM inscripciones i
+                    JOIN cursos c ON c.id_curso = i.curso_id
+                    WHERE i.estudiante_id = ANY(%s) AND i.estado = 'pendiente'
+                    ORDER BY i.estudiante_id
+                """, (estudiantes,))
+                for est, grupo in groupby(cur.fetchall(), key=lambda fila: fila[0]):
+                    horarios[est] = IndiceHorario.de_cursos((codigo, cronograma) for _, codigo, cronograma in grupo)
+
+            cur.execute("""
+                SELECT estudiante_id, curso_id, id FROM inscripciones
+                WHERE estudiante_id = ANY(%s) AND curso_id = ANY(%s)
+            """, (estudiantes, ids_cursos))
+            ya_inscritos = {(est, curso): id_ for est, curso, id_ in cur.fetchall()}
+
+            # Cursos aprobados de cada estudiante, solo si algún curso del lote tiene requisitos
+            aprobados = {}
+            if any(grafo.tiene_requisitos(id_curso) for id_curso in ids_cursos):
+                cur.execute("""
+                    SELECT estudiante_id, curso_id FROM inscripciones
+                    WHERE estudiante_id = ANY(%s) AND estado = 'aprobado'
+                """, (estudiantes,))
+                for est, curso in cur.fetchall():
+                    aprobados.setdefault(est, []).append(curso)
+
+            # Asignar cupos en orden de llegada
+            vistos = set()
+            a_insertar = []
+            for resultado in resultados:
+                est, codigo = resultado["estudiante_id"], resultado["curso_codigo"]
+                if codigo not in cursos:
+                    resultado["estado"] = "curso_no_encontrado"
+                    continue
+                curso_id, cupo = cursos[codigo]
+                if est not in existentes_est:
+                    resultado["estado"] = "estudiante_no_encontrado"
+                elif (est, curso_id) in ya_inscritos:
+                    resultado["estado"] = "ya_inscrito"
+                    resultado["id"] = ya_inscritos[(est, curso_id)]
+                elif (est, curso_id) in vistos:
+                    resultado["estado"] = "duplicado_en_lote"
+                elif inscritos[curso_id] >= cupo:
+                    resultado["estado"] = "sin_cupo"
+                elif grafo.tiene_requisitos(curso_id) and grafo.faltantes(curso_id, aprobados.get(est, ())):
+                    resultado["estado"] = "sin_prerrequisitos"
+                elif franjas[codigo] and choques_con(horarios.setdefault(est, IndiceHorario()), codigo, franjas[codigo]):
+                    resultado["estado"] = "choque_horario"
+                else:
+                    for inicio, fin in franjas[codigo]:
+                        horarios[est].agregar(inicio, fin, codigo)
+                    vistos.add((est, curso_id))
+                    inscritos[curso_id] += 1
+                    nuevos[curso_id] = nuevos.get(curso_id, 0) + 1
+                    a_insertar.append(resultado)
+
+            if a_insertar:
+                creadas = execute_values(cur, """
+                    INSERT INTO inscripciones (estudiante_id, curso_id)
+                    VALUES %s
+                    RETURNING id, estudiante_id, curso_id
+                """, [(r["estudiante_id"], cursos[r["curso_codigo"]][0]) for r in a_insertar],
+                    page_size=1000, fetch=True)
+                ids = {(est, curso): id_ for id_, est, curso in creadas}
+                cur.execute("""
+                    UPDATE cursos c SET inscritos = c.inscritos + v.n
+                    FROM unnest(%s::int[], %s::int[]) AS v(id_curso, n)
+                    WHERE c.id_curso = v.id_curso
+                """, (list(nuevos), list(nuevos.values())))
+                for resultado in a_insertar:
+                    resultado["estado"] = "inscrito"
+                    resultado["id"] = ids[(resultado["estudiante_id"], cursos[resultado["curso_codigo"]][0])]
+        if a_insertar:
+            descartar_progreso(*{r["estudiante_id"] for r in a_insertar})
+            ocupacion_cache.invalidar()
+        return resultados
+
+    def _verificar_prerrequisitos(self, cur, grafo, estudiante_id, curso_id):
+        # Solo los cursos con requisitos consultan las notas del estudiante
+        if not grafo.tiene_requisitos(curso_id):
+            return
+        cur.execute(SQL_APROBADOS, (estudiante_id,))
+        faltantes = grafo.faltantes(curso_id, [row[0] for row in cur.fetchall()])
+        if faltantes:
+            raise PrerrequisitosPendientesError(faltantes)
+
+    def _verificar_horario(self, cur, estudiante_id, curso_id, codigo, cronograma):
+        # Solo los cursos con sesiones pagan el bloqueo y la consulta del horario
+        if not franjas_de(cronograma):
+            return
+        cur.execute(SQL_BLOQUEAR_ESTUDIANTE, (estudiante_id,))
+        cur.execute(SQL_HORARIO_ESTUDIANTE, (estudiante_id, curso_id))
+        choques = buscar_choques(cur.fetchall(), codigo, cronograma)
+        if choques:
+            raise ConflictoHorarioError(choques)
+
+    def _buscar(self, cur, estudiante_id, curso_id):
+        cur.execute(SQL_BUSCAR_INSCRIPCION, (estudiante_id, curso_id))
         row = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
-        return Inscripcion(row[0], estudiante_id, curso_id, row[1], row[2])
+        return Inscripcion(*row) if row else None
 
     def listar_inscripciones(self):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT id, estudiante_id, curso_id, fecha_inscripcion, estado FROM inscripciones")
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT {COLUMNAS_INSCRIPCION} FROM inscripciones")
+            rows = cur.fetchall()
         return [Inscripcion(*row) for row in rows]
 
+    def listar_por_estudiante(self, estudiante_id: int, cursor: str = None, limite: int = None, como_dict: bool = False):
+        """Inscripciones de un estudiante, paginadas por id. Retorna (inscripciones, next_cursor)."""
+        return self._listar_pagina("estudiante_id", estudiante_id, cursor, limite, como_dict)
+
+    def listar_por_curso(self, curso_id: int, cursor: str = None, limite: int = None, como_dict: bool = False):
+        """Inscripciones de un curso, paginadas por id. Retorna (inscripciones, next_cursor)."""
+        return self._listar_pagina("curso_id", curso_id, cursor, limite, como_dict)
+
+    def listar_pagina(self, cursor: str = None, limite: int = None, como_dict: bool = False):
+        """Todas las inscripciones, una página a la vez (listado de administración)."""
+        return self._listar_pagina(None, None, cursor, limite, como_dict)
+
+    def _listar_pagina(self, columna, valor, cursor, limite, como_dict=False):
+        sql, params, limite = armar_pagina_inscripciones(columna, valor, cursor, limite)
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        return cortar_pagina_inscripciones(rows, limite, como_dict)
+
 
 # -------- Rutas API usando el controlador -------- #
 controller = InscripcionController()
 
 @router.post("/")
 def crear_inscripcion(estudiante_id: int, curso_id: int):
-    return controller.crear_inscripcion(estudiante_id, curso_id).__dict__
+    try:
+        inscripcion, _ = controller.inscribir(estudiante_id, curso_id)
+    except CursoNoEncontradoError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CupoAgotadoError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConflictoHorarioError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PrerrequisitosPendientesError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return inscripcion.a_dict()
 
 @router.get("/")
-def listar_inscripciones():
-    return [i.__dict__ for i in controller.listar_inscripciones()]
-
+def listar_inscripciones(cursor: Optional[str] = None, limite: int = 100):
+    try:
+        data, next_cursor = controller.listar_pagina(cursor, limite, como_dict=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RespuestaJSON({"data": data, "count": len(data), "next_cursor": next_cursor})
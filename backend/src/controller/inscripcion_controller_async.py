@@ -0,0 +1,73 @@
+from cache import ocupacion_cache
+from database_async import conexion_async
+from model.Inscripcion import Inscripcion
+from controller.progreso_controller import descartar_progreso
+from controller.horario_controller import SQL_BLOQUEAR_ESTUDIANTE, SQL_HORARIO_ESTUDIANTE, buscar_choques
+from controller.prerrequisito_controller import SQL_APROBADOS, asegurar_grafo_async
+from horarios import franjas_de
+from controller.inscripcion_controller import (SQL_BUSCAR_INSCRIPCION, SQL_EXISTE_CURSO, SQL_INSERTAR_INSCRIPCION,
+                                               SQL_LIBERAR_CUPO, SQL_RESERVAR_CUPO, ConflictoHorarioError,
+                                               CupoAgotadoError, CursoNoEncontradoError, PrerrequisitosPendientesError,
+                                               armar_pagina_inscripciones, cortar_pagina_inscripciones)
+
+
+class InscripcionControllerAsync:
+    """Versión asíncrona de InscripcionController (misma transacción y mismo SQL)."""
+
+    async def inscribir(self, estudiante_id: int, curso_id: int):
+        """Ver InscripcionController.inscribir. Retorna (inscripcion, creada)."""
+        grafo = await asegurar_grafo_async()
+        async with conexion_async() as conn, conn.cursor() as cur:
+            existente = await self._buscar(cur, estudiante_id, curso_id)
+            if existente:
+                return existente, False
+            if grafo.tiene_requisitos(curso_id):
+                await cur.execute(SQL_APROBADOS, (estudiante_id,))
+                faltantes = grafo.faltantes(curso_id, [row[0] for row in await cur.fetchall()])
+                if faltantes:
+                    raise PrerrequisitosPendientesError(faltantes)
+
+            await cur.execute(SQL_RESERVAR_CUPO, (curso_id,))
+            reservado = await cur.fetchone()
+            if not reservado:
+                await cur.execute(SQL_EXISTE_CURSO, (curso_id,))
+                if not await cur.fetchone():
+                    raise CursoNoEncontradoError(f"Curso {curso_id} no encontrado")
+                raise CupoAgotadoError("No hay cupos disponibles")
+            await self._verificar_horario(cur, estudiante_id, curso_id, reservado[1], reservado[2])
+
+            await cur.execute(SQL_INSERTAR_INSCRIPCION, (estudiante_id, curso_id))
+            row = await cur.fetchone()
+            if not row:
+                await cur.execute(SQL_LIBERAR_CUPO, (curso_id,))
+                return await self._buscar(cur, estudiante_id, curso_id), False
+        descartar_progreso(estudiante_id)
+        await ocupacion_cache.invalidar_async()
+        return Inscripcion(row[0], estudiante_id, curso_id, row[1], row[2]), True
+
+    async def _verificar_horario(self, cur, estudiante_id, curso_id, codigo, cronograma):
+        if not franjas_de(cronograma):
+            return
+        await cur.execute(SQL_BLOQUEAR_ESTUDIANTE, (estudiante_id,))
+        await cur.execute(SQL_HORARIO_ESTUDIANTE, (estudiante_id, curso_id))
+        choques = buscar_choques(await cur.fetchall(), codigo, cronograma)
+        if choques:
+            raise ConflictoHorarioError(choques)
+
+    async def _buscar(self, cur, estudiante_id, curso_id):
+        await cur.execute(SQL_BUSCAR_INSCRIPCION, (estudiante_id, curso_id))
+        row = await cur.fetchone()
+        return Inscripcion(*row) if row else None
+
+    async def listar_por_estudiante(self, estudiante_id: int, cursor: str = None, limite: int = None, como_dict: bool = False):
+        return await self._listar_pagina("estudiante_id", estudiante_id, cursor, limite, como_dict)
+
+    async def listar_por_curso(self, curso_id: int, cursor: str = None, limite: int = None, como_dict: bool = False):
+        return await self._listar_pagina("curso_id", curso_id, cursor, limite, como_dict)
+
+    async def _listar_pagina(self, columna, valor, cursor, limite, como_dict=False):
+        sql, params, limite = armar_pagina_inscripciones(columna, valor, cursor, limite)
+        async with conexion_async() as conn, conn.cursor() as cur:
+            await cur.execute(sql, params)
+            rows = await cur.fetchall()
+        return cortar_pagina_inscripciones(rows, limite, como_dict)
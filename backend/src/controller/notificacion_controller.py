@@ -0,0 +1,160 @@
+import logging
+
+from database import conexion
+from model.Notificacion import Notificacion
+from paginacion import codificar_cursor, decodificar_cursor, normalizar_limite
+from serializacion import filas_a_dicts
+
+# Canal de LISTEN/NOTIFY por el que se avisa a los procesos con clientes conectados
+CANAL_NOTIFICACIONES = "notificaciones"
+
+COLUMNAS_NOTIFICACION = "n.id_notificacion, n.usuario_id, n.tipo, n.curso_id, c.nombre, n.mensaje, n.leido, n.fecha"
+# Claves de cada fila en los listados JSON (mismo orden que las columnas y que Notificacion(...))
+CAMPOS_NOTIFICACION = Notificacion.__slots__
+
+logger = logging.getLogger(__name__)
+
+# Fan-out en un solo INSERT ... SELECT (nunca un INSERT por estudiante). Se ejecutan con
+# el cursor de la transacción que provoca el aviso: si esa transacción hace rollback no
+# queda ninguna notificación, y pg_notify solo se entrega cuando hace commit.
+SQL_NOTIFICAR_INSCRITOS = """
+    INSERT INTO notificaciones (usuario_id, tipo, curso_id, mensaje)
+    SELECT estudiante_id, %(tipo)s, %(curso_id)s, %(mensaje)s
+    FROM inscripciones
+    WHERE curso_id = %(curso_id)s
+"""
+# Interesados en un curso: los inscritos en otro curso de su línea de énfasis que no están en él
+# (un curso sin línea no tiene interesados). Nunca todos los estudiantes de la universidad.
+SQL_NOTIFICAR_LINEA = """
+    INSERT INTO notificaciones (usuario_id, tipo, curso_id, mensaje)
+    SELECT DISTINCT i.estudiante_id, %(tipo)s, %(curso_id)s, %(mensaje)s
+    FROM cursos c
+    JOIN cursos otro ON otro.id_linea = c.id_linea AND otro.id_curso <> c.id_curso
+    JOIN inscripciones i ON i.curso_id = otro.id_curso
+    WHERE c.id_curso = %(curso_id)s
+      AND i.estudiante_id IS DISTINCT FROM %(excluir)s
+      AND NOT EXISTS (
+          SELECT 1 FROM inscripciones y
+          WHERE y.estudiante_id = i.estudiante_id AND y.curso_id = %(curso_id)s
+      )
+"""
+SQL_NOTIFICAR_ESTUDIANTE = """
+    INSERT INTO notificaciones (usuario_id, tipo, curso_id, mensaje)
+    VALUES (%(estudiante_id)s, %(tipo)s, %(curso_id)s, %(mensaje)s)
+"""
+SQL_AVISAR = "SELECT pg_notify(%s, %s)"
+
+# Notificaciones de los usuarios conectados a este proceso (ver notificaciones_push): las de
+# transacciones desde `xmin` (pueden haber hecho commit después de otras con ids mayores) y,
+# para los clientes recién conectados, las posteriores a `desde`
+SQL_NUEVAS_NOTIFICACIONES = f"""
+    SELECT {COLUMNAS_NOTIFICACION}, n.xid::text
+    FROM notificaciones n
+    LEFT JOIN cursos c ON c.id_curso = n.curso_id
+    WHERE n.usuario_id = ANY(%(usuarios)s)
+      AND (n.xid >= %(xmax)s::text::xid8 OR n.xid = ANY(%(en_curso)s::text[]::xid8[])
+           OR n.id_notificacion > %(desde)s)
+    ORDER BY n.id_notificacion
+"""
+SQL_ULTIMA_NOTIFICACION = """
+    SELECT COALESCE(MAX(id_notificacion), 0), pg_current_snapshot()::text
+    FROM notificaciones WHERE usuario_id = %s
+"""
+SQL_INSTANTANEA = "SELECT pg_current_snapshot()::text"
+
+
+def notificar_inscritos(cur, curso_id, tipo, mensaje):
+    """Avisa a todos los inscritos en `curso_id`. Retorna cuántas notificaciones creó."""
+    return _notificar(cur, SQL_NOTIFICAR_INSCRITOS, curso_id, tipo, mensaje)
+
+
+def notificar_linea(curso_id, tipo, mensaje, excluir=None):
+    """
+    Avisa a los interesados en `curso_id` (ver SQL_NOTIFICAR_LINEA), salvo `excluir`.
+    Abre su propia transacción: se llama después del commit del cambio que la
+    origina, para no hacer el fan-out con el curso bloqueado. Si falla, el
+    cambio ya quedó hecho: se registra y retorna 0.
+    """
+    try:
+        with conexion() as conn, conn.cursor() as cur:
+            return _notificar(cur, SQL_NOTIFICAR_LINEA, curso_id, tipo, mensaje, excluir=excluir)
+    except Exception as e:
+        logger.warning("No se pudo avisar a la línea del curso %s (%s): %s", curso_id, tipo, e)
+        return 0
+
+
+def notificar_estudiante(cur, estudiante_id, curso_id, tipo, mensaje):
+    """Avisa a un solo estudiante (p. ej. al pasar de la lista de espera a inscrito)."""
+    return _notificar(cur, SQL_NOTIFICAR_ESTUDIANTE, curso_id, tipo, mensaje, estudiante_id=estudiante_id)
+
+
+def _notificar(cur, sql, curso_id, tipo, mensaje, **params):
+    cur.execute(sql, {"tipo": tipo, "curso_id": curso_id, "mensaje": mensaje, **params})
+    creadas = cur.rowcount
+    if creadas:
+        cur.execute(SQL_AVISAR, (CANAL_NOTIFICACIONES, tipo))
+    return creadas
+
+
+def armar_bandeja(usuario_id, solo_no_leidas, cursor, limite):
+    """Consulta paginada por (fecha, id) descendente. Retorna (sql, params, limite normalizado)."""
+    limite = normalizar_limite(limite)
+    condiciones = ["n.usuario_id = %s"]
+    params = [usuario_id]
+    if solo_no_leidas:
+        condiciones.append("NOT n.leido")
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        if len(valores) != 2:
+            raise ValueError("Cursor de paginación inválido")
+        condiciones.append("(n.fecha, n.id_notificacion) < (%s::timestamp, %s)")
+        params.extend(valores)
+
+    sql = f"""
+        SELECT {COLUMNAS_NOTIFICACION}
+        FROM notificaciones n
+        LEFT JOIN cursos c ON c.id_curso = n.curso_id
+        WHERE {' AND '.join(condiciones)}
+        ORDER BY n.fecha DESC, n.id_notificacion DESC
+        LIMIT %s
+    """
+    return sql, (*params, limite + 1), limite
+
+
+def cortar_bandeja(rows, limite, como_dict: bool = False):
+    pagina = rows[:limite]
+    next_cursor = None
+    if len(rows) > limite:
+        ultima = pagina[-1]
+        next_cursor = codificar_cursor(ultima[7].isoformat(), ultima[0])
+    if como_dict:
+        return filas_a_dicts(CAMPOS_NOTIFICACION, pagina), next_cursor
+    return [Notificacion(*row) for row in pagina], next_cursor
+
+
+class NotificacionController:
+
+    def listar(self, usuario_id: int, solo_no_leidas: bool = False, cursor: str = None, limite: int = None,
+               como_dict: bool = False):
+        """Bandeja de un usuario, las más recientes primero. Retorna (notificaciones, next_cursor)."""
+        sql, params, limite = armar_bandeja(usuario_id, solo_no_leidas, cursor, limite)
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        return cortar_bandeja(rows, limite, como_dict)
+
+    def contar_no_leidas(self, usuario_id: int):
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM notificaciones WHERE usuario_id = %s AND NOT leido", (usuario_id,))
+            return cur.fetchone()[0]
+
+    def marcar_leidas(self, usuario_id: int, ids=None):
+        """Marca como leídas las notificaciones `ids` del usuario (todas si es None). Retorna cuántas."""
+        sql = "UPDATE notificaciones SET leido = TRUE WHERE usuario_id = %s AND NOT leido"
+        params = [usuario_id]
+        if ids is not None:
+            sql += " AND id_notificacion = ANY(%s)"
+            params.append(list(ids))
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.rowcount
@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from cache import catalogo_cache, prerrequisitos_cache
+from database import conexion
+from prerrequisitos import CicloPrerrequisitosError, grafo_prerrequisitos
+
+logger = logging.getLogger(__name__)
+
+SQL_ARISTAS = """
+    SELECT p.curso_id, c.codigo, p.requisito_id, r.codigo
+    FROM prerrequisitos p
+    JOIN cursos c ON c.id_curso = p.curso_id
+    JOIN cursos r ON r.id_curso = p.requisito_id
+"""
+# Cambios del grafo, en orden de commit (los editores se serializan con el LOCK TABLE)
+SQL_VERSION_PRERREQUISITOS = "SELECT COALESCE(MAX(version), 0) FROM prerrequisitos_cambios"
+SQL_REGISTRAR_CAMBIO = "INSERT INTO prerrequisitos_cambios (curso_id) VALUES (%s) RETURNING version"
+SQL_CURSOS_CAMBIADOS = "SELECT DISTINCT curso_id FROM prerrequisitos_cambios WHERE version > %s"
+SQL_ARISTAS_DE = SQL_ARISTAS + "    WHERE p.curso_id = ANY(%s)\n"
+SQL_APROBADOS = "SELECT curso_id FROM inscripciones WHERE estudiante_id = %s AND estado = 'aprobado'"
+# ¿Alguno de los requisitos nuevos depende (directa o indirectamente) del curso? Entonces habría un ciclo
+SQL_BUSCAR_CICLO = """
+    WITH RECURSIVE alcanzables(id) AS (
+        SELECT unnest(%(requisitos)s::int[])
+        UNION
+        SELECT p.requisito_id FROM prerrequisitos p JOIN alcanzables a ON p.curso_id = a.id
+    )
+    SELECT 1 FROM alcanzables WHERE id = %(curso)s LIMIT 1
+"""
+
+# Serializa las ediciones del grafo dentro del proceso (entre procesos lo hace el LOCK TABLE)
+_edicion = threading.Lock()
+# Un solo hilo sincroniza el grafo con la base
+_recargando = threading.Lock()
+# Última versión compartida vista y cuándo se comparó el grafo con la base
+_aviso = None
+_verificado = 0.0
+
+
+def _vigente():
+    if grafo_prerrequisitos.version is None:
+        return False
+    if prerrequisitos_cache.backend is not None:
+        return _aviso == prerrequisitos_cache.version()
+    # Sin backend compartido se consulta la versión en la base cada CATALOGO_CACHE_SYNC
+    return time.monotonic() - _verificado < prerrequisitos_cache.intervalo_sync
+
+
+def _sincronizar():
+    """Trae los cambios de otros procesos: solo los cursos cambiados y, si no se puede, todo el grafo."""
+    global _aviso, _verificado
+    aviso = prerrequisitos_cache.version()
+    with conexion() as conn, conn.cursor() as cur:
+        # Versión y aristas de la misma instantánea
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        cur.execute(SQL_VERSION_PRERREQUISITOS)
+        version = cur.fetchone()[0]
+        anterior = grafo_prerrequisitos.version
+        if version != anterior:
+            al_dia = False
+            if anterior is not None:
+                cur.execute(SQL_CURSOS_CAMBIADOS, (anterior,))
+                cambiados = [row[0] for row in cur.fetchall()]
+                cur.execute(SQL_ARISTAS_DE, (cambiados,))
+                try:
+                    al_dia = grafo_prerrequisitos.ponerse_al_dia(anterior, version, cur.fetchall(), cambiados)
+                except CicloPrerrequisitosError:
+                    logger.warning("Grafo de prerrequisitos incoherente tras los cambios %s..%s; se recarga",
+                                   anterior, version)
+            if not al_dia:
+                cur.execute(SQL_ARISTAS)
+                grafo_prerrequisitos.cargar(cur.fetchall(), version)
+    _aviso, _verificado = aviso, time.monotonic()
+
+
+def asegurar_grafo():
+    """
+    El grafo local, al día con la base si otro proceso lo cambió. Mientras un
+    hilo lo sincroniza los demás siguen con el anterior; solo esperan si
+    todavía no se cargó nunca.
+    """
+    if _vigente():
+        return grafo_prerrequisitos
+    if not _recargando.acquire(blocking=not grafo_prerrequisitos.cargado):
+        return grafo_prerrequisitos
+    try:
+        if not _vigente():
+            _sincronizar()
+    finally:
+        _recargando.release()
+    return grafo_prerrequisitos
+
+
+async def asegurar_grafo_async():
+    # La sincronización puede recargar todo (O(V·E)) o esperar a otro hilo: nunca en el event loop
+    if not _vigente():
+        await run_in_threadpool(asegurar_grafo)
+    return grafo_prerrequisitos
+
+
+def guardar_prerrequisitos(cur, curso_id, codigo, codigos_requisitos):
+    """
+    Reemplaza los prerrequisitos de un curso dentro de la transacción de `cur`.
+    ValueError si algún código no existe o si se formaría un ciclo.
+    Retorna ({requisito_id: codigo}, versión anterior, versión nueva) para `registrar_cambio`.
+    """
+    codigos_requisitos = sorted(set(codigos_requisitos))
+    cur.execute("SELECT id_curso, codigo FROM cursos WHERE codigo = ANY(%s)", (codigos_requisitos,))
+    requisitos = dict(cur.fetchall())
+    desconocidos = set(codigos_requisitos) - set(requisitos.values())
+    if desconocidos:
+        raise ValueError(f"Prerrequisitos inexistentes: {', '.join(sorted(desconocidos))}")
+    if curso_id in requisitos:
+        raise CicloPrerrequisitosError(f"El curso {codigo} no puede ser prerrequisito de sí mismo")
+
+    # Un solo editor del grafo a la vez en todo el sistema; las lecturas siguen libres
+    cur.execute("LOCK TABLE prerrequisitos IN SHARE ROW EXCLUSIVE MODE")
+    if requisitos:
+        cur.execute(SQL_BUSCAR_CICLO, {"requisitos": list(requisitos), "curso": curso_id})
+        if cur.fetchone():
+            raise CicloPrerrequisitosError(f"Los prerrequisitos de {codigo} formarían un ciclo")
+    cur.execute("DELETE FROM prerrequisitos WHERE curso_id = %s", (curso_id,))
+    if requisitos:
+        cur.execute("""
+            INSERT INTO prerrequisitos (curso_id, requisito_id)
+            SELECT %s, unnest(%s::int[])
+        """, (curso_id, list(requisitos)))
+    # Con el lock tomado nadie más registra cambios: la anterior es la inmediatamente previa
+    cur.execute(SQL_VERSION_PRERREQUISITOS)
+    anterior = cur.fetchone()[0]
+    cur.execute(SQL_REGISTRAR_CAMBIO, (curso_id,))
+    return requisitos, anterior, cur.fetchone()[0]
+
+
+def registrar_cambio(curso_id, codigo, requisitos, anterior, version):
+    """Después del commit: actualiza el grafo local en forma incremental y avisa a los demás workers."""
+    global _verificado
+    if not grafo_prerrequisitos.aplicar(anterior, version, curso_id, codigo, requisitos):
+        # Al grafo local le faltan cambios de otros procesos: los trae la próxima consulta
+        _verificado = 0.0
+    prerrequisitos_cache.invalidar()
+    # Los listados del catálogo muestran los prerrequisitos directos
+    catalogo_cache.invalidar()
+
+
+class PrerrequisitoController:
+
+    def definir(self, curso, codigos_requisitos):
+        """Reemplaza los prerrequisitos de `curso`. Retorna los códigos guardados."""
+        with _edicion:
+            with conexion() as conn, conn.cursor() as cur:
+                requisitos, anterior, version = guardar_prerrequisitos(cur, curso.id_curso, curso.codigo,
+                                                                       codigos_requisitos)
+            registrar_cambio(curso.id_curso, curso.codigo, requisitos, anterior, version)
+        return sorted(requisitos.values())
+
+    def faltantes(self, estudiante_id: int, curso_id: int):
+        """Prerrequisitos (directos e indirectos) que el estudiante aún no aprobó."""
+        grafo = asegurar_grafo()
+        if not grafo.tiene_requisitos(curso_id):
+            return []
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_APROBADOS, (estudiante_id,))
+            aprobados = [row[0] for row in cur.fetchall()]
+        return grafo.faltantes(curso_id, aprobados)
@@ -0,0 +1,125 @@
+import os
+from cache import NO_EXISTE, progreso_cache
+from database import conexion
+
+# Créditos que exige el programa para completar la línea de énfasis
+CREDITOS_REQUERIDOS = int(os.getenv("CREDITOS_REQUERIDOS", "36"))
+
+# Un solo viaje por consulta: totales por (estudiante, línea) y créditos ofertados por línea.
+# Parte de estudiantes (LEFT JOIN) para que un estudiante sin inscripciones aparezca con ceros.
+SQL_PROGRESO = """
+    WITH oferta AS (
+        SELECT id_linea, SUM(creditos) AS creditos
+        FROM cursos
+        WHERE estado = 'aprobado' AND id_linea IS NOT NULL
+        GROUP BY id_linea
+    )
+    SELECT e.id_estudiante, c.id_linea, l.nombre,
+           COALESCE(SUM(c.creditos) FILTER (WHERE i.estado = 'aprobado'), 0),
+           COALESCE(SUM(c.creditos) FILTER (WHERE i.estado = 'pendiente'), 0),
+           COUNT(i.id) FILTER (WHERE i.estado = 'pendiente'),
+           SUM(i.nota * c.creditos),
+           SUM(c.creditos) FILTER (WHERE i.nota IS NOT NULL),
+           o.creditos
+    FROM estudiantes e
+    LEFT JOIN inscripciones i ON i.estudiante_id = e.id_estudiante
+    LEFT JOIN cursos c ON c.id_curso = i.curso_id
+    LEFT JOIN lineas_enfasis l ON l.id_linea = c.id_linea
+    LEFT JOIN oferta o ON o.id_linea = c.id_linea
+    WHERE {filtro}
+    GROUP BY e.id_estudiante, c.id_linea, l.nombre, o.creditos
+    ORDER BY e.id_estudiante, c.id_linea
+"""
+SQL_PROGRESO_ESTUDIANTES = SQL_PROGRESO.format(filtro="e.id_estudiante = ANY(%s)")
+SQL_PROGRESO_PROGRAMA = SQL_PROGRESO.format(filtro="e.programa = %s")
+
+
+def _porcentaje(parte, total):
+    return round(min(parte / total, 1.0) * 100, 1) if total else 0.0
+
+
+def armar_progresos(rows, creditos_requeridos=CREDITOS_REQUERIDOS):
+    """Agrupa las filas de SQL_PROGRESO en {estudiante_id: progreso}."""
+    acumulados = {}
+    for (estudiante_id, id_linea, nombre, completados, en_curso, pendientes,
+         suma_notas, creditos_calificados, ofertados) in rows:
+        p = acumulados.setdefault(estudiante_id, {
+            "completados": 0, "en_curso": 0, "pendientes": 0,
+            "suma_notas": 0.0, "calificados": 0, "lineas": [],
+        })
+        p["completados"] += completados
+        p["en_curso"] += en_curso
+        p["pendientes"] += pendientes
+        if creditos_calificados:
+            p["suma_notas"] += float(suma_notas)
+            p["calificados"] += creditos_calificados
+        if id_linea is not None:
+            p["lineas"].append({
+                "id_linea": id_linea,
+                "nombre": nombre,
+                "creditos_completados": completados,
+                "creditos_en_curso": en_curso,
+                "creditos_ofertados": ofertados or 0,
+                "porcentaje": _porcentaje(completados, ofertados or 0),
+            })
+
+    return {
+        estudiante_id: {
+            "estudiante_id": estudiante_id,
+            "creditos_completados": p["completados"],
+            "creditos_en_curso": p["en_curso"],
+            "creditos_totales": creditos_requeridos,
+            "creditos_faltantes": max(creditos_requeridos - p["completados"], 0),
+            "porcentaje": _porcentaje(p["completados"], creditos_requeridos),
+            # Promedio ponderado por créditos de los cursos ya calificados
+            "promedio": round(p["suma_notas"] / p["calificados"], 2) if p["calificados"] else None,
+            "pendientes": p["pendientes"],
+            "lineas": p["lineas"],
+        }
+        for estudiante_id, p in acumulados.items()
+    }
+
+
+class ProgresoController:
+
+    def obtener(self, estudiante_id: int):
+        """Progreso académico de un estudiante (cacheado). Retorna None si el estudiante no existe."""
+        def cargar():
+            return self._calcular([estudiante_id]).get(estudiante_id, NO_EXISTE)
+
+        progreso = progreso_cache.obtener(estudiante_id, cargar)
+        return None if progreso is NO_EXISTE else progreso
+
+    def obtener_cohorte(self, estudiantes=None, programa: str = None):
+        """
+        Progreso de varios estudiantes en una sola consulta. Con `estudiantes`
+        reutiliza lo cacheado y calcula solo los faltantes; con `programa`
+        calcula la cohorte completa. Retorna una lista ordenada por estudiante.
+        """
+        if programa is not None:
+            with conexion() as conn, conn.cursor() as cur:
+                cur.execute(SQL_PROGRESO_PROGRAMA, (programa,))
+                rows = cur.fetchall()
+            return list(armar_progresos(rows).values())
+
+        version = progreso_cache.version()
+        encontrados, faltantes = progreso_cache.obtener_varios(sorted(set(estudiantes or [])))
+        if faltantes:
+            calculados = self._calcular(faltantes)
+            for estudiante_id in faltantes:
+                progreso = calculados.get(estudiante_id, NO_EXISTE)
+                progreso_cache.guardar(estudiante_id, progreso, version)
+                encontrados[estudiante_id] = progreso
+        return [p for _, p in sorted(encontrados.items()) if p is not NO_EXISTE]
+
+    def _calcular(self, estudiantes):
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(SQL_PROGRESO_ESTUDIANTES, (list(estudiantes),))
+            rows = cur.fetchall()
+        return armar_progresos(rows)
+
+
+def descartar_progreso(*estudiantes):
+    """Invalida el progreso cacheado de los estudiantes (llamar después de escribir)."""
+    for estudiante_id in estudiantes:
+        progreso_cache.descartar(estudiante_id)
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from database import conexion
+from exportacion import FORMATOS, serializar
+
+router = APIRouter(prefix="/exportar", tags=["Reportes"])
+
+# entidad -> (columnas, consulta). Se ordena por la llave primaria para que el export sea estable.
+EXPORTACIONES = {
+    "inscripciones": (
+        ["id", "estudiante_id", "curso_id", "fecha_inscripcion", "estado"],
+        "SELECT id, estudiante_id, curso_id, fecha_inscripcion, estado FROM inscripciones ORDER BY id",
+    ),
+    "cursos": (
+        ["id_curso", "codigo", "nombre", "cupo", "inscritos", "creditos", "semestre", "estado"],
+        "SELECT id_curso, codigo, nombre, cupo, inscritos, creditos, semestre, estado FROM cursos ORDER BY id_curso",
+    ),
+    "estudiantes": (
+        ["id_estudiante", "nombre", "programa", "rol"],
+        "SELECT id_estudiante, nombre, programa, rol FROM estudiantes ORDER BY id_estudiante",
+    ),
+}
+
+# entidad -> columna con el estudiante, para los reportes de un solo estudiante
+COLUMNA_ESTUDIANTE = {"inscripciones": "estudiante_id", "estudiantes": "id_estudiante"}
+
+TAMANO_LOTE = 5000
+
+
+class ReporteController:
+    def iterar_lotes(self, entidad, tamano_lote=TAMANO_LOTE, estudiante_id=None):
+        """
+        Genera lotes de filas de `entidad` con un cursor del lado del servidor
+        (con nombre), así la tabla nunca se carga completa en memoria. La
+        conexión se devuelve al pool cuando el generador termina o se cierra.
+        Con `estudiante_id`, solo las filas de ese estudiante.
+        """
+        _, consulta = EXPORTACIONES[entidad]
+        params = ()
+        if estudiante_id is not None:
+            if entidad not in COLUMNA_ESTUDIANTE:
+                raise ValueError(f"'{entidad}' no se puede filtrar por estudiante")
+            consulta = f"SELECT * FROM ({consulta}) e WHERE e.{COLUMNA_ESTUDIANTE[entidad]} = %s ORDER BY 1"
+            params = (estudiante_id,)
+        with conexion() as conn:
+            with conn.cursor(name=f"exportar_{entidad}") as cur:
+                cur.itersize = tamano_lote
+                cur.execute(consulta, params)
+                while True:
+                    filas = cur.fetchmany(tamano_lote)
+                    if not filas:
+                        break
+                    yield filas
+
+    def exportar(self, entidad, formato="csv", tamano_lote=TAMANO_LOTE):
+        """Bloques de bytes en `formato` (csv o ndjson) con todas las filas de `entidad`."""
+        if entidad not in EXPORTACIONES:
+            raise ValueError(f"Entidad no exportable: {entidad}")
+        columnas, _ = EXPORTACIONES[entidad]
+        return serializar(formato, columnas, self.iterar_lotes(entidad, tamano_lote))
+
+
+# -------- Rutas API usando el controlador -------- #
+controller = ReporteController()
+
+@router.get("/{entidad}")
+def exportar(entidad: str, formato: str = "csv"):
+    if entidad not in EXPORTACIONES:
+        raise HTTPException(status_code=404, detail=f"No se puede exportar '{entidad}'")
+    if formato not in FORMATOS:
+        raise HTTPException(status_code=400, detail="Formato debe ser csv o ndjson")
+    return StreamingResponse(
+        controller.exportar(entidad, formato),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{entidad}.{formato}"'}
+    )
@@ -1,43 +1,379 @@
 import psycopg2
+import psycopg2.extensions
 import os
+import threading
+import time
+from contextlib import contextmanager
+
+from metricas import registrar_conexion, registrar_consulta
 
 SCHEMA_FILE = os.path.join(os.path.dirname(__file__), "schema.sql")
+MIGRACIONES_FILE = os.path.join(os.path.dirname(__file__), "migraciones.sql")
+
+# Configuración del pool (se puede ajustar por variables de entorno)
+POOL_MIN = int(os.getenv("PGPOOL_MIN", "1"))
+POOL_MAX = int(os.getenv("PGPOOL_MAX", "10"))
+POOL_TIMEOUT = float(os.getenv("PGPOOL_TIMEOUT", "10"))          # segundos esperando una conexión libre
+POOL_MAX_IDLE = float(os.getenv("PGPOOL_MAX_IDLE", "300"))       # segundos que una conexión puede estar ociosa
+POOL_MAX_LIFETIME = float(os.getenv("PGPOOL_MAX_LIFETIME", "3600"))  # segundos de vida máxima de una conexión
+POOL_HEALTH_CHECK_AFTER = float(os.getenv("PGPOOL_HEALTH_CHECK_AFTER", "30"))  # ping si estuvo ociosa más de esto
+
+
+class CursorMedido(psycopg2.extensions.cursor):
+    """Cursor que reporta cada consulta a metricas.py (conteo, tiempo y log de lentas)."""
+
+    def execute(self, query, vars=None):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            registrar_consulta(query, time.perf_counter() - inicio)
+
+    def executemany(self, query, vars_list):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            registrar_consulta(query, time.perf_counter() - inicio)
+
 
-def get_connection():
+def get_connection(host=None, **opciones):
+    """
+    Abre una conexión nueva (sin pool). Preferir `conexion()` en los controladores.
+    `host` reemplaza a PGHOST (p. ej. el host directo cuando PGHOST es un pooler);
+    `opciones` son parámetros extra de libpq (p. ej. keepalives).
+    """
     return psycopg2.connect(
         dbname=os.getenv("PGDATABASE", "neondb"),
         user=os.getenv("PGUSER", "neondb_owner"),
         password=os.getenv("PGPASSWORD", "npg_RJbZgCY5i1Xq"),
-        host=os.getenv("PGHOST", "ep-shy-queen-adgkvidp-pooler.c-2.us-east-1.aws.neon.tech"),
+        host=host or os.getenv("PGHOST", "ep-shy-queen-adgkvidp-pooler.c-2.us-east-1.aws.neon.tech"),
         port=5432,
         sslmode=os.getenv("PGSSLMODE", "require"),
-        channel_binding=os.getenv("PGCHANNELBINDING", "require")
+        channel_binding=os.getenv("PGCHANNELBINDING", "require"),
+        cursor_factory=CursorMedido,
+        **opciones
     )
 
 
-def init_db():
-    """Verifica si existen tablas y, si no, ejecuta schema.sql."""
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # Verificar si existe la tabla cursos
-    cur.execute("""
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables
-            WHERE table_schema = 'public' AND table_name = 'cursos'
-        );
-    """)
-    exists = cur.fetchone()[0]
-
-    if not exists:
-        print("⚠️ Tablas no encontradas. Ejecutando schema.sql...")
-        with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
-            sql_script = f.read()
-            cur.execute(sql_script)
+class PoolAgotadoError(Exception):
+    """No se obtuvo una conexión del pool dentro del tiempo de espera."""
+
+
+class _ConexionPool:
+    """Envoltura de una conexión con las marcas de tiempo que usa el pool."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.creada = time.monotonic()
+        self.ultimo_uso = self.creada
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe.
+
+    - Mantiene entre `minimo` y `maximo` conexiones abiertas.
+    - Verifica la conexión al entregarla (health check) si estuvo ociosa.
+    - Recicla conexiones ociosas o demasiado viejas.
+    - Lleva métricas para dimensionarlo (ver `metricas()`).
+    """
+
+    def __init__(self, fabrica=get_connection, minimo=POOL_MIN, maximo=POOL_MAX,
+                 timeout=POOL_TIMEOUT, max_idle=POOL_MAX_IDLE, max_lifetime=POOL_MAX_LIFETIME,
+                 health_check_after=POOL_HEALTH_CHECK_AFTER):
+        if minimo < 0 or maximo < 1 or minimo > maximo:
+            raise ValueError("Tamaño de pool inválido")
+        self._fabrica = fabrica
+        self.minimo = minimo
+        self.maximo = maximo
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+
+        self._lock = threading.Condition()
+        self._libres = []          # pila LIFO: reutiliza primero las conexiones "calientes"
+        self._abiertas = 0
+        self._en_uso = 0
+        self._cerrado = False
+
+        self._checkouts = 0
+        self._esperas = 0
+        self._tiempo_espera = 0.0
+        self._max_espera = 0.0
+        self._creadas = 0
+        self._recicladas = 0
+        self._fallidas_health = 0
+        self._timeouts = 0
+
+    # ---------------- ciclo de vida ---------------- #
+
+    def abrir(self):
+        """Abre las conexiones mínimas por adelantado."""
+        with self._lock:
+            faltan = self.minimo - self._abiertas
+            self._abiertas += max(faltan, 0)
+        for _ in range(max(faltan, 0)):
+            try:
+                envoltura = self._crear()
+            except Exception:
+                with self._lock:
+                    self._abiertas -= 1
+                    self._lock.notify()
+                raise
+            with self._lock:
+                self._libres.append(envoltura)
+                self._lock.notify()
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrado = True
+            libres, self._libres = self._libres, []
+            self._abiertas -= len(libres)
+            self._lock.notify_all()
+        for envoltura in libres:
+            self._descartar(envoltura)
+
+    # ---------------- checkout / checkin ---------------- #
+
+    def obtener(self):
+        """Entrega una conexión sana. Bloquea hasta `timeout` si el pool está lleno."""
+        inicio = time.monotonic()
+        espero = False
+        while True:
+            envoltura = None
+            crear = False
+            with self._lock:
+                while True:
+                    if self._cerrado:
+                        raise PoolAgotadoError("El pool está cerrado")
+                    if self._libres:
+                        envoltura = self._libres.pop()
+                        break
+                    if self._abiertas < self.maximo:
+                        self._abiertas += 1
+                        crear = True
+                        break
+                    restante = self.timeout - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        self._timeouts += 1
+                        raise PoolAgotadoError(
+                            f"Sin conexiones libres tras {self.timeout}s (máximo {self.maximo})"
+                        )
+                    espero = True
+                    self._lock.wait(restante)
+                self._en_uso += 1
+
+            try:
+                if crear:
+                    envoltura = self._crear()
+                elif not self._sana(envoltura):
+                    self._descartar(envoltura)
+                    with self._lock:
+                        self._abiertas -= 1
+                        self._en_uso -= 1
+                        self._fallidas_health += 1
+                        self._lock.notify()
+                    continue
+            except Exception:
+                with self._lock:
+                    self._abiertas -= 1
+                    self._en_uso -= 1
+                    self._lock.notify()
+                raise
+
+            espera = time.monotonic() - inicio
+            with self._lock:
+                self._checkouts += 1
+                self._tiempo_espera += espera
+                self._max_espera = max(self._max_espera, espera)
+                if espero:
+                    self._esperas += 1
+            envoltura.ultimo_uso = time.monotonic()
+            return envoltura
+
+    def devolver(self, envoltura, descartar=False):
+        """Devuelve una conexión al pool (o la cierra si está rota o vieja)."""
+        conn = envoltura.conn
+        ahora = time.monotonic()
+        if not descartar and not conn.closed:
+            try:
+                # No dejar transacciones abiertas en conexiones compartidas
+                if conn.status != psycopg2.extensions.STATUS_READY:
+                    conn.rollback()
+            except Exception:
+                descartar = True
+        if conn.closed or ahora - envoltura.creada > self.max_lifetime:
+            descartar = True
+
+        with self._lock:
+            self._en_uso -= 1
+            if descartar or self._cerrado:
+                self._abiertas -= 1
+                if not self._cerrado:
+                    self._recicladas += 1
+            else:
+                envoltura.ultimo_uso = ahora
+                self._libres.append(envoltura)
+            self._lock.notify()
+        if descartar or self._cerrado:
+            self._descartar(envoltura)
+        self._reciclar_ociosas()
+
+    # ---------------- utilidades internas ---------------- #
+
+    def _crear(self):
+        envoltura = _ConexionPool(self._fabrica())
+        with self._lock:
+            self._creadas += 1
+        return envoltura
+
+    def _sana(self, envoltura):
+        conn = envoltura.conn
+        if conn.closed:
+            return False
+        ahora = time.monotonic()
+        if ahora - envoltura.creada > self.max_lifetime:
+            return False
+        if ahora - envoltura.ultimo_uso < self.health_check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _descartar(self, envoltura):
+        try:
+            envoltura.conn.close()
+        except Exception:
+            pass
+
+    def _reciclar_ociosas(self):
+        """Cierra conexiones ociosas por encima del mínimo."""
+        ahora = time.monotonic()
+        viejas = []
+        with self._lock:
+            # Las más antiguas en uso quedan al fondo de la pila
+            while (self._libres and self._abiertas > self.minimo
+                   and ahora - self._libres[0].ultimo_uso > self.max_idle):
+                viejas.append(self._libres.pop(0))
+                self._abiertas -= 1
+                self._recicladas += 1
+        for envoltura in viejas:
+            self._descartar(envoltura)
+
+    # ---------------- métricas ---------------- #
+
+    def metricas(self):
+        with self._lock:
+            return {
+                "minimo": self.minimo,
+                "maximo": self.maximo,
+                "abiertas": self._abiertas,
+                "en_uso": self._en_uso,
+                "libres": len(self._libres),
+                "checkouts": self._checkouts,
+                "esperas": self._esperas,
+                "tiempo_espera_total_ms": round(self._tiempo_espera * 1000, 3),
+                "tiempo_espera_promedio_ms": round(
+                    self._tiempo_espera * 1000 / self._checkouts, 3
+                ) if self._checkouts else 0.0,
+                "tiempo_espera_max_ms": round(self._max_espera * 1000, 3),
+                "timeouts": self._timeouts,
+                "conexiones_creadas": self._creadas,
+                "conexiones_recicladas": self._recicladas,
+                "health_checks_fallidos": self._fallidas_health,
+            }
+
+
+# Pool global del proceso (se crea perezosamente en el primer uso)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def cerrar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.cerrar()
+            _pool = None
+
+
+def metricas_pool():
+    return get_pool().metricas()
+
+
+@contextmanager
+def conexion():
+    """
+    Presta una conexión del pool durante el bloque `with`.
+    Hace commit al salir sin errores y rollback si hay una excepción.
+
+        with conexion() as conn, conn.cursor() as cur:
+            cur.execute(...)
+    """
+    pool = get_pool()
+    envoltura = pool.obtener()
+    registrar_conexion()
+    conn = envoltura.conn
+    try:
+        yield conn
         conn.commit()
-        print("✅ Tablas creadas correctamente.")
+    except BaseException:
+        try:
+            conn.rollback()
+        except Exception:
+            pool.devolver(envoltura, descartar=True)
+            raise
+        pool.devolver(envoltura)
+        raise
     else:
-        print("✅ Tablas ya existen, no es necesario recrearlas.")
+        pool.devolver(envoltura)
+
+
+def init_db():
+    """
+    Verifica si existen tablas y, si no, ejecuta schema.sql. Si ya existen,
+    ejecuta migraciones.sql para llevarlas al esquema actual.
+    """
+    with conexion() as conn, conn.cursor() as cur:
+        # Verificar si existe la tabla cursos
+        cur.execute("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables
+                WHERE table_schema = 'public' AND table_name = 'cursos'
+            );
+        """)
+        exists = cur.fetchone()[0]
+
+        if not exists:
+            print("⚠️ Tablas no encontradas. Ejecutando schema.sql...")
+            with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+                sql_script = f.read()
+                cur.execute(sql_script)
+            conn.commit()
+            print("✅ Tablas creadas correctamente.")
+        else:
+            with open(MIGRACIONES_FILE, "r", encoding="utf-8") as f:
+                cur.execute(f.read())
+            print("✅ Tablas ya existen; migraciones aplicadas.")
+
 
-    cur.close()
-    conn.close()
\ No newline at end of file
+if __name__ == "__main__":
+    # Crear o migrar el esquema sin levantar la API: python database.py
+    init_db()
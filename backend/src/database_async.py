@@ -0,0 +1,107 @@
+"""
+Acceso asíncrono a PostgreSQL (psycopg 3 + psycopg_pool) para los endpoints `async def`.
+
+Usa las mismas variables PG* y PGPOOL_* que database.py. Las consultas se
+escriben con `%s`, igual que con psycopg2, así que el SQL se comparte con
+los controladores síncronos.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from psycopg import AsyncCursor
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+from database import (POOL_MIN, POOL_MAX, POOL_TIMEOUT, POOL_MAX_IDLE, POOL_MAX_LIFETIME,
+                      PoolAgotadoError)
+from metricas import registrar_conexion, registrar_consulta
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+class AsyncCursorMedido(AsyncCursor):
+    """Equivalente de database.CursorMedido para psycopg 3."""
+
+    async def execute(self, query, params=None, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            registrar_consulta(query, time.perf_counter() - inicio)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        finally:
+            registrar_consulta(query, time.perf_counter() - inicio)
+
+
+def conninfo(**cambios):
+    """Cadena de conexión a partir de las variables PG*; `cambios` reemplaza parámetros sueltos."""
+    parametros = dict(
+        dbname=os.getenv("PGDATABASE", "neondb"),
+        user=os.getenv("PGUSER", "neondb_owner"),
+        password=os.getenv("PGPASSWORD", "npg_RJbZgCY5i1Xq"),
+        host=os.getenv("PGHOST", "ep-shy-queen-adgkvidp-pooler.c-2.us-east-1.aws.neon.tech"),
+        port=5432,
+        sslmode=os.getenv("PGSSLMODE", "require"),
+        channel_binding=os.getenv("PGCHANNELBINDING", "require")
+    )
+    parametros.update(cambios)
+    return make_conninfo(**parametros)
+
+
+async def get_pool_async():
+    """Crea y abre el pool asíncrono la primera vez que se necesita."""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                pool = AsyncConnectionPool(
+                    conninfo(),
+                    kwargs={"cursor_factory": AsyncCursorMedido},
+                    min_size=POOL_MIN,
+                    max_size=POOL_MAX,
+                    timeout=POOL_TIMEOUT,
+                    max_idle=POOL_MAX_IDLE,
+                    max_lifetime=POOL_MAX_LIFETIME,
+                    check=AsyncConnectionPool.check_connection,
+                    open=False,
+                )
+                await pool.open()
+                _pool = pool
+    return _pool
+
+
+async def cerrar_pool_async():
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
+
+def metricas_pool_async():
+    return _pool.get_stats() if _pool is not None else {}
+
+
+@asynccontextmanager
+async def conexion_async():
+    """
+    Equivalente asíncrono de `database.conexion()`: commit al salir sin
+    errores y rollback si hay una excepción.
+
+        async with conexion_async() as conn, conn.cursor() as cur:
+            await cur.execute(...)
+    """
+    pool = await get_pool_async()
+    try:
+        async with pool.connection() as conn:
+            registrar_conexion()
+            yield conn
+    except PoolTimeout as e:
+        raise PoolAgotadoError(str(e)) from e
@@ -0,0 +1,42 @@
+"""
+Serialización por lotes a CSV y NDJSON para respuestas en streaming.
+
+Cada función recibe los nombres de columna y un iterable de lotes de filas
+(tuplas) y produce bloques de bytes, uno por lote, listos para un
+StreamingResponse. La memoria usada depende del tamaño del lote, no del total.
+"""
+import csv
+import io
+
+from serializacion import a_json
+
+FORMATOS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def lotes_csv(columnas, lotes):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(columnas)
+    # El encabezado sale antes de esperar a la base de datos
+    yield buffer.getvalue().encode("utf-8")
+    for filas in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(filas)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def lotes_ndjson(columnas, lotes):
+    for filas in lotes:
+        yield b"".join(a_json(dict(zip(columnas, fila))) + b"\n" for fila in filas)
+
+
+def serializar(formato, columnas, lotes):
+    if formato == "csv":
+        return lotes_csv(columnas, lotes)
+    if formato == "ndjson":
+        return lotes_ndjson(columnas, lotes)
+    raise ValueError(f"Formato no soportado: {formato}")
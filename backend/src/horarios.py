@@ -0,0 +1,162 @@
+"""
+Detección de choques de horario entre cursos.
+
+Las sesiones semanales de un curso van en su `cronograma` como
+{"dia": "lunes", "inicio": "08:00", "fin": "10:00"}; las demás entradas del
+cronograma (temas por semana, fechas de parciales) se ignoran. Cada sesión
+se convierte en una franja [inicio, fin) en minutos desde el lunes 00:00.
+
+`IndiceHorario` guarda las franjas de un estudiante ordenadas por inicio con
+el fin máximo acumulado, así que saber si una franja nueva choca es una
+búsqueda binaria (O(log n)), sin comparar contra cada curso inscrito. Conviene
+cuando el mismo horario se consulta muchas veces (la inscripción por lote lo
+arma una vez por estudiante y lo hace crecer con lo que inscribe); para una
+sola inscripción `choques_entre` compara sesión contra sesión, que con las
+pocas sesiones de un estudiante es más barato que armar el índice.
+`detectar_conflictos` recorre las inscripciones de todo un semestre en una
+sola pasada (barrido por estudiante) y reporta cada par de sesiones que se
+solapan.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, groupby
+
+DIAS = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
+_INDICE_DIA = {dia: i for i, dia in enumerate(DIAS)}
+_INDICE_DIA.update({"miércoles": 2, "sábado": 5})
+MINUTOS_DIA = 24 * 60
+
+
+def _minutos(hora):
+    horas, minutos = hora.split(":")
+    horas, minutos = int(horas), int(minutos)
+    if not (0 <= horas <= 24 and 0 <= minutos < 60) or horas * 60 + minutos > MINUTOS_DIA:
+        raise ValueError
+    return horas * 60 + minutos
+
+
+def franjas_de(cronograma):
+    """Franjas (inicio, fin) en minutos de la semana, ordenadas. ValueError si una sesión está mal formada."""
+    franjas = []
+    for entrada in cronograma or ():
+        if not isinstance(entrada, dict) or "dia" not in entrada:
+            continue
+        try:
+            dia = _INDICE_DIA[str(entrada["dia"]).strip().lower()]
+            inicio = _minutos(entrada["inicio"])
+            fin = _minutos(entrada["fin"])
+        except (KeyError, ValueError, AttributeError):
+            raise ValueError(f"Sesión inválida en el cronograma: {entrada}")
+        if fin <= inicio:
+            raise ValueError(f"La sesión termina antes de empezar: {entrada}")
+        franjas.append((dia * MINUTOS_DIA + inicio, dia * MINUTOS_DIA + fin))
+    franjas.sort()
+    return franjas
+
+
+def describir_franja(inicio, fin):
+    """(inicio, fin) -> 'lunes 08:00-10:00'."""
+    dia, desde = divmod(inicio, MINUTOS_DIA)
+    hasta = fin - dia * MINUTOS_DIA
+    return f"{DIAS[dia]} {desde // 60:02d}:{desde % 60:02d}-{hasta // 60:02d}:{hasta % 60:02d}"
+
+
+class IndiceHorario:
+    """Franjas ocupadas (inicio, fin, curso) ordenadas por inicio, con el fin máximo de cada prefijo."""
+
+    __slots__ = ("_franjas", "_inicios", "_fin_max")
+
+    def __init__(self, franjas=()):
+        self._franjas = sorted(franjas)
+        self._inicios = [f[0] for f in self._franjas]
+        self._fin_max = list(accumulate((f[1] for f in self._franjas), max))
+
+    @classmethod
+    def de_cursos(cls, cursos):
+        """A partir de [(codigo, cronograma)]."""
+        return cls((inicio, fin, codigo) for codigo, cronograma in cursos
+                   for inicio, fin in franjas_de(cronograma))
+
+    def __len__(self):
+        return len(self._franjas)
+
+    def agregar(self, inicio, fin, curso):
+        i = bisect_right(self._inicios, inicio)
+        self._inicios.insert(i, inicio)
+        self._franjas.insert(i, (inicio, fin, curso))
+        self._fin_max.insert(i, fin)
+        previo = self._fin_max[i - 1] if i else fin
+        for j in range(i, len(self._fin_max)):
+            previo = max(previo, self._franjas[j][1])
+            self._fin_max[j] = previo
+
+    def choca(self, inicio, fin):
+        # La última franja que empieza antes de `fin`; si el mayor fin hasta ella pasa de `inicio`, hay solape
+        j = bisect_left(self._inicios, fin) - 1
+        return j >= 0 and self._fin_max[j] > inicio
+
+    def choques(self, inicio, fin):
+        """Franjas que se solapan con [inicio, fin): búsqueda binaria y luego solo las candidatas."""
+        j = bisect_left(self._inicios, fin) - 1
+        encontradas = []
+        while j >= 0 and self._fin_max[j] > inicio:
+            if self._franjas[j][1] > inicio:
+                encontradas.append(self._franjas[j])
+            j -= 1
+        return encontradas[::-1]
+
+
+def choques_con(indice, codigo, franjas):
+    """Choques de las `franjas` de un curso contra el horario de un estudiante."""
+    return [
+        {
+            "curso": codigo,
+            "con": otro,
+            "franja": describir_franja(max(inicio, otro_inicio), min(fin, otro_fin)),
+        }
+        for inicio, fin in franjas
+        for otro_inicio, otro_fin, otro in indice.choques(inicio, fin)
+        if otro != codigo
+    ]
+
+
+def choques_entre(cursos, codigo, franjas):
+    """Choques de las `franjas` de un curso contra [(codigo, cronograma)], sin índice (una sola consulta)."""
+    solapes = sorted(
+        (inicio, otro_inicio, fin, otro_fin, otro)
+        for otro, cronograma in cursos if otro != codigo
+        for otro_inicio, otro_fin in franjas_de(cronograma)
+        for inicio, fin in franjas
+        if inicio < otro_fin and otro_inicio < fin
+    )
+    return [
+        {"curso": codigo, "con": otro, "franja": describir_franja(max(inicio, otro_inicio), min(fin, otro_fin))}
+        for inicio, otro_inicio, fin, otro_fin, otro in solapes
+    ]
+
+
+def detectar_conflictos(inscripciones):
+    """
+    Todos los choques de horario de un conjunto de inscripciones, en una pasada.
+    `inscripciones`: (estudiante_id, codigo, cronograma) ordenadas por estudiante.
+    """
+    conflictos = []
+    for estudiante_id, grupo in groupby(inscripciones, key=lambda fila: fila[0]):
+        franjas = sorted(
+            (inicio, fin, codigo)
+            for _, codigo, cronograma in grupo
+            for inicio, fin in franjas_de(cronograma)
+        )
+        activas = []  # heap de (fin, inicio, codigo) de las franjas que siguen abiertas
+        for inicio, fin, codigo in franjas:
+            while activas and activas[0][0] <= inicio:
+                heapq.heappop(activas)
+            for otro_fin, _, otro in activas:
+                if otro != codigo:
+                    conflictos.append({
+                        "estudiante_id": estudiante_id,
+                        "cursos": sorted((codigo, otro)),
+                        "franja": describir_franja(inicio, min(fin, otro_fin)),
+                    })
+            heapq.heappush(activas, (fin, inicio, codigo))
+    return conflictos
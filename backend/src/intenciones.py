@@ -0,0 +1,73 @@
+"""
+Clasificador de intenciones del endpoint /chat.
+
+Las palabras clave se precompilan en una tabla ordenada por prioridad (el
+orden de INTENCIONES, igual que la antigua cadena de if/elif). Al construirla
+se descartan las palabras que nunca pueden ganar porque contienen una palabra
+de una intención anterior (p. ej. "crear curso" contiene "curso"). La
+extracción del código de curso se hace contra un conjunto en memoria de
+códigos, sin consultar la base de datos.
+
+Se probó una única expresión regular con todas las palabras: con tan pocas
+palabras clave es más lenta que la búsqueda de subcadenas de CPython
+(ver backend/bench/bench_chat.py).
+"""
+import re
+
+# (intención, palabras clave) en orden de prioridad
+INTENCIONES = [
+    ("buscar", ["buscar", "curso", "disponible"]),
+    ("inscribir", ["inscrib"]),
+    ("progreso", ["reporte", "progreso"]),
+    ("inscripciones", ["mis inscripc", "inscripciones"]),
+    ("notificaciones", ["notificacion", "aviso"]),
+    ("semestre", ["semestre", "filtrar"]),
+    ("crear_curso", ["crear curso"]),
+    ("aprobar", ["aprobar", "pendiente"]),
+    ("estadisticas", ["estadistica", "reporte"]),
+]
+
+# Palabras candidatas a código de curso: letras, dígitos y guiones
+_TOKEN = re.compile(r"[\w-]+")
+_NUMERO = re.compile(r"\d+")
+
+
+class RouterIntenciones:
+    def __init__(self, intenciones=INTENCIONES):
+        tabla = []
+        anteriores = []
+        for nombre, palabras in intenciones:
+            utiles = tuple(
+                p for p in palabras
+                if not any(previa in p for previa in anteriores)
+            )
+            anteriores.extend(palabras)
+            if utiles:
+                tabla.append((nombre, utiles))
+        self._tabla = tuple(tabla)
+
+    def clasificar(self, texto):
+        """Retorna la intención de mayor prioridad presente en `texto` (ya en minúsculas) o None."""
+        for nombre, palabras in self._tabla:
+            for palabra in palabras:
+                if palabra in texto:
+                    return nombre
+        return None
+
+
+def extraer_codigo(texto, codigos):
+    """Primer token del texto (en mayúsculas, de 3+ caracteres) que sea un código de `codigos`."""
+    for token in _TOKEN.findall(texto):
+        if len(token) >= 3:
+            candidato = token.upper()
+            if candidato in codigos:
+                return candidato
+    return None
+
+
+def extraer_numero(texto):
+    numero = _NUMERO.search(texto)
+    return int(numero.group()) if numero else None
+
+
+router_intenciones = RouterIntenciones()
@@ -0,0 +1,208 @@
+"""
+Métricas de rendimiento por request y por consulta SQL.
+
+`MiddlewareMetricas` (ASGI) mide cada request: tiempo total, conexiones
+prestadas por el pool, número de consultas y tiempo en SQL. Las consultas se
+cuentan con los cursores instrumentados de database.py (psycopg2) y
+database_async.py (psycopg 3), que llaman a `registrar_consulta`; el request
+en curso se sigue con un ContextVar, así que también cuenta lo que corre en
+el threadpool de los endpoints síncronos.
+
+`GET /metrics` expone todo en formato de texto de Prometheus. Las métricas
+son por proceso: con varios workers de uvicorn, cada uno lleva las suyas.
+
+Variables de entorno:
+    SLOW_QUERY_MS   consultas más lentas que esto se registran en el log (por defecto 200; 0 = nunca)
+    SERVER_TIMING   1 para agregar el header Server-Timing a cada respuesta (por defecto 0)
+"""
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+# Límites (segundos) de los histogramas de duración
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MedicionRequest:
+    __slots__ = ("ruta", "consultas", "tiempo_sql", "conexiones")
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.conexiones = 0
+
+
+_medicion_actual = ContextVar("medicion_request", default=None)
+
+
+class _Histograma:
+    __slots__ = ("cuentas", "suma", "total")
+
+    def __init__(self):
+        self.cuentas = [0] * len(BUCKETS)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(BUCKETS):
+            if valor <= limite:
+                self.cuentas[i] += 1
+                break
+        self.suma += valor
+        self.total += 1
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}        # (metodo, ruta, estado) -> cantidad
+        self._duraciones = {}      # (metodo, ruta) -> _Histograma
+        self._sql = {}             # (metodo, ruta) -> [consultas, segundos, conexiones]
+        self._sql_duraciones = _Histograma()
+        self._consultas_lentas = 0
+        self._consultas_fuera_de_request = 0
+
+    def registrar_request(self, metodo, ruta, estado, duracion, medicion):
+        with self._lock:
+            clave = (metodo, ruta, str(estado))
+            self._requests[clave] = self._requests.get(clave, 0) + 1
+            self._duraciones.setdefault((metodo, ruta), _Histograma()).observar(duracion)
+            sql = self._sql.setdefault((metodo, ruta), [0, 0.0, 0])
+            sql[0] += medicion.consultas
+            sql[1] += medicion.tiempo_sql
+            sql[2] += medicion.conexiones
+
+    def registrar_consulta(self, duracion, lenta, en_request):
+        with self._lock:
+            self._sql_duraciones.observar(duracion)
+            if lenta:
+                self._consultas_lentas += 1
+            if not en_request:
+                self._consultas_fuera_de_request += 1
+
+    def exportar(self, extras=()):
+        """Texto en formato de exposición de Prometheus. `extras`: [(nombre, ayuda, {etiquetas: valor})]."""
+        lineas = []
+
+        def encabezado(nombre, ayuda, tipo):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+
+        def histograma(nombre, etiquetas, h):
+            acumulado = 0
+            for limite, cuenta in zip(BUCKETS, h.cuentas):
+                acumulado += cuenta
+                lineas.append(f'{nombre}_bucket{{{etiquetas}le="{limite}"}} {acumulado}')
+            lineas.append(f'{nombre}_bucket{{{etiquetas}le="+Inf"}} {h.total}')
+            base = f"{{{etiquetas.rstrip(',')}}}" if etiquetas else ""
+            lineas.append(f"{nombre}_sum{base} {h.suma:.6f}")
+            lineas.append(f"{nombre}_count{base} {h.total}")
+
+        with self._lock:
+            encabezado("edubot_http_requests_total", "Requests atendidos.", "counter")
+            for (metodo, ruta, estado), n in sorted(self._requests.items()):
+                lineas.append(f'edubot_http_requests_total{{metodo="{metodo}",ruta="{ruta}",estado="{estado}"}} {n}')
+
+            encabezado("edubot_http_request_duration_seconds", "Duración de los requests.", "histogram")
+            for (metodo, ruta), h in sorted(self._duraciones.items()):
+                histograma("edubot_http_request_duration_seconds", f'metodo="{metodo}",ruta="{ruta}",', h)
+
+            for indice, nombre, ayuda in (
+                (0, "edubot_db_consultas_total", "Consultas SQL ejecutadas por los requests."),
+                (1, "edubot_db_tiempo_segundos_total", "Tiempo en SQL de los requests."),
+                (2, "edubot_db_conexiones_total", "Conexiones prestadas por el pool a los requests."),
+            ):
+                encabezado(nombre, ayuda, "counter")
+                for (metodo, ruta), valores in sorted(self._sql.items()):
+                    lineas.append(f'{nombre}{{metodo="{metodo}",ruta="{ruta}"}} {valores[indice]:g}')
+
+            encabezado("edubot_db_consulta_duration_seconds", "Duración de cada consulta SQL.", "histogram")
+            histograma("edubot_db_consulta_duration_seconds", "", self._sql_duraciones)
+
+            encabezado("edubot_db_consultas_lentas_total", f"Consultas de más de {SLOW_QUERY_MS:g} ms.", "counter")
+            lineas.append(f"edubot_db_consultas_lentas_total {self._consultas_lentas}")
+            encabezado("edubot_db_consultas_fuera_de_request_total",
+                       "Consultas de tareas de fondo (sin request).", "counter")
+            lineas.append(f"edubot_db_consultas_fuera_de_request_total {self._consultas_fuera_de_request}")
+
+        for nombre, ayuda, valores in extras:
+            encabezado(nombre, ayuda, "gauge")
+            for etiquetas, valor in valores.items():
+                lineas.append(f"{nombre}{{{etiquetas}}} {valor:g}" if etiquetas else f"{nombre} {valor:g}")
+        return "\n".join(lineas) + "\n"
+
+
+registro_metricas = RegistroMetricas()
+
+
+# ==================== HOOKS DE BASE DE DATOS ====================
+
+def registrar_consulta(sql, duracion):
+    """Lo llaman los cursores instrumentados después de cada execute."""
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.consultas += 1
+        medicion.tiempo_sql += duracion
+    lenta = SLOW_QUERY_MS > 0 and duracion * 1000 >= SLOW_QUERY_MS
+    if lenta:
+        texto = sql.decode("utf-8", "replace") if isinstance(sql, bytes) else str(sql)
+        logger.warning("Consulta lenta (%.1f ms) en %s: %s", duracion * 1000,
+                       medicion.ruta if medicion else "tarea de fondo", " ".join(texto.split())[:500])
+    registro_metricas.registrar_consulta(duracion, lenta, medicion is not None)
+
+
+def registrar_conexion():
+    """Lo llaman `conexion()` y `conexion_async()` al prestar una conexión."""
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.conexiones += 1
+
+
+# ==================== MIDDLEWARE ====================
+
+class MiddlewareMetricas:
+    """Middleware ASGI puro (no consume el body, así que sirve también para streaming y SSE)."""
+
+    def __init__(self, app, server_timing=SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        medicion = MedicionRequest(scope["path"])
+        token = _medicion_actual.set(medicion)
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                if self.server_timing:
+                    total = (time.perf_counter() - inicio) * 1000
+                    valor = (f'app;dur={total:.1f}, '
+                             f'db;dur={medicion.tiempo_sql * 1000:.1f};desc="{medicion.consultas} consultas", '
+                             f'conexiones;desc="{medicion.conexiones}"')
+                    mensaje.setdefault("headers", []).append((b"server-timing", valor.encode("latin-1")))
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicion_actual.reset(token)
+            ruta = scope.get("route")
+            # Plantilla de la ruta (/api/cursos/{codigo}) para no crear una serie por cada valor
+            plantilla = getattr(ruta, "path_format", None) or getattr(ruta, "path", None) or "sin_ruta"
+            registro_metricas.registrar_request(scope["method"], plantilla, estado,
+                                                time.perf_counter() - inicio, medicion)
@@ -0,0 +1,160 @@
+-- ============================================
+-- MIGRACIONES
+-- Llevan una base creada con un schema.sql anterior al actual sin borrar datos.
+-- Todas son idempotentes: init_db() las corre cada vez que las tablas ya existen.
+-- ============================================
+
+-- Dos procesos migrando a la vez se esperan
+SELECT pg_advisory_xact_lock(0x4D494752);  -- "MIGR"
+
+-- ---------- Código y semestre de los cursos ----------
+
+-- Los cursos que no los tengan quedan con un código provisorio ("CUR-<id>") y el semestre 1,
+-- que el coordinador debe corregir
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'cursos' AND column_name = 'codigo'
+    ) THEN
+        ALTER TABLE cursos ADD COLUMN codigo VARCHAR(20);
+        UPDATE cursos SET codigo = 'CUR-' || id_curso;
+        ALTER TABLE cursos ALTER COLUMN codigo SET NOT NULL;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'cursos' AND column_name = 'semestre'
+    ) THEN
+        ALTER TABLE cursos ADD COLUMN semestre INT;
+        UPDATE cursos SET semestre = 1;
+        ALTER TABLE cursos ALTER COLUMN semestre SET NOT NULL;
+    END IF;
+END $$;
+
+-- ---------- Programas y líneas de énfasis ----------
+
+CREATE TABLE IF NOT EXISTS programas (
+    id_programa SERIAL PRIMARY KEY,
+    nombre      VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS lineas_enfasis (
+    id_linea SERIAL PRIMARY KEY,
+    nombre   VARCHAR(100) NOT NULL
+);
+
+ALTER TABLE cursos ADD COLUMN IF NOT EXISTS id_linea INT REFERENCES lineas_enfasis(id_linea) ON DELETE SET NULL;
+ALTER TABLE inscripciones ADD COLUMN IF NOT EXISTS nota NUMERIC(2,1) CHECK (nota BETWEEN 0 AND 5);
+
+-- ---------- Contador de inscritos ----------
+
+-- Solo la primera vez: después lo mantiene InscripcionController (y reconciliar.py lo revisa)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'cursos' AND column_name = 'inscritos'
+    ) THEN
+        ALTER TABLE cursos ADD COLUMN inscritos INT NOT NULL DEFAULT 0 CHECK (inscritos >= 0);
+        UPDATE cursos c SET inscritos = i.total
+        FROM (SELECT curso_id, COUNT(*) AS total FROM inscripciones GROUP BY curso_id) i
+        WHERE i.curso_id = c.id_curso;
+    END IF;
+END $$;
+
+-- ---------- Notificaciones ----------
+
+ALTER TABLE notificaciones ADD COLUMN IF NOT EXISTS usuario_id INT REFERENCES estudiantes(id_estudiante) ON DELETE CASCADE;
+ALTER TABLE notificaciones ADD COLUMN IF NOT EXISTS tipo VARCHAR(30) NOT NULL DEFAULT 'aviso';
+ALTER TABLE notificaciones ADD COLUMN IF NOT EXISTS curso_id INT REFERENCES cursos(id_curso) ON DELETE CASCADE;
+ALTER TABLE notificaciones ADD COLUMN IF NOT EXISTS leido BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE notificaciones ADD COLUMN IF NOT EXISTS fecha TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+-- Las filas existentes quedan con el xid de esta transacción: ya terminada para cualquier suscriptor nuevo
+ALTER TABLE notificaciones ADD COLUMN IF NOT EXISTS xid XID8 NOT NULL DEFAULT pg_current_xact_id();
+
+-- Las notificaciones viejas eran por `destinatario` (texto) y no tienen usuario: quedan sin
+-- usuario_id y no aparecen en ninguna bandeja. Las nuevas ya no llenan `destinatario`.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'notificaciones' AND column_name = 'destinatario'
+    ) THEN
+        ALTER TABLE notificaciones ALTER COLUMN destinatario DROP NOT NULL;
+    END IF;
+END $$;
+
+-- ---------- Comprobantes ----------
+
+CREATE TABLE IF NOT EXISTS comprobantes (
+    numero        BIGINT PRIMARY KEY,
+    estudiante_id INT NOT NULL,
+    curso_codigo  VARCHAR(20) NOT NULL,
+    fecha         TIMESTAMP NOT NULL,
+    estado        VARCHAR(20) NOT NULL DEFAULT 'Pagado'
+);
+
+-- ---------- Prerrequisitos ----------
+
+CREATE TABLE IF NOT EXISTS prerrequisitos (
+    curso_id     INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
+    requisito_id INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
+    PRIMARY KEY (curso_id, requisito_id),
+    CHECK (curso_id <> requisito_id)
+);
+
+CREATE TABLE IF NOT EXISTS prerrequisitos_cambios (
+    version  BIGSERIAL PRIMARY KEY,
+    curso_id INT NOT NULL
+);
+
+-- ---------- Lista de espera ----------
+
+ALTER TABLE cursos ADD COLUMN IF NOT EXISTS espera_cabeza INT NOT NULL DEFAULT 1;
+ALTER TABLE cursos ADD COLUMN IF NOT EXISTS espera_cola INT NOT NULL DEFAULT 1;
+
+CREATE TABLE IF NOT EXISTS lista_espera (
+    curso_id      INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
+    estudiante_id INT REFERENCES estudiantes(id_estudiante) ON DELETE CASCADE,
+    turno         INT NOT NULL,
+    fecha         TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (curso_id, estudiante_id)
+);
+
+-- ---------- Índices ----------
+
+-- Los de una sola columna que reemplazaron los de paginación
+DROP INDEX IF EXISTS idx_curso_estado;
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'public' AND indexname = 'idx_inscripcion_estudiante'
+          AND indexdef NOT LIKE '%(estudiante_id, id)%'
+    ) THEN
+        DROP INDEX idx_inscripcion_estudiante;
+    END IF;
+    IF EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'public' AND indexname = 'idx_inscripcion_curso'
+          AND indexdef NOT LIKE '%(curso_id, id)%'
+    ) THEN
+        DROP INDEX idx_inscripcion_curso;
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_curso_codigo ON cursos(codigo);
+CREATE INDEX IF NOT EXISTS idx_curso_estado_codigo ON cursos(estado, codigo, id_curso);
+CREATE INDEX IF NOT EXISTS idx_curso_estado_semestre ON cursos(estado, semestre, codigo, id_curso);
+CREATE INDEX IF NOT EXISTS idx_curso_estado_nombre ON cursos(estado, nombre, id_curso);
+CREATE INDEX IF NOT EXISTS idx_curso_linea ON cursos(id_linea);
+CREATE INDEX IF NOT EXISTS idx_inscripcion_estudiante ON inscripciones(estudiante_id, id);
+CREATE INDEX IF NOT EXISTS idx_inscripcion_curso ON inscripciones(curso_id, id);
+-- Falla si hay inscripciones repetidas (mismo estudiante y curso): hay que depurarlas antes
+CREATE UNIQUE INDEX IF NOT EXISTS idx_inscripcion_estudiante_curso ON inscripciones(estudiante_id, curso_id);
+CREATE INDEX IF NOT EXISTS idx_comprobante_estudiante ON comprobantes(estudiante_id, numero);
+CREATE INDEX IF NOT EXISTS idx_notificacion_usuario ON notificaciones(usuario_id, leido, fecha DESC, id_notificacion DESC);
+CREATE INDEX IF NOT EXISTS idx_notificacion_xid ON notificaciones(usuario_id, xid);
+CREATE INDEX IF NOT EXISTS idx_prerrequisito_requisito ON prerrequisitos(requisito_id);
+CREATE INDEX IF NOT EXISTS idx_lista_espera_turno ON lista_espera(curso_id, turno);
+CREATE INDEX IF NOT EXISTS idx_lista_espera_estudiante ON lista_espera(estudiante_id);
@@ -1,5 +1,6 @@
 import re
-from controller.inscripcion_controller import InscripcionController
+from controller.inscripcion_controller import (InscripcionController, ConflictoHorarioError, CupoAgotadoError,
+                                              CursoNoEncontradoError, PrerrequisitosPendientesError)
 
 class ChatBot:
     def __init__(self):
@@ -12,7 +13,14 @@ class ChatBot:
         match = re.search(r"(inscribirme|inscribir|registrarme).*(curso\s*(\d+))", mensaje)
         if match:
             curso_id = int(match.group(3))
-            inscripcion = self.inscripcion_controller.crear_inscripcion(estudiante_id, curso_id)
+            try:
+                inscripcion, _ = self.inscripcion_controller.inscribir(estudiante_id, curso_id)
+            except CursoNoEncontradoError:
+                return f"❌ El curso {curso_id} no existe"
+            except CupoAgotadoError:
+                return f"❌ El curso {curso_id} no tiene cupos disponibles"
+            except (ConflictoHorarioError, PrerrequisitosPendientesError) as e:
+                return f"❌ No te pude inscribir en el curso {curso_id}: {e}"
             return f"✅ Te inscribí en el curso {curso_id}. Estado: {inscripcion.estado}"
 
         # Si no reconoce el mensaje
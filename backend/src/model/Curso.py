@@ -1,12 +1,19 @@
 class Curso:
-    def __init__(self, id_curso: int, nombre: str, cupo: int, creditos: int, cronograma: list = None, estado: str = "pendiente"):
+    __slots__ = ("id_curso", "nombre", "cupo", "creditos", "cronograma", "estado", "codigo", "semestre")
+
+    def __init__(self, id_curso: int, nombre: str, cupo: int, creditos: int, cronograma: list = None, estado: str = "pendiente",
+                 codigo: str = None, semestre: int = None):
         self.id_curso = id_curso
         self.nombre = nombre
         self.cupo = cupo
         self.creditos = creditos
         self.cronograma = cronograma if cronograma else []
         self.estado = estado
+        self.codigo = codigo
+        self.semestre = semestre
 
     def validar_cupo(self, inscritos: int = 0):
         return self.cupo > inscritos
 
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
@@ -1,4 +1,6 @@
 class Estudiante:
+    __slots__ = ("id", "nombre", "contrasena", "programa", "creditos_aprob", "cursos")
+
     def __init__(self, id: int, nombre: str, contrasena: str, programa: str, creditos_aprob: int, cursos: list = None):
         self.id = id
         self.nombre = nombre
@@ -19,3 +21,7 @@ class Estudiante:
         if curso in self.cursos:
             print(f"{self.nombre} canceló el curso {curso}")
             self.cursos.remove(curso)
+
+    def a_dict(self):
+        # Sin la contraseña
+        return {campo: getattr(self, campo) for campo in self.__slots__ if campo != "contrasena"}
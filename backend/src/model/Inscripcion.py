@@ -1,15 +1,21 @@
 from datetime import date
 
 class Inscripcion:
-    def __init__(self, id: int, estudiante_id: int, curso_id: int, fecha_inscripcion: date, estado: str):
+    __slots__ = ("id", "estudiante_id", "curso_id", "fecha_inscripcion", "estado", "nota")
+
+    def __init__(self, id: int, estudiante_id: int, curso_id: int, fecha_inscripcion: date, estado: str, nota: float = None):
         self.id = id
         self.estudiante_id = estudiante_id
         self.curso_id = curso_id
         self.fecha_inscripcion = fecha_inscripcion
         self.estado = estado
+        self.nota = float(nota) if nota is not None else None
 
     def validar_prerrequisitos(self):
         print("Validando prerrequisitos...")
 
     def registrar(self):
         print("Inscripción registrada")
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
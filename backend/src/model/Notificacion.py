@@ -1,13 +1,21 @@
+from datetime import datetime
+
 class Notificacion:
-    def __init__(self, id: int, estudiante_id: int, mensaje: str, leido: bool = False):
+    __slots__ = ("id", "usuario_id", "tipo", "curso_id", "curso", "mensaje", "leido", "fecha")
+
+    def __init__(self, id: int, usuario_id: int, tipo: str, curso_id: int, curso: str, mensaje: str,
+                 leido: bool = False, fecha: datetime = None):
         self.id = id
-        self.estudiante_id = estudiante_id
+        self.usuario_id = usuario_id
+        self.tipo = tipo
+        self.curso_id = curso_id
+        self.curso = curso
         self.mensaje = mensaje
         self.leido = leido
-
-    def enviar(self):
-        print(f"Enviando notificación: {self.mensaje}")
+        self.fecha = fecha
 
     def marcar_como_leida(self):
         self.leido = True
-        print("Notificación marcada como leída")
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
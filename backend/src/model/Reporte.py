@@ -1,3 +1,7 @@
+from controller.reporte_controller import EXPORTACIONES, ReporteController
+from exportacion import serializar
+
+
 class Reporte:
     def __init__(self, id: int, estudiante_id: int, tipo: str, contenido: list = None):
         self.id = id
@@ -5,8 +9,21 @@ class Reporte:
         self.tipo = tipo
         self.contenido = contenido if contenido else []
 
-    def generar(self):
-        print("Generando reporte...")
+    def generar(self, controlador=None):
+        """
+        Llena `contenido` con las filas de la entidad `tipo` (ver EXPORTACIONES),
+        solo las de `estudiante_id` si se indicó. Retorna `contenido`.
+        """
+        if self.tipo not in EXPORTACIONES:
+            raise ValueError(f"Tipo de reporte desconocido: {self.tipo}")
+        columnas, _ = EXPORTACIONES[self.tipo]
+        controlador = controlador or ReporteController()
+        lotes = controlador.iterar_lotes(self.tipo, estudiante_id=self.estudiante_id)
+        self.contenido = [dict(zip(columnas, fila)) for lote in lotes for fila in lote]
+        return self.contenido
 
-    def exportar(self):
-        print("Exportando reporte...")
+    def exportar(self, formato: str = "csv"):
+        """Serializa `contenido` (lista de dicts) en bloques de bytes csv o ndjson."""
+        columnas = list(self.contenido[0].keys()) if self.contenido else []
+        filas = [tuple(fila.get(c) for c in columnas) for fila in self.contenido]
+        return serializar(formato, columnas, [filas])
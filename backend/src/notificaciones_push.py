@@ -0,0 +1,233 @@
+"""
+Entrega push de notificaciones para el endpoint SSE.
+
+Las notificaciones se guardan en la tabla `notificaciones` dentro de la
+transacción que las origina, que además hace `pg_notify('notificaciones')`
+(ver controller/notificacion_controller.py). Cada proceso mantiene una sola
+conexión con LISTEN; los avisos solo marcan que hay novedades y un repartidor
+hace una consulta por ráfaga (no una por notificación) con las nuevas filas
+de los usuarios conectados a ese proceso. Así funciona igual con varios
+workers de uvicorn y sin Redis.
+
+Los ids (SERIAL) se asignan al insertar, no al hacer commit: un fan-out con
+ids menores puede terminar después de otro con ids mayores. Por eso la
+consulta no avanza por id sino por transacción: cada fila guarda su `xid` y
+se vuelven a leer solo las de transacciones que la última instantánea no
+veía (las abiertas en ese momento y las posteriores), descartando por id lo
+ya entregado. Una transacción larga que no crea notificaciones (p. ej. una
+exportación) no agranda la relectura: su xid no tiene filas. Cada cliente
+recibe lo que no era visible en la instantánea tomada al conectarse (más lo
+posterior a Last-Event-ID).
+
+Lo que un cliente no alcance a recibir queda en la bandeja
+(GET /api/notificaciones/{usuario_id}); al reconectar, el header
+Last-Event-ID reenvía lo pendiente desde ese id (como el orden de entrega no
+es el de los ids, puede repetir alguna ya recibida: el id del evento la identifica).
+
+LISTEN necesita una conexión directa (no pasa por PgBouncer en modo
+transacción): si PGHOST apunta a un pooler, definir PGLISTEN_HOST.
+"""
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+import psycopg
+
+from controller.notificacion_controller import (CANAL_NOTIFICACIONES, SQL_INSTANTANEA, SQL_NUEVAS_NOTIFICACIONES,
+                                                SQL_ULTIMA_NOTIFICACION)
+from database_async import conexion_async, conninfo
+from model.Notificacion import Notificacion
+
+logger = logging.getLogger(__name__)
+
+
+def _conninfo_listen():
+    host = os.getenv("PGLISTEN_HOST")
+    return conninfo(host=host) if host else conninfo()
+
+
+class _Instantanea:
+    """Una instantánea de PostgreSQL ("xmin:xmax:xid,xid,..."): qué transacciones ya habían terminado."""
+
+    __slots__ = ("xmin", "xmax", "en_curso")
+
+    def __init__(self, texto):
+        xmin, xmax, en_curso = texto.split(":")
+        self.xmin = int(xmin)
+        self.xmax = int(xmax)
+        self.en_curso = frozenset(int(xid) for xid in en_curso.split(",") if xid)
+
+    def visible(self, xid):
+        return xid < self.xmin or (xid < self.xmax and xid not in self.en_curso)
+
+    @staticmethod
+    def invisibles(instantaneas):
+        """(xmax, en_curso) que cubren lo que no era visible en alguna de `instantaneas`."""
+        xmax = min(i.xmax for i in instantaneas)
+        en_curso = {xid for i in instantaneas for xid in i.en_curso if xid < xmax}
+        return xmax, sorted(en_curso)
+
+
+class _Suscripcion:
+    __slots__ = ("desde", "instantanea", "entregadas", "nueva")
+
+    def __init__(self, desde, instantanea):
+        self.desde = desde                # id desde el que se reenvía al conectar
+        self.instantanea = instantanea    # lo visible aquí ya existía al conectar
+        self.entregadas = {}              # id -> xid de lo entregado que todavía se puede releer
+        self.nueva = True                 # aún no pasó por un reparto
+
+    def corresponde(self, id_notificacion, xid):
+        return (id_notificacion not in self.entregadas
+                and (id_notificacion > self.desde or not self.instantanea.visible(xid)))
+
+
+class CanalNotificaciones:
+    def __init__(self, max_pendientes=100, reintento=2.0):
+        self.max_pendientes = max_pendientes
+        self.reintento = reintento
+
+        self._suscriptores = {}   # usuario_id -> {cola: _Suscripcion}
+        self._instantanea = None  # se releen las filas de transacciones que no se veían en ella
+        self._hay_nuevas = None
+        self._tareas = []
+
+        self._entregadas = 0
+        self._descartadas = 0
+        self._reconexiones = 0
+
+    # ---------------- suscripción ---------------- #
+
+    @asynccontextmanager
+    async def suscribir(self, usuario_id, desde=None):
+        """
+        Registra una cola para `usuario_id` mientras dure el bloque `with`.
+        Recibe las notificaciones con id mayor que `desde` (por defecto, solo
+        las que lleguen a partir de ahora).
+        """
+        self._iniciar()
+        async with conexion_async() as conn, conn.cursor() as cur:
+            await cur.execute(SQL_ULTIMA_NOTIFICACION, (usuario_id,))
+            ultima, instantanea = await cur.fetchone()
+        cola = asyncio.Queue(maxsize=self.max_pendientes)
+        # Hasta su primer reparto, lo que no era visible en su instantánea se lee aparte
+        self._suscriptores.setdefault(usuario_id, {})[cola] = _Suscripcion(
+            ultima if desde is None else desde, _Instantanea(instantanea))
+        self._hay_nuevas.set()  # reenviar lo pendiente desde `desde`
+        try:
+            yield cola
+        finally:
+            colas = self._suscriptores.get(usuario_id, {})
+            colas.pop(cola, None)
+            if not colas:
+                self._suscriptores.pop(usuario_id, None)
+
+    # ---------------- ciclo de vida ---------------- #
+
+    def _iniciar(self):
+        if self._tareas:
+            return
+        self._hay_nuevas = asyncio.Event()
+        self._tareas = [
+            asyncio.create_task(self._escuchar()),
+            asyncio.create_task(self._repartir()),
+        ]
+
+    async def cerrar(self):
+        tareas, self._tareas = self._tareas, []
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+
+    # ---------------- tareas de fondo ---------------- #
+
+    async def _escuchar(self):
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(_conninfo_listen(), autocommit=True)
+                async with conn:
+                    await conn.execute(f"LISTEN {CANAL_NOTIFICACIONES}")
+                    # Pudo llegar algo mientras no se escuchaba
+                    self._hay_nuevas.set()
+                    async for _ in conn.notifies():
+                        self._hay_nuevas.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._reconexiones += 1
+                logger.warning("Se perdió la conexión LISTEN de notificaciones: %s", e)
+                await asyncio.sleep(self.reintento)
+
+    async def _repartir(self):
+        while True:
+            await self._hay_nuevas.wait()
+            self._hay_nuevas.clear()
+            if not self._suscriptores:
+                continue
+            try:
+                await self._repartir_nuevas()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("No se pudieron repartir notificaciones: %s", e)
+                await asyncio.sleep(self.reintento)
+                self._hay_nuevas.set()
+
+    async def _repartir_nuevas(self):
+        usuarios = list(self._suscriptores)
+        nuevas = {s for colas in self._suscriptores.values() for s in colas.values() if s.nueva}
+        # Los recién conectados además reciben lo posterior a su `desde`, aunque ya se viera antes
+        desde = min((s.desde for s in nuevas), default=None)
+        anterior = self._instantanea
+        xmax, en_curso = _Instantanea.invisibles(
+            [s.instantanea for s in nuevas] + ([anterior] if anterior is not None else []))
+        async with conexion_async() as conn, conn.cursor() as cur:
+            # Tomada antes de la consulta: lo que ya se ve en ella también se ve en la consulta
+            await cur.execute(SQL_INSTANTANEA)
+            siguiente = _Instantanea((await cur.fetchone())[0])
+            await cur.execute(SQL_NUEVAS_NOTIFICACIONES, {
+                "usuarios": usuarios, "xmax": str(xmax), "en_curso": [str(x) for x in en_curso], "desde": desde})
+            rows = await cur.fetchall()
+        for suscripcion in nuevas:
+            suscripcion.nueva = False
+
+        for row in rows:
+            notificacion, xid = Notificacion(*row[:-1]), int(row[-1])
+            colas = self._suscriptores.get(notificacion.usuario_id, {})
+            for cola, suscripcion in list(colas.items()):
+                # Lo que ya se veía en la instantánea anterior solo vino por los recién conectados
+                if suscripcion not in nuevas and anterior.visible(xid):
+                    continue
+                if not suscripcion.corresponde(notificacion.id, xid):
+                    continue
+                suscripcion.entregadas[notificacion.id] = xid
+                try:
+                    cola.put_nowait(notificacion)
+                    self._entregadas += 1
+                except asyncio.QueueFull:
+                    # Cliente lento: la notificación sigue en la bandeja
+                    self._descartadas += 1
+
+        # Avanzar la marca y olvidar lo entregado que ya no se vuelve a leer: solo quedan las filas
+        # de transacciones que terminaron entre la instantánea y la consulta (los que se conectaron
+        # durante la consulta siguen nuevos y se leen por su propia instantánea)
+        self._instantanea = siguiente
+        for colas in self._suscriptores.values():
+            for suscripcion in colas.values():
+                suscripcion.entregadas = {i: x for i, x in suscripcion.entregadas.items()
+                                          if not siguiente.visible(x)}
+
+    # ---------------- métricas ---------------- #
+
+    def metricas(self):
+        return {
+            "usuarios_conectados": len(self._suscriptores),
+            "conexiones": sum(len(colas) for colas in self._suscriptores.values()),
+            "entregadas": self._entregadas,
+            "descartadas": self._descartadas,
+            "reconexiones_listen": self._reconexiones,
+        }
+
+
+canal_notificaciones = CanalNotificaciones()
@@ -0,0 +1,30 @@
+import base64
+import json
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
+
+
+def normalizar_limite(limite):
+    """Acota el tamaño de página a [1, LIMITE_MAXIMO]."""
+    if limite is None:
+        return LIMITE_POR_DEFECTO
+    return max(1, min(int(limite), LIMITE_MAXIMO))
+
+
+def codificar_cursor(*valores):
+    """Convierte la clave de la última fila en un cursor opaco (base64 url-safe)."""
+    datos = json.dumps(valores, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(datos).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """Inverso de `codificar_cursor`. Lanza ValueError si el cursor no es válido."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+    if not isinstance(valores, list):
+        raise ValueError("Cursor de paginación inválido")
+    return valores
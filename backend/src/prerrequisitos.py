@@ -0,0 +1,232 @@
+"""
+Grafo de prerrequisitos con la clausura transitiva precalculada como bitsets.
+
+Cada curso que es requisito de otro recibe una posición de bit; el cierre de
+un curso es un int con los bits de todos sus requisitos, directos e
+indirectos. Validar a un estudiante es una sola operación:
+
+    faltan = cierre[curso] & ~aprobados
+
+donde `aprobados` es el bitset de los cursos que aprobó. Los cursos que no
+son requisito de nadie no ocupan bits, así que los bitsets crecen con la
+cantidad de requisitos distintos, no con el catálogo.
+
+Al cambiar los requisitos de un curso (`actualizar`) solo se recalculan los
+cierres del curso y de los que dependen de él, en orden topológico. La
+versión del grafo es la del último cambio en `prerrequisitos_cambios`; los
+demás workers traen solo los cursos cambiados desde la suya
+(`ponerse_al_dia`) y recargan todo únicamente si eso falla.
+"""
+import threading
+import time
+from collections import defaultdict
+
+
+class CicloPrerrequisitosError(ValueError):
+    pass
+
+
+class _Estado:
+    """Una versión completa del grafo. Nunca se modifica después de publicada."""
+
+    __slots__ = ("directos", "dependientes", "cierre", "bits", "ids", "codigos")
+
+    def __init__(self, directos=None, dependientes=None, cierre=None, bits=None, ids=None, codigos=None):
+        self.directos = directos if directos is not None else {}            # curso_id -> frozenset de requisitos directos
+        self.dependientes = dependientes if dependientes is not None else {}  # requisito_id -> cursos que lo requieren
+        self.cierre = cierre if cierre is not None else {}                  # curso_id -> bitset de todos sus requisitos
+        self.bits = bits if bits is not None else {}                        # requisito_id -> posición de bit
+        self.ids = ids if ids is not None else []                           # posición de bit -> requisito_id
+        self.codigos = codigos if codigos is not None else {}               # curso_id -> código
+
+    def copia(self):
+        return _Estado(dict(self.directos), {r: set(c) for r, c in self.dependientes.items()}, dict(self.cierre),
+                       dict(self.bits), list(self.ids), dict(self.codigos))
+
+    def orden_topologico(self, cursos):
+        """Kahn sobre los cursos dados; los requisitos van antes que quienes los piden."""
+        pendientes = {c: sum(1 for r in self.directos.get(c, ()) if r in cursos) for c in cursos}
+        listos = [c for c, n in pendientes.items() if n == 0]
+        orden = []
+        while listos:
+            curso = listos.pop()
+            orden.append(curso)
+            for dependiente in self.dependientes.get(curso, ()):
+                if dependiente in pendientes:
+                    pendientes[dependiente] -= 1
+                    if pendientes[dependiente] == 0:
+                        listos.append(dependiente)
+        if len(orden) != len(cursos):
+            raise CicloPrerrequisitosError("El grafo de prerrequisitos tiene un ciclo")
+        return orden
+
+    def bit(self, curso_id):
+        bit = self.bits.get(curso_id)
+        if bit is None:
+            bit = self.bits[curso_id] = len(self.ids)
+            self.ids.append(curso_id)
+        return bit
+
+    def calcular_cierre(self, curso):
+        cierre = 0
+        for requisito in self.directos.get(curso, ()):
+            cierre |= (1 << self.bit(requisito)) | self.cierre.get(requisito, 0)
+        return cierre
+
+    def crearia_ciclo(self, curso_id, requisitos):
+        bit = self.bits.get(curso_id)
+        return any(r == curso_id or (bit is not None and self.cierre.get(r, 0) >> bit & 1) for r in requisitos)
+
+    def reemplazar(self, requisitos_por_curso, codigos):
+        """
+        Reemplaza los requisitos directos de varios cursos a la vez (solo sobre
+        una copia aún no publicada). `requisitos_por_curso`: {curso_id: requisito_ids}.
+        Primero cambia todas las aristas y después recalcula los cierres, así
+        que el resultado no depende del orden de los cambios.
+        """
+        self.codigos.update(codigos)
+        for curso_id, requisitos in requisitos_por_curso.items():
+            for anterior in self.directos.get(curso_id, ()):
+                self.dependientes.get(anterior, set()).discard(curso_id)
+            for requisito in requisitos:
+                self.dependientes.setdefault(requisito, set()).add(curso_id)
+            if requisitos:
+                self.directos[curso_id] = frozenset(requisitos)
+            else:
+                self.directos.pop(curso_id, None)
+                self.cierre.pop(curso_id, None)
+
+        # Solo los cursos cambiados y sus dependientes (transitivos) cambian de cierre
+        afectados = set(requisitos_por_curso)
+        pila = list(afectados)
+        while pila:
+            for dependiente in self.dependientes.get(pila.pop(), ()):
+                if dependiente not in afectados:
+                    afectados.add(dependiente)
+                    pila.append(dependiente)
+        for curso in self.orden_topologico(afectados):
+            self.cierre[curso] = self.calcular_cierre(curso)
+
+
+class GrafoPrerrequisitos:
+    """
+    Las lecturas no toman lock: leen `_estado` una vez y trabajan sobre esa
+    versión, que nadie modifica. Los cambios arman un `_Estado` nuevo (desde
+    cero o copiando el actual) y lo publican con una sola asignación; el lock
+    solo serializa a los que escriben.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._estado = _Estado()
+        self.version = None
+        self.cargado = 0.0
+
+    # ---------------- construcción ---------------- #
+
+    def cargar(self, aristas, version):
+        """Reconstruye todo desde [(curso_id, curso_codigo, requisito_id, requisito_codigo)]."""
+        requisitos = defaultdict(set)
+        estado = _Estado()
+        for curso_id, curso_codigo, requisito_id, requisito_codigo in aristas:
+            requisitos[curso_id].add(requisito_id)
+            estado.dependientes.setdefault(requisito_id, set()).add(curso_id)
+            estado.codigos[curso_id] = curso_codigo
+            estado.codigos[requisito_id] = requisito_codigo
+        estado.directos = {curso: frozenset(reqs) for curso, reqs in requisitos.items()}
+        for curso in estado.orden_topologico(estado.directos):
+            estado.cierre[curso] = estado.calcular_cierre(curso)
+        with self._lock:
+            self._estado = estado
+            self.version = version
+            self.cargado = time.monotonic()
+
+    # ---------------- cambios incrementales ---------------- #
+
+    def actualizar(self, curso_id, codigo, requisitos):
+        """Reemplaza los requisitos directos de un curso. `requisitos`: {requisito_id: codigo}."""
+        with self._lock:
+            estado = self._estado
+            if estado.crearia_ciclo(curso_id, requisitos):
+                raise CicloPrerrequisitosError(f"Los prerrequisitos de {codigo} formarían un ciclo")
+            estado = estado.copia()
+            estado.reemplazar({curso_id: set(requisitos)}, {curso_id: codigo, **requisitos})
+            self._estado = estado
+
+    def aplicar(self, version_anterior, version_nueva, curso_id, codigo, requisitos):
+        """
+        Aplica un cambio ya guardado en la base. Solo si el grafo está justo en
+        `version_anterior`; si no (otro proceso cambió algo en el medio) retorna
+        False y queda para `ponerse_al_dia`.
+        """
+        with self._lock:
+            if self.version != version_anterior:
+                return False
+            self.actualizar(curso_id, codigo, requisitos)
+            self.version = version_nueva
+            return True
+
+    def ponerse_al_dia(self, version_anterior, version_nueva, aristas, cambiados):
+        """
+        Aplica de una vez los cambios de otros procesos entre dos versiones.
+        `cambiados`: cursos cuyos requisitos cambiaron; `aristas`: las actuales
+        de esos cursos, en el formato de `cargar`. Retorna False si el grafo ya
+        no está en `version_anterior`; CicloPrerrequisitosError si el resultado
+        no es coherente (quien llama recarga todo).
+        """
+        requisitos = {curso: set() for curso in cambiados}
+        codigos = {}
+        for curso_id, curso_codigo, requisito_id, requisito_codigo in aristas:
+            requisitos[curso_id].add(requisito_id)
+            codigos[curso_id] = curso_codigo
+            codigos[requisito_id] = requisito_codigo
+        with self._lock:
+            if self.version != version_anterior:
+                return False
+            estado = self._estado.copia()
+            estado.reemplazar(requisitos, codigos)
+            self._estado = estado
+            self.version = version_nueva
+            return True
+
+    # ---------------- consultas ---------------- #
+
+    def tiene_requisitos(self, curso_id):
+        return bool(self._estado.cierre.get(curso_id))
+
+    def requisitos_directos(self, curso_id):
+        """Códigos de los requisitos directos, ordenados."""
+        estado = self._estado
+        return sorted(estado.codigos[r] for r in estado.directos.get(curso_id, ()))
+
+    def bitset(self, cursos, estado=None):
+        """Bitset de un conjunto de cursos (los que no son requisito de nada se ignoran)."""
+        bits = (estado or self._estado).bits
+        conjunto = 0
+        for curso in cursos:
+            bit = bits.get(curso)
+            if bit is not None:
+                conjunto |= 1 << bit
+        return conjunto
+
+    def faltantes(self, curso_id, aprobados):
+        """Códigos de los requisitos (directos e indirectos) de `curso_id` que no están en `aprobados`."""
+        estado = self._estado
+        faltan = estado.cierre.get(curso_id, 0) & ~self.bitset(aprobados, estado)
+        codigos = []
+        while faltan:
+            bajo = faltan & -faltan
+            codigos.append(estado.codigos[estado.ids[bajo.bit_length() - 1]])
+            faltan ^= bajo
+        return sorted(codigos)
+
+    def metricas(self):
+        estado = self._estado
+        return {
+            "cursos_con_requisitos": len(estado.directos),
+            "requisitos_distintos": len(estado.ids),
+            "version": self.version,
+        }
+
+
+grafo_prerrequisitos = GrafoPrerrequisitos()
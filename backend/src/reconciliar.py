@@ -0,0 +1,38 @@
+"""
+Reconciliación de los contadores cursos.inscritos con la tabla inscripciones.
+
+    python reconciliar.py              # detecta y repara una vez
+    python reconciliar.py --solo-ver   # solo reporta las diferencias
+    python reconciliar.py --cada 300   # repite cada 5 minutos
+"""
+import argparse
+import time
+
+from controller.curso_controller import CursoController
+
+
+def reconciliar(reparar=True):
+    diferencias = CursoController().reconciliar_inscritos(reparar=reparar)
+    if not diferencias:
+        print("✅ Contadores de inscritos al día")
+    for d in diferencias:
+        accion = "reparado" if reparar else "sin reparar"
+        print(f"⚠️ {d['codigo']}: contador {d['contador']}, real {d['real']} ({accion})")
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--solo-ver", action="store_true", help="no reparar, solo reportar")
+    parser.add_argument("--cada", type=float, default=0, help="segundos entre ejecuciones (0 = una vez)")
+    args = parser.parse_args()
+
+    while True:
+        reconciliar(reparar=not args.solo_ver)
+        if not args.cada:
+            break
+        time.sleep(args.cada)
+
+
+if __name__ == "__main__":
+    main()
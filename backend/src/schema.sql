@@ -7,6 +7,10 @@ DROP TABLE IF EXISTS notificaciones CASCADE;
 DROP TABLE IF EXISTS reportes CASCADE;
 DROP TABLE IF EXISTS programas CASCADE;
 DROP TABLE IF EXISTS lineas_enfasis CASCADE;
+DROP TABLE IF EXISTS comprobantes CASCADE;
+DROP TABLE IF EXISTS prerrequisitos CASCADE;
+DROP TABLE IF EXISTS prerrequisitos_cambios CASCADE;
+DROP TABLE IF EXISTS lista_espera CASCADE;
 
 -- ============================================
 -- TABLAS PRINCIPALES
@@ -29,14 +33,45 @@ CREATE TABLE docentes (
     nombre     VARCHAR(100) NOT NULL
 );
 
+CREATE TABLE programas (
+    id_programa SERIAL PRIMARY KEY,
+    nombre      VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE lineas_enfasis (
+    id_linea SERIAL PRIMARY KEY,
+    nombre   VARCHAR(100) NOT NULL
+);
+
 CREATE TABLE cursos (
     id_curso   SERIAL PRIMARY KEY,
+    codigo     VARCHAR(20) NOT NULL,
     nombre     VARCHAR(100) NOT NULL,
     cupo       INT NOT NULL CHECK (cupo > 0),
     creditos   INT NOT NULL CHECK (creditos > 0),
     cronograma JSONB DEFAULT '[]',
     estado     VARCHAR(20) NOT NULL DEFAULT 'pendiente' CHECK (estado IN ('pendiente', 'aprobado', 'rechazado')),
-    id_docente INT REFERENCES docentes(id_docente) ON DELETE SET NULL
+    semestre   INT NOT NULL,
+    inscritos  INT NOT NULL DEFAULT 0 CHECK (inscritos >= 0),  -- contador mantenido por InscripcionController
+    -- Turnos de la lista de espera: el primero en espera tiene `espera_cabeza`, el próximo en llegar `espera_cola`
+    espera_cabeza INT NOT NULL DEFAULT 1,
+    espera_cola   INT NOT NULL DEFAULT 1,
+    id_docente INT REFERENCES docentes(id_docente) ON DELETE SET NULL,
+    id_linea   INT REFERENCES lineas_enfasis(id_linea) ON DELETE SET NULL
+);
+
+-- Aristas del grafo de prerrequisitos (acíclico: prerrequisito_controller lo verifica al escribir)
+CREATE TABLE prerrequisitos (
+    curso_id     INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
+    requisito_id INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
+    PRIMARY KEY (curso_id, requisito_id),
+    CHECK (curso_id <> requisito_id)
+);
+
+-- Un registro por edición de prerrequisitos; la versión mayor es la del grafo
+CREATE TABLE prerrequisitos_cambios (
+    version  BIGSERIAL PRIMARY KEY,
+    curso_id INT NOT NULL
 );
 
 CREATE TABLE inscripciones (
@@ -44,13 +79,39 @@ CREATE TABLE inscripciones (
     estudiante_id INT REFERENCES estudiantes(id_estudiante) ON DELETE CASCADE,
     curso_id INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
     fecha_inscripcion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    estado VARCHAR(20) DEFAULT 'pendiente'
+    estado VARCHAR(20) DEFAULT 'pendiente' CHECK (estado IN ('pendiente', 'aprobado', 'reprobado')),
+    nota NUMERIC(2,1) CHECK (nota BETWEEN 0 AND 5)
+);
+
+-- Lista de espera FIFO por curso; los turnos son consecutivos (ver InscripcionController)
+CREATE TABLE lista_espera (
+    curso_id      INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
+    estudiante_id INT REFERENCES estudiantes(id_estudiante) ON DELETE CASCADE,
+    turno         INT NOT NULL,
+    fecha         TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (curso_id, estudiante_id)
 );
 
 CREATE TABLE notificaciones (
     id_notificacion SERIAL PRIMARY KEY,
+    usuario_id      INT NOT NULL REFERENCES estudiantes(id_estudiante) ON DELETE CASCADE,
+    tipo            VARCHAR(30) NOT NULL,
+    curso_id        INT REFERENCES cursos(id_curso) ON DELETE CASCADE,
     mensaje         TEXT NOT NULL,
-    destinatario    VARCHAR(100) NOT NULL
+    leido           BOOLEAN NOT NULL DEFAULT FALSE,
+    fecha           TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- Transacción que la creó: el id se asigna al insertar y no al hacer commit, así que la entrega
+    -- en vivo (notificaciones_push.py) avanza por transacciones terminadas y no por id
+    xid             XID8 NOT NULL DEFAULT pg_current_xact_id()
+);
+
+-- Sin llaves foráneas: es un registro histórico y se inserta por lotes en diferido
+CREATE TABLE comprobantes (
+    numero        BIGINT PRIMARY KEY,          -- id tipo Snowflake asignado por la API (comprobantes.py)
+    estudiante_id INT NOT NULL,
+    curso_codigo  VARCHAR(20) NOT NULL,
+    fecha         TIMESTAMP NOT NULL,
+    estado        VARCHAR(20) NOT NULL DEFAULT 'Pagado'
 );
 
 CREATE TABLE reportes (
@@ -58,15 +119,6 @@ CREATE TABLE reportes (
     contenido  TEXT NOT NULL
 );
 
-CREATE TABLE programas (
-    id_programa SERIAL PRIMARY KEY,
-    nombre      VARCHAR(100) NOT NULL
-);
-
-CREATE TABLE lineas_enfasis (
-    id_linea SERIAL PRIMARY KEY,
-    nombre   VARCHAR(100) NOT NULL
-);
 
 -- ============================================
 -- ÍNDICES
@@ -74,6 +126,26 @@ CREATE TABLE lineas_enfasis (
 
 CREATE INDEX idx_estudiante_programa ON estudiantes(programa);
 CREATE INDEX idx_estudiante_rol ON estudiantes(rol);
-CREATE INDEX idx_curso_estado ON cursos(estado);
-CREATE INDEX idx_inscripcion_estudiante ON inscripciones(estudiante_id);
-CREATE INDEX idx_inscripcion_curso ON inscripciones(curso_id);
+CREATE UNIQUE INDEX idx_curso_codigo ON cursos(codigo);
+-- Paginación por keyset de GET /api/cursos (filtros por estado/semestre + orden)
+CREATE INDEX idx_curso_estado_codigo ON cursos(estado, codigo, id_curso);
+CREATE INDEX idx_curso_estado_semestre ON cursos(estado, semestre, codigo, id_curso);
+CREATE INDEX idx_curso_estado_nombre ON cursos(estado, nombre, id_curso);
+CREATE INDEX idx_curso_linea ON cursos(id_linea);
+
+-- Paginación por keyset de las inscripciones de un estudiante / de un curso
+CREATE INDEX idx_inscripcion_estudiante ON inscripciones(estudiante_id, id);
+CREATE INDEX idx_inscripcion_curso ON inscripciones(curso_id, id);
+-- Un estudiante se inscribe una sola vez por curso (inscripción idempotente)
+CREATE UNIQUE INDEX idx_inscripcion_estudiante_curso ON inscripciones(estudiante_id, curso_id);
+-- Comprobantes de un estudiante, los más recientes primero
+CREATE INDEX idx_comprobante_estudiante ON comprobantes(estudiante_id, numero);
+-- Bandeja de notificaciones: no leídas / todas de un usuario, las más recientes primero
+CREATE INDEX idx_notificacion_usuario ON notificaciones(usuario_id, leido, fecha DESC, id_notificacion DESC);
+-- Entrega en vivo: las de los usuarios conectados de transacciones que la última instantánea no veía
+CREATE INDEX idx_notificacion_xid ON notificaciones(usuario_id, xid);
+-- Cursos que requieren a uno dado (búsqueda de ciclos al editar prerrequisitos)
+CREATE INDEX idx_prerrequisito_requisito ON prerrequisitos(requisito_id);
+-- Siguiente en la lista de espera de un curso (el turno menor) y lista de un estudiante
+CREATE INDEX idx_lista_espera_turno ON lista_espera(curso_id, turno);
+CREATE INDEX idx_lista_espera_estudiante ON lista_espera(estudiante_id);
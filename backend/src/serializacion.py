@@ -0,0 +1,52 @@
+"""
+Serialización JSON de las respuestas con orjson.
+
+Cuando un endpoint retorna un dict, FastAPI lo copia entero con
+jsonable_encoder, lo convierte a str con json.dumps y lo vuelve a codificar
+a bytes. Los listados arman sus filas directamente desde las tuplas de la
+base (`filas_a_dicts`) o desde los modelos con __slots__ (`proyectar`) y
+retornan `RespuestaJSON`, que va de dict a bytes en un solo paso.
+
+`RespuestaJSON` también es la clase de respuesta por defecto de la API, así
+que el resto de los endpoints se codifica con orjson aunque siga pasando
+por jsonable_encoder.
+"""
+from decimal import Decimal
+from operator import attrgetter
+
+import orjson
+from fastapi.responses import Response
+
+
+def _valor_json(valor):
+    # orjson ya codifica datetime, date, UUID y dataclasses
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if hasattr(valor, "a_dict"):
+        return valor.a_dict()
+    raise TypeError(f"Tipo no serializable a JSON: {type(valor).__name__}")
+
+
+def a_json(contenido):
+    """Codifica a bytes UTF-8. Acepta Decimal y los modelos (vía su `a_dict()`)."""
+    return orjson.dumps(contenido, default=_valor_json, option=orjson.OPT_NON_STR_KEYS)
+
+
+class RespuestaJSON(Response):
+    media_type = "application/json"
+
+    def render(self, content):
+        return a_json(content)
+
+
+def filas_a_dicts(campos, filas):
+    """Filas de la base (tuplas) a dicts, sin pasar por los modelos."""
+    return [dict(zip(campos, fila)) for fila in filas]
+
+
+def proyectar(objetos, campos):
+    """Solo los `campos` de cada objeto, como dicts listos para RespuestaJSON."""
+    if len(campos) == 1:
+        return [{campos[0]: getattr(o, campos[0])} for o in objetos]
+    valores = attrgetter(*campos)
+    return [dict(zip(campos, valores(o))) for o in objetos]
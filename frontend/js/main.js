@@ -64,17 +64,61 @@ function loadUserInfo() {
     if (nameEl) nameEl.textContent = currentUser.nombre;
     if (roleEl) roleEl.textContent =
         currentUser.rol === "estudiante" ? "Estudiante" : "Usuario";
+
+    suscribirNotificaciones();
 }
 
 function logout() {
+    if (notificacionesStream) notificacionesStream.close();
     sessionStorage.clear();
     window.location.href = "login.html";
 }
 
+// =============================================================
+// 🔔 NOTIFICACIONES EN VIVO (Server-Sent Events)
+// =============================================================
+let notificacionesStream = null;
+
+function suscribirNotificaciones() {
+    if (!window.EventSource || !ESTUDIANTE_ID) return;
+    // EventSource reconecta solo y envía Last-Event-ID para recuperar lo pendiente
+    notificacionesStream = new EventSource(`${API_URL}/api/notificaciones/${ESTUDIANTE_ID}/stream`);
+    notificacionesStream.addEventListener("notificacion", function (e) {
+        const n = JSON.parse(e.data);
+        addBotMessage(`
+    <div class="message-avatar bot-message-avatar">🔔</div>
+    <div class="message-content">
+      <p><strong>${n.curso || "Notificación"}</strong></p>
+      <p>${n.mensaje}</p>
+      <div class="message-time">Ahora</div>
+    </div>
+  `);
+    });
+}
+
 // =============================================================
 // 🛰️ API CALL GENERAL
 // =============================================================
-async function apiCall(endpoint, method = "GET", body = null) {
+// Veces que se reintenta un request frenado por el control de admisión (429 / sala de espera)
+const MAX_REINTENTOS_ADMISION = 3;
+
+const esperar = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Sondea el turno de la sala de espera hasta que toque; false si el turno venció
+async function esperarTurno(sala) {
+    addBotMessage(`<p>⏳ ${sala.mensaje} Posición aproximada: <strong>${sala.posicion}</strong>.
+      Te atenderemos automáticamente en unos ${Math.ceil(sala.espera_estimada)} segundos.</p>`);
+    let estado = sala;
+    while (!estado.listo) {
+        await esperar(Math.min(Math.max(estado.espera_estimada, 1), 5) * 1000);
+        const response = await fetch(`${API_URL}/api/sala-espera?token=${encodeURIComponent(sala.token)}`);
+        if (!response.ok) return false;
+        estado = await response.json();
+    }
+    return true;
+}
+
+async function apiCall(endpoint, method = "GET", body = null, turno = null, intento = 0) {
     try {
         const options = {
             method,
@@ -87,6 +131,7 @@ async function apiCall(endpoint, method = "GET", body = null) {
         const token = sessionStorage.getItem("token");
         if (token) options.headers["Authorization"] = `Bearer ${token}`;
         if (body) options.body = JSON.stringify(body);
+        if (turno) options.headers["X-Sala-Espera"] = turno;
 
         const response = await fetch(`${API_URL}${endpoint}`, options);
 
@@ -100,6 +145,19 @@ async function apiCall(endpoint, method = "GET", body = null) {
             data = {raw: text};
         }
 
+        // Control de admisión: en la sala de espera se sondea el turno y se reintenta con él;
+        // por demasiados intentos seguidos se espera lo que indique Retry-After
+        if (intento < MAX_REINTENTOS_ADMISION) {
+            if (response.status === 503 && data?.type === "sala_espera") {
+                if (await esperarTurno(data)) {
+                    return await apiCall(endpoint, method, body, data.token, intento + 1);
+                }
+            } else if (response.status === 429) {
+                await esperar((Number(response.headers.get("Retry-After")) || 1) * 1000);
+                return await apiCall(endpoint, method, body, turno, intento + 1);
+            }
+        }
+
         if (!response.ok) {
             // intenta leer un mensaje de error común en FastAPI: detail
             const message = data?.detail || data?.message || data?.raw || `HTTP ${response.status}`;
@@ -188,9 +246,9 @@ function mostrarCursosDesdeAPI(cursos) {
         </div>
     `;
 
-        if (curso.prerequisitos && curso.prerequisitos.length > 0) {
+        if (curso.prerrequisitos && curso.prerrequisitos.length > 0) {
             html += `<div class="prerequisitos-section"><div class="prerequisitos-title">⚠️ Prerrequisitos:</div><ul class="prerequisitos-list">`;
-            curso.prerequisitos.forEach((pr) => {
+            curso.prerrequisitos.forEach((pr) => {
                 html += `<li>${pr}</li>`;
             });
             html += `</ul></div>`;